@@ -0,0 +1,58 @@
+"""
+Reports the memory used by a wrapped (JSON) data document, in total and per
+value, against the memory used by the raw document it was wrapped from (as
+parsed by json.loads), for documents of increasing size.
+
+Run from the repository root with:
+
+    python -m benchmarks.memory
+"""
+
+import json
+import tracemalloc
+from typing import Callable
+
+from jsonlogic import JSON
+
+def document(n_items: int) -> str:
+    return json.dumps({
+        "customer": {"country": "US", "age": 40, "verified": True, "referrer": None},
+        "items": [
+            {"sku": f"SKU-{i:06}", "quantity": i % 5 + 1, "price": i % 97 + 0.99, "gift": i % 7 == 0, "tags": ["a", "b", "c"]}
+            for i in range(n_items)
+        ],
+    })
+
+def count(value: object) -> int:
+    match value:
+        case dict():
+            return 1 + sum(count(v) for v in value.values())
+        case list():
+            return 1 + sum(count(v) for v in value)
+        case _:
+            return 1
+
+def allocated(f: Callable[..., object], *args: object) -> tuple[object, int]:
+    """
+    Calls f(*args), and returns its result with the number of bytes it
+    allocated (and which are still alive, i.e. the size of the result).
+    """
+    tracemalloc.start()
+    try:
+        result = f(*args)
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, size
+
+def main():
+    print(f"{'items':>8} {'values':>10} {'raw bytes':>14} {'JSON bytes':>14} {'bytes/value':>12} {'ratio':>6}")
+    for n in (1_000, 10_000, 100_000):
+        text = document(n)
+        raw, raw_size = allocated(json.loads, text)
+        _, json_size = allocated(JSON, raw)
+        values = count(raw)
+        print(f"{n:>8} {values:>10} {raw_size:>14,} {json_size:>14,} {json_size / values:>12.1f} {json_size / raw_size:>6.2f}")
+
+if __name__ == "__main__":
+    main()
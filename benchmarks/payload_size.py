@@ -0,0 +1,61 @@
+"""
+Shows that the cost of evaluating a rule against an already-wrapped data
+document stays flat as the document grows: evaluate() passes JSON values
+through unchanged, rather than re-wrapping (i.e. copying) the data at every
+node of the logic.
+
+The last two columns include wrapping the raw document on every call, either
+eagerly (JSON) or lazily (lazy); the latter only converts what the rule reads,
+so it stays flat too.
+
+Run from the repository root with:
+
+    python -m benchmarks.payload_size
+"""
+
+import json
+import timeit
+
+from jsonlogic import JSON, compile, evaluate, lazy
+
+LOGIC = {
+    "and": [
+        {"==": [{"var": "customer.country"}, "US"]},
+        {">=": [{"var": "customer.age"}, 18]},
+        {"some": [{"var": "flags"}, {"==": [{"var": ""}, "priority"]}]},
+        {"<": [{"var": "total"}, 1000]},
+    ]
+}
+
+def order(n_items: int) -> dict[str, object]:
+    return {
+        "customer": {"country": "US", "age": 40},
+        "flags": ["gift", "priority"],
+        "total": 250,
+        "items": [
+            {"sku": f"SKU-{i:06}", "quantity": i % 5 + 1, "price": i % 97, "tags": ["a", "b", "c"]}
+            for i in range(n_items)
+        ],
+    }
+
+def main(number: int = 2000):
+    rule = compile(LOGIC)
+    print(
+        f"{'items':>8} {'bytes':>10} {'evaluate (us)':>14} {'compiled (us)':>14}"
+        f" {'JSON (us)':>14} {'lazy (us)':>14}"
+    )
+    for n_items in (10, 100, 1_000, 10_000):
+        raw = order(n_items)
+        data = JSON(raw)
+        evaluate_time = timeit.timeit(lambda: evaluate(LOGIC, data), number=number)
+        compiled_time = timeit.timeit(lambda: rule(data), number=number)
+        eager_time = timeit.timeit(lambda: rule(JSON(raw)), number=number // 10)
+        lazy_time = timeit.timeit(lambda: rule(lazy(raw)), number=number)
+        print(
+            f"{n_items:>8} {len(json.dumps(raw)):>10}"
+            f" {evaluate_time / number * 1e6:>14.1f} {compiled_time / number * 1e6:>14.1f}"
+            f" {eager_time / (number // 10) * 1e6:>14.1f} {lazy_time / number * 1e6:>14.1f}"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Runs the benchmark suite (see benchmarks.suite), and reports, for each case
+and engine, the ops/sec and the peak memory allocated by one op. Run from the
+repository root with e.g.:
+
+    python -m benchmarks.run --output before.json
+    python -m benchmarks.run --output after.json --compare before.json
+
+Pass --filter to run only the cases whose ids contain a substring (e.g.
+--filter iteration/), and --quick for a rough but fast run.
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import sys
+import time
+import timeit
+import tracemalloc
+
+from .suite import COMPILERS, Case, cases, prepare
+
+ENGINES = ("evaluate", *COMPILERS)
+
+def measure(case: Case, engine: str, min_time: float) -> dict[str, object]:
+    op = prepare(case, engine)
+    # log prints; keep it from drowning out the report
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        # The warm-up also fills any caches, and sizes the timing loop so that
+        # each repeat takes about min_time
+        start = time.perf_counter()
+        op()
+        number = max(1, int(min_time / max(time.perf_counter() - start, 1e-9)))
+
+        timer = timeit.Timer(op)
+        best = min(timer.repeat(repeat=3, number=number)) / number
+
+        tracemalloc.start()
+        try:
+            op()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    return {
+        "id": case.id,
+        "group": case.group,
+        "engine": engine,
+        "ops_per_sec": 1 / best,
+        "peak_bytes": peak,
+    }
+
+def report(result: dict[str, object], baseline: dict[tuple[str, str], dict[str, object]]):
+    line = f"{result['id']:<40} {result['engine']:<9} {result['ops_per_sec']:>14,.1f} ops/s {result['peak_bytes']:>14,} B"
+    old = baseline.get((str(result["id"]), str(result["engine"])))
+    if old is not None:
+        speedup = float(result["ops_per_sec"]) / float(old["ops_per_sec"])  # type: ignore[arg-type]
+        line += f"   x{speedup:.2f}"
+    print(line, flush=True)
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run", description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--engine", choices=[*ENGINES, "all"], default="all")
+    parser.add_argument("--filter", default="", help="only run cases whose id contains this")
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds per timing repeat (default: %(default)s)")
+    parser.add_argument("--quick", action="store_const", const=0.02, dest="min_time", help="same as --min-time 0.02")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="show speedups relative to this (--output) JSON file")
+    args = parser.parse_args(argv)
+
+    engines = ENGINES if args.engine == "all" else (args.engine,)
+    baseline: dict[tuple[str, str], dict[str, object]] = {}
+    if args.compare:
+        with open(args.compare) as f:
+            for result in json.load(f)["results"]:
+                baseline[result["id"], result["engine"]] = result
+
+    results = []
+    for case in cases():
+        if args.filter not in case.id:
+            continue
+        for engine in engines:
+            result = measure(case, engine, args.min_time)
+            report(result, baseline)
+            results.append(result)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({
+                "python": sys.version,
+                "implementation": platform.python_implementation(),
+                "platform": platform.platform(),
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                "min_time": args.min_time,
+                "results": results,
+            }, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+"""
+The workloads measured by benchmarks.run:
+
+- "tests.json": every rule in tests/tests.json, against its own data
+- "operator": one small rule per registered operator
+- "nesting": deeply nested rules
+- "wide": and/or/+ over many args
+- "iteration": map/filter/reduce/all/some over 1k to 100k items
+- "payload": var lookups in large data documents
+
+Data is wrapped as JSON once, up front, except where a case says otherwise,
+so that (as in a real service, which parses its data once) the cases measure
+evaluation rather than conversion.
+"""
+
+import json
+
+from dataclasses import dataclass
+from decimal import Decimal
+from pathlib import Path
+
+from jsonlogic import JSON, compile, compile_to_python, compile_to_vm, evaluate, lazy
+from jsonlogic.jsonlogic import operators
+
+TESTS_JSON = Path(__file__).parent.parent / "tests" / "tests.json"
+
+# How each engine other than "evaluate" prepares a rule
+COMPILERS = {
+    "compile": compile,
+    "codegen": compile_to_python,
+    "vm": compile_to_vm,
+}
+
+@dataclass
+class Case:
+    group: str
+    name: str
+    logic: object
+    data: object
+    # Whether data is raw, and is to be wrapped with lazy() as part of each op
+    lazy: bool = False
+
+    @property
+    def id(self) -> str:
+        return f"{self.group}/{self.name}"
+
+# One representative rule per operator; cases() checks that no registered
+# operator is missing from here
+OPERATORS: dict[str, tuple[object, object]] = {
+    "var": ({"var": "a.b"}, {"a": {"b": 1}}),
+    "missing": ({"missing": ["a", "b.c", "d"]}, {"a": 1, "b": {"c": 2}}),
+    "missing_some": ({"missing_some": [1, ["a", "b", "c"]]}, {"a": 1}),
+    "if": ({"if": [{"var": "x"}, "yes", {"var": "y"}, "maybe", "no"]}, {"x": False, "y": True}),
+    "?:": ({"?:": [{"var": "x"}, "yes", "no"]}, {"x": True}),
+    "==": ({"==": [{"var": "x"}, "1"]}, {"x": 1}),
+    "===": ({"===": [{"var": "x"}, 1]}, {"x": 1}),
+    "!=": ({"!=": [{"var": "x"}, "1"]}, {"x": 1}),
+    "!==": ({"!==": [{"var": "x"}, 1]}, {"x": 1}),
+    "!": ({"!": [{"var": "x"}]}, {"x": 0}),
+    "!!": ({"!!": [{"var": "x"}]}, {"x": []}),
+    "or": ({"or": [{"var": "x"}, {"var": "y"}, 1]}, {"x": 0, "y": ""}),
+    "and": ({"and": [{"var": "x"}, {"var": "y"}, 0]}, {"x": 1, "y": "a"}),
+    "<": ({"<": [1, {"var": "x"}, 3]}, {"x": 2}),
+    "<=": ({"<=": [{"var": "x"}, 2.5]}, {"x": 2}),
+    ">": ({">": [{"var": "x"}, "1"]}, {"x": 2}),
+    ">=": ({">=": [{"var": "x"}, 2]}, {"x": 2}),
+    "max": ({"max": [1, {"var": "x"}, 3, 2]}, {"x": 4}),
+    "min": ({"min": [1, {"var": "x"}, 3, 2]}, {"x": 0}),
+    "+": ({"+": [1, {"var": "x"}, "3"]}, {"x": 2}),
+    "-": ({"-": [{"var": "x"}, 1]}, {"x": 2}),
+    "*": ({"*": [2, {"var": "x"}, 3]}, {"x": 2}),
+    "/": ({"/": [{"var": "x"}, 4]}, {"x": 2}),
+    "%": ({"%": [{"var": "x"}, 3]}, {"x": 7}),
+    "map": ({"map": [{"var": "xs"}, {"*": [{"var": ""}, 2]}]}, {"xs": [1, 2, 3]}),
+    "filter": ({"filter": [{"var": "xs"}, {">": [{"var": ""}, 1]}]}, {"xs": [1, 2, 3]}),
+    "reduce": ({"reduce": [{"var": "xs"}, {"+": [{"var": "current"}, {"var": "accumulator"}]}, 0]}, {"xs": [1, 2, 3]}),
+    "all": ({"all": [{"var": "xs"}, {">": [{"var": ""}, 0]}]}, {"xs": [1, 2, 3]}),
+    "some": ({"some": [{"var": "xs"}, {">": [{"var": ""}, 2]}]}, {"xs": [1, 2, 3]}),
+    "none": ({"none": [{"var": "xs"}, {">": [{"var": ""}, 3]}]}, {"xs": [1, 2, 3]}),
+    "merge": ({"merge": [{"var": "xs"}, 4, [5, 6]]}, {"xs": [1, 2, 3]}),
+    "in": ({"in": [{"var": "x"}, ["a", "b", "c"]]}, {"x": "c"}),
+    "cat": ({"cat": ["I love ", {"var": "x"}, " pie"]}, {"x": "apple"}),
+    "substr": ({"substr": [{"var": "x"}, 2, 3]}, {"x": "jsonlogic"}),
+    "log": ({"log": {"var": "x"}}, {"x": 1}),
+}
+
+def tests_json_cases() -> list[Case]:
+    """
+    One case which evaluates every rule in tests.json (that doesn't raise)
+    against its own data: i.e. one op is one pass over the whole file.
+    """
+    with TESTS_JSON.open() as f:
+        tests = [test for test in json.load(f, parse_float=Decimal) if isinstance(test, list)]
+    rules = [JSON(logic) for logic, _, _ in tests]
+    data = [JSON(data) for _, data, _ in tests]
+    return [Case("tests.json", "all", None, list(zip(rules, data)))]
+
+def operator_cases() -> list[Case]:
+    missing = set(operators) - set(OPERATORS)
+    if missing:
+        raise KeyError(f"No benchmark for operators: {sorted(missing)}")
+    return [
+        Case("operator", key, logic, JSON(data))
+        for key, (logic, data) in OPERATORS.items()
+    ]
+
+def nesting_cases(depth: int = 100) -> list[Case]:
+    add: object = {"var": "x"}
+    not_: object = {"var": "x"}
+    if_: object = {"var": "x"}
+    for _ in range(depth):
+        add = {"+": [add, 1]}
+        not_ = {"!": [not_]}
+        if_ = {"if": [{"var": "x"}, if_, 0]}
+    return [
+        Case("nesting", f"+ depth={depth}", add, JSON({"x": 1})),
+        Case("nesting", f"! depth={depth}", not_, JSON({"x": 1})),
+        Case("nesting", f"if depth={depth}", if_, JSON({"x": 1})),
+    ]
+
+def wide_cases(width: int = 1000) -> list[Case]:
+    data = JSON({"xs": list(range(width))})
+    return [
+        Case("wide", f"and width={width}", {"and": [{"<": [{"var": f"xs.{i}"}, width]} for i in range(width)]}, data),
+        Case("wide", f"or width={width}", {"or": [{">": [{"var": f"xs.{i}"}, width]} for i in range(width)]}, data),
+        Case("wide", f"+ width={width}", {"+": [{"var": f"xs.{i}"} for i in range(width)]}, data),
+        Case("wide", f"cat width={width}", {"cat": [{"var": f"xs.{i}"} for i in range(width)]}, data),
+    ]
+
+def iteration_cases(sizes: tuple[int, ...] = (1_000, 10_000, 100_000)) -> list[Case]:
+    cases: list[Case] = []
+    for n in sizes:
+        data = JSON({"xs": list(range(n))})
+        cases += [
+            Case("iteration", f"map n={n}", {"map": [{"var": "xs"}, {"*": [{"var": ""}, 2]}]}, data),
+            Case("iteration", f"filter n={n}", {"filter": [{"var": "xs"}, {"==": [{"%": [{"var": ""}, 2]}, 0]}]}, data),
+            Case("iteration", f"reduce n={n}", {"reduce": [{"var": "xs"}, {"+": [{"var": "current"}, {"var": "accumulator"}]}, 0]}, data),
+            Case("iteration", f"all n={n}", {"all": [{"var": "xs"}, {">=": [{"var": ""}, 0]}]}, data),
+            Case("iteration", f"some n={n}", {"some": [{"var": "xs"}, {"<": [{"var": ""}, 0]}]}, data),
+            Case("iteration", f"filter+map n={n}", {"map": [{"filter": [{"var": "xs"}, {">": [{"var": ""}, n // 2]}]}, {"+": [{"var": ""}, 1]}]}, data),
+        ]
+    return cases
+
+def payload_cases(sizes: tuple[int, ...] = (1_000, 100_000)) -> list[Case]:
+    logic = {"and": [
+        {"==": [{"var": "customer.country"}, "US"]},
+        {"<": [{"var": "items.0.price"}, 100]},
+        {"missing": ["customer.age", "customer.email"]},
+    ]}
+    cases: list[Case] = []
+    for n in sizes:
+        raw = {
+            "customer": {"country": "US", "age": 40},
+            "items": [{"sku": f"SKU-{i}", "price": i % 97, "tags": ["a", "b"]} for i in range(n)],
+        }
+        cases += [
+            Case("payload", f"JSON n={n}", logic, JSON(raw)),
+            Case("payload", f"lazy n={n}", logic, raw, lazy=True),
+        ]
+    return cases
+
+def cases() -> list[Case]:
+    return [
+        *tests_json_cases(),
+        *operator_cases(),
+        *nesting_cases(),
+        *wide_cases(),
+        *iteration_cases(),
+        *payload_cases(),
+    ]
+
+def prepare(case: Case, engine: str):
+    """
+    Returns a no-argument function which runs case once, with engine (one of
+    "evaluate", or a key of COMPILERS).
+    """
+    if case.group == "tests.json":
+        tests: list[tuple[JSON, JSON]] = case.data  # type: ignore[assignment]
+        runnable = []
+        for logic, data in tests:
+            try:
+                evaluate(logic, data)
+            except Exception:
+                continue
+            runnable.append((logic, data))
+        if engine == "evaluate":
+            return lambda: [evaluate(logic, data) for logic, data in runnable]
+        rules = [(COMPILERS[engine](logic), data) for logic, data in runnable]
+        return lambda: [rule(data) for rule, data in rules]
+
+    logic, data = case.logic, case.data
+    if engine == "evaluate":
+        if case.lazy:
+            return lambda: evaluate(logic, lazy(data))
+        return lambda: evaluate(logic, data)
+    rule = COMPILERS[engine](logic)
+    if case.lazy:
+        return lambda: rule(lazy(data))
+    return lambda: rule(data)
@@ -0,0 +1,43 @@
+"""
+Times the variadic operators (+, *, cat, merge) over arrays of increasing
+length. Each is a single pass over its args, so the time per item should stay
+flat; when they were defined recursively, it grew with the length of the
+array, and anything much past a thousand items raised RecursionError.
+
+Run from the repository root with:
+
+    python -m benchmarks.variadic
+"""
+
+import timeit
+
+from jsonlogic import JSON, compile
+
+RULES = {
+    "+": {"+": {"var": "numbers"}},
+    "*": {"*": {"var": "ones"}},
+    "cat": {"cat": {"var": "strings"}},
+    "merge": {"merge": {"var": "arrays"}},
+}
+
+def data(n: int) -> JSON:
+    return JSON({
+        "numbers": list(range(n)),
+        "ones": [1] * n,
+        "strings": [f"s{i}" for i in range(n)],
+        "arrays": [[i, i] for i in range(n)],
+    })
+
+def main(number: int = 20):
+    sizes = (10, 100, 1_000, 10_000)
+    print(f"{'op':>8} " + " ".join(f"{f'n={n} (ns/item)':>18}" for n in sizes))
+    for key, logic in RULES.items():
+        rule = compile(logic)
+        times = []
+        for n in sizes:
+            d = data(n)
+            times.append(timeit.timeit(lambda: rule(d), number=number) / number / n * 1e9)
+        print(f"{key:>8} " + " ".join(f"{t:>18.0f}" for t in times))
+
+if __name__ == "__main__":
+    main()
@@ -5,9 +5,47 @@ from .json import (
     Boolean as Boolean,
     Integer as Integer,
     Float as Float,
+    NativeFloat as NativeFloat,
     String as String,
     Array as Array,
-    Object as Object
+    Object as Object,
+    LazyArray as LazyArray,
+    LazyObject as LazyObject,
+    lazy as lazy,
+    Numbers as Numbers,
 )
 from .jsonlogic import evaluate as evaluate
-from .jsonpath import JSONPath as JSONPath
+from .budget import Budget as Budget, BudgetExceeded as BudgetExceeded
+from .profiler import Profiler as Profiler
+from .tracing import (
+    Tracer as Tracer,
+    TraceRecorder as TraceRecorder,
+)
+from .compiler import (
+    compile as compile,
+    CompiledRule as CompiledRule,
+    evaluate_many as evaluate_many,
+)
+from .optimizer import optimize as optimize
+from .ruleset import RuleSet as RuleSet
+from .matcher import RuleMatcher as RuleMatcher
+from .incremental import IncrementalRule as IncrementalRule
+from .cache import (
+    RuleCache as RuleCache,
+    rule_cache as rule_cache,
+)
+from .vm import (
+    compile_to_vm as compile_to_vm,
+    VMRule as VMRule,
+)
+from .codegen import (
+    compile_to_python as compile_to_python,
+    GeneratedRule as GeneratedRule,
+)
+from .jsonpath import JSONPath as JSONPath, wildcard as wildcard
+from .dependencies import dependencies as dependencies, project as project
+from .parallel import (
+    evaluate_parallel as evaluate_parallel,
+    evaluate_unordered as evaluate_unordered,
+    RecordError as RecordError,
+)
@@ -0,0 +1,220 @@
+"""
+Evaluates a rule against a stream of newline-delimited JSON records, e.g.:
+
+    python -m jsonlogic '{"<": [{"var": "age"}, 18]}' records.ndjson
+    python -m jsonlogic --rule-file rule.json --filter < records.ndjson
+
+Each record (one per line; blank lines are skipped) is evaluated against the
+rule, and its result written as one line of JSON. With --filter, the records
+for which the rule is truthy are written instead, exactly as they were read.
+Records are read and written one at a time (or, with --workers, a bounded
+number of chunks at a time), so memory use doesn't depend on the size of
+the input.
+
+A rule which isn't valid JSON, or which has an unrecognized operator
+anywhere, is rejected before any record is read. If a record isn't valid
+JSON, or evaluating it raises, the error is written to stderr, with the
+record's line number, and nothing more is written.
+"""
+
+import argparse
+import json
+import os
+import sys
+
+from collections import deque
+from decimal import Decimal
+from typing import Callable, Iterable, Iterator, Sequence, TextIO
+
+from .compiler import CompiledRule, compile
+from .json import JSON, Array, Object, Numbers, dumps
+from .jsonlogic import operators
+from .parallel import RecordError, evaluate_parallel
+
+class LineError(Exception):
+    """
+    An error in (or raised by evaluating) the record at a line of the input.
+    """
+
+    def __init__(self, line: int, error: Exception):
+        super().__init__(line, error)
+        self.line = line
+        self.error = error
+
+    def __str__(self):
+        return f"line {self.line}: {self.error}"
+
+def loader(numbers: Numbers) -> Callable[[str], object]:
+    """
+    Parses JSON text, with non-integral numbers as Decimals or floats.
+    """
+    if numbers == "decimal":
+        return lambda text: json.loads(text, parse_float=Decimal)
+    return json.loads
+
+def check_operators(logic: JSON):
+    """
+    Raises ValueError, as evaluating logic would, if any operation in logic
+    has an unrecognized operator, whether or not evaluating it would reach
+    that operation.
+    """
+    # Without recursion, since rules from files may be nested deeply
+    stack = [logic]
+    while stack:
+        match stack.pop():
+            case Object() as node if len(node) == 1:
+                [(op, arg)] = node.items()
+                if op not in operators:
+                    raise ValueError(f"{node.path}: Unrecognized operator: '{op}'")
+                stack.append(arg)
+            case Object() as node:
+                stack.extend(reversed(node.values()))
+            case Array() as node:
+                stack.extend(reversed(node))
+
+def records(lines: Iterable[str], parse: Callable[[str], object]) -> Iterator[tuple[int, str, object]]:
+    """
+    The (line number, text, and parsed record) of each non-blank line.
+    """
+    for n, line in enumerate(lines, 1):
+        text = line.rstrip("\r\n")
+        if not text.strip():
+            continue
+        try:
+            record = parse(text)
+        except ValueError as e:
+            raise LineError(n, e) from e
+        yield n, text, record
+
+def evaluated(rule: CompiledRule, records: Iterable[tuple[int, str, object]]) -> Iterator[tuple[str, JSON]]:
+    """
+    The text and result of each record, in order.
+    """
+    for n, text, record in records:
+        try:
+            result = rule(record)
+        except Exception as e:
+            raise LineError(n, e) from e
+        yield text, result
+
+def evaluated_parallel(
+    rule: CompiledRule,
+    records: Iterable[tuple[int, str, object]],
+    workers: int,
+    chunksize: int,
+) -> Iterator[tuple[str, JSON]]:
+    """
+    Like evaluated(), but with the records evaluated by a pool of worker
+    processes.
+    """
+    # The line numbers and texts of the records in flight, in order, which
+    # evaluate_parallel bounds
+    pending: deque[tuple[int, str]] = deque()
+    # A record which isn't valid JSON ends the input, but is only reported
+    # once the records before it have been evaluated (as by evaluated())
+    invalid: list[LineError] = []
+
+    def parsed() -> Iterator[object]:
+        try:
+            for n, text, record in records:
+                pending.append((n, text))
+                yield record
+        except LineError as e:
+            invalid.append(e)
+
+    done = 0
+    try:
+        for result in evaluate_parallel(rule, parsed(), workers=workers, chunksize=chunksize):
+            _, text = pending.popleft()
+            done += 1
+            yield text, result
+    except RecordError as e:
+        n, _ = pending[e.index - done]
+        raise LineError(n, e.error) from e.error
+    if invalid:
+        raise invalid[0]
+
+def run(rule: CompiledRule, input: TextIO, output: TextIO, *, filter: bool, workers: int, chunksize: int):
+    parsed = records(input, loader(rule.numbers))
+    if workers > 1:
+        results = evaluated_parallel(rule, parsed, workers, chunksize)
+    else:
+        results = evaluated(rule, parsed)
+
+    for text, result in results:
+        if not filter:
+            output.write(dumps(result) + "\n")
+        elif result:
+            output.write(text + "\n")
+
+parser = argparse.ArgumentParser(
+    prog="python -m jsonlogic",
+    description=__doc__,
+    formatter_class=argparse.RawDescriptionHelpFormatter,
+)
+parser.add_argument("rule", nargs="?", help="the rule, as JSON (unless given with --rule-file)")
+parser.add_argument("--rule-file", "-r", help="read the rule from this file instead")
+parser.add_argument("input", nargs="?", default="-", help="the records, one JSON document per line (default: stdin)")
+parser.add_argument("--filter", action="store_true", help="write the records for which the rule is truthy, rather than the results")
+parser.add_argument("--workers", "-j", type=int, default=1, help="evaluate in this many worker processes (default: %(default)s)")
+parser.add_argument("--chunksize", type=int, default=1000, help="records per chunk sent to a worker (default: %(default)s)")
+parser.add_argument(
+    "--numbers",
+    choices=["decimal", "float"],
+    default="decimal",
+    help="parse and evaluate non-integral numbers as exact Decimals, or as native floats (default: %(default)s)",
+)
+
+def main(argv: Sequence[str] | None = None) -> int:
+    # Intermixed, so that options may come between the rule and the input
+    args = parser.parse_intermixed_args(argv)
+    numbers: Numbers = args.numbers
+    text: str | None = args.rule
+    input_name: str = args.input
+    if args.rule_file is not None and text is not None:
+        # The only positional argument is the input
+        if input_name != "-":
+            parser.error("the rule may be given either as an argument or with --rule-file, not both")
+        text, input_name = None, text
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.chunksize < 1:
+        parser.error("--chunksize must be at least 1")
+
+    try:
+        if args.rule_file is not None:
+            with open(args.rule_file, encoding="utf-8") as f:
+                text = f.read()
+        elif text is None:
+            parser.error("a rule is required, either as an argument or with --rule-file")
+        logic = loader(numbers)(text)
+        rule = compile(logic, numbers=numbers)
+        check_operators(rule.logic)
+    except (OSError, ValueError) as e:
+        print(f"Invalid rule: {e}", file=sys.stderr)
+        return 2
+
+    try:
+        if input_name == "-":
+            run(rule, sys.stdin, sys.stdout, filter=args.filter, workers=args.workers, chunksize=args.chunksize)
+        else:
+            try:
+                input = open(input_name, encoding="utf-8")
+            except OSError as e:
+                print(e, file=sys.stderr)
+                return 2
+            with input:
+                run(rule, input, sys.stdout, filter=args.filter, workers=args.workers, chunksize=args.chunksize)
+        sys.stdout.flush()
+    except LineError as e:
+        sys.stdout.flush()
+        print(e, file=sys.stderr)
+        return 1
+    except BrokenPipeError:
+        # The reader went away (e.g. head), which isn't an error; stop
+        # Python from complaining again as it flushes stdout on exit
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+"""
+Limits on the work which one evaluation of a rule may do.
+
+Rules often come from clients, and a hostile or buggy rule (a "reduce" which
+"merge"s its accumulator, or "map"s nested a few levels deep over large
+arrays) can keep a worker busy for as long as it likes. Passing a Budget to
+evaluate() (or to a CompiledRule) bounds:
+
+- steps: the number of operations evaluated
+- depth: how deeply operations may be nested, as evaluated
+- size: the length of any String, Array, or Object an operation returns
+  (including e.g. a "var" reading from the data)
+- seconds: the wall-clock time the evaluation may take
+
+Exceeding any of them raises BudgetExceeded, with the JSONPath of the
+operation which was being evaluated.
+
+Evaluations without a Budget pay only for checking that there is none.
+"""
+
+from time import monotonic
+from typing import Callable, NamedTuple
+
+from .json import JSON, String, Array, Object
+from .jsonpath import JSONPath
+
+class Budget(NamedTuple):
+    """
+    The limits on one evaluation. None means no limit.
+    """
+    steps: int | None = None
+    depth: int | None = None
+    size: int | None = None
+    seconds: float | None = None
+
+class BudgetExceeded(RuntimeError):
+    """
+    Raised when an evaluation exceeds its Budget. .limit is the name of the
+    limit which was exceeded (e.g. "steps"), and .path is the JSONPath of the
+    operation being evaluated at the time.
+    """
+
+    def __init__(self, path: JSONPath, limit: str, budget: Budget):
+        # The args are the constructor's, so that the error can be pickled
+        # (e.g. to be re-raised from a worker process)
+        super().__init__(path, limit, budget)
+        self.path = path
+        self.limit = limit
+        self.budget = budget
+
+    def __str__(self):
+        return f"{self.path}: Exceeded the {self.limit} budget ({getattr(self.budget, self.limit)})"
+
+class Spending:
+    """
+    What an evaluation has spent of its Budget so far. This is the Meter
+    (see jsonlogic.jsonlogic.Meter) of an evaluation with a Budget.
+    """
+
+    __slots__ = ("budget", "steps", "depth", "deadline")
+
+    def __init__(self, budget: Budget):
+        self.budget = budget
+        self.steps = 0
+        self.depth = 0
+        self.deadline = None if budget.seconds is None else monotonic() + budget.seconds
+
+    def enter(self, key: str, path: JSONPath, arg: JSON):
+        """
+        Counts one more operation, at path, which is about to be evaluated.
+        """
+        budget = self.budget
+        self.steps += 1
+        if budget.steps is not None and self.steps > budget.steps:
+            raise BudgetExceeded(path, "steps", budget)
+        if budget.depth is not None and self.depth >= budget.depth:
+            raise BudgetExceeded(path, "depth", budget)
+        if self.deadline is not None and monotonic() >= self.deadline:
+            raise BudgetExceeded(path, "seconds", budget)
+        self.depth += 1
+
+    def call[*Ts](self, key: str, path: JSONPath, arg: JSON, function: Callable[[*Ts], JSON], *args: *Ts) -> JSON:
+        self.enter(key, path, arg)
+        try:
+            result = function(*args)
+        finally:
+            self.depth -= 1
+        return self.returned(result, path)
+
+    def exit(self, key: str, path: JSONPath, result: JSON | None, error: BaseException | None):
+        self.depth -= 1
+        if error is None and result is not None:
+            self.returned(result, path)
+
+    def returned(self, result: JSON, path: JSONPath) -> JSON:
+        """
+        Checks the size of result, returned by the operation at path.
+        """
+        size = self.budget.size
+        if size is not None and isinstance(result, (String, Array, Object)) and len(result) > size:
+            raise BudgetExceeded(path, "size", self.budget)
+        return result
@@ -0,0 +1,157 @@
+"""
+A cache of compiled rules, keyed by a hash of their canonical form.
+
+Services typically receive the same few rules over and over, each time as a
+freshly parsed copy, so rules can't usefully be cached by identity. Instead,
+RuleCache canonicalizes each rule (see canonical()), hashes that, and
+compiles each distinct rule only once. The least recently used rules are
+evicted once the cache holds more than maxsize rules, or more than
+max_bytes of canonical rule text.
+
+rule_cache is a process-wide RuleCache, for code which doesn't need its own.
+"""
+
+import json
+
+from collections import OrderedDict
+from decimal import Decimal
+from hashlib import sha256
+from threading import Lock
+from typing import Callable, Mapping, NamedTuple, Sequence
+
+from .compiler import CompiledRule, compile
+from .json import JSON, Null, Boolean, NativeFloat, Numbers, check_numbers
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+    bytes: int
+
+def canonical(logic: object, numbers: Numbers = "decimal") -> str:
+    """
+    A canonical text for logic: two rules have the same canonical text
+    exactly when they are the same rule, whatever the order of their keys,
+    and whether they are raw Python values or JSON.
+
+    Numbers are written in a normal form which keeps their JSON type, since
+    that matters to e.g. ===: ints as digits, and non-integral numbers as
+    JSON would convert them with numbers: native floats as their shortest
+    repr (tagged "f"), and Decimals as their str (tagged "d", which keeps
+    e.g. the trailing zero in 1.50, as "cat" would).
+    """
+    match logic:
+        case None | Null():
+            return "null"
+        case bool() | Boolean():
+            return "true" if logic else "false"
+        case int():
+            return str(int(logic))
+        case NativeFloat():
+            return f"f{float(logic)!r}"
+        case float() if numbers == "float":
+            return f"f{logic!r}"
+        case float() | Decimal():
+            return f"d{Decimal(logic)}"
+        case str():
+            return json.dumps(str(logic))
+        case _ if isinstance(logic, Mapping):
+            items = sorted(logic.items(), key=lambda item: item[0])
+            return "{" + ",".join(f"{json.dumps(str(key))}:{canonical(value, numbers)}" for key, value in items) + "}"
+        case _ if isinstance(logic, Sequence):
+            return "[" + ",".join(canonical(item, numbers) for item in logic) + "]"
+        case _:
+            raise TypeError(f"Cannot convert {type(logic).__name__} to JSON")
+
+class RuleCache:
+    """
+    An LRU cache of compiled rules, keyed by the SHA-256 of their canonical
+    text. Use like:
+
+    cache = RuleCache(maxsize=1000)
+    cache.evaluate(logic, data)  # or cache.get(logic)(data)
+
+    Rules are compiled with compiler (by default, compile), and numbers.
+    Two rules which differ only in key order share a compiled rule, so an
+    Object in the result may have its keys in the order of whichever of
+    them was compiled first.
+    """
+
+    def __init__(
+        self,
+        maxsize: int | None = 1024,
+        *,
+        max_bytes: int | None = None,
+        compiler: Callable[..., CompiledRule] = compile,
+        numbers: Numbers = "decimal",
+    ):
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.compiler = compiler
+        self.numbers: Numbers = check_numbers(numbers)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bytes = 0
+        # Each rule, with the size of its canonical text
+        self.rules: OrderedDict[bytes, tuple[CompiledRule, int]] = OrderedDict()
+        self.lock = Lock()
+
+    def get(self, logic: object) -> CompiledRule:
+        """
+        Returns logic, compiled: from the cache, if the same rule has been
+        compiled before, or else compiled now (and cached).
+        """
+        text = canonical(logic, self.numbers).encode()
+        key = sha256(text).digest()
+        with self.lock:
+            if (entry := self.rules.get(key)) is not None:
+                self.rules.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        # Compiled outside the lock, so that one slow compilation doesn't
+        # hold up every other rule. Two threads may compile the same rule at
+        # once, in which case the second replaces the first.
+        rule = self.compiler(logic, numbers=self.numbers)
+        with self.lock:
+            if (old := self.rules.pop(key, None)) is not None:
+                self.bytes -= old[1]
+            self.rules[key] = (rule, len(text))
+            self.bytes += len(text)
+            self.evict()
+        return rule
+
+    def evaluate(self, logic: object, data: object) -> JSON:
+        return self.get(logic)(data)
+
+    def evict(self):
+        while self.rules and (
+            self.maxsize is not None and len(self.rules) > self.maxsize
+            or self.max_bytes is not None and self.bytes > self.max_bytes
+        ):
+            _, (_, size) = self.rules.popitem(last=False)
+            self.bytes -= size
+            self.evictions += 1
+
+    def cache_info(self) -> CacheInfo:
+        with self.lock:
+            return CacheInfo(self.hits, self.misses, self.evictions, len(self.rules), self.bytes)
+
+    def clear(self):
+        """
+        Empties the cache, and resets its counters.
+        """
+        with self.lock:
+            self.rules.clear()
+            self.hits = self.misses = self.evictions = self.bytes = 0
+
+    def __len__(self):
+        return len(self.rules)
+
+    def __repr__(self):
+        return f"RuleCache(maxsize={self.maxsize!r}, max_bytes={self.max_bytes!r})"
+
+rule_cache = RuleCache()
@@ -0,0 +1,771 @@
+"""
+Compilation of JSONLogic into generated Python source.
+
+compile() (in jsonlogic.compiler) turns a rule into a tree of closures, so
+every node still costs a function call, and most operators still go through
+the match statements in jsonlogic.operators. compile_to_python() instead
+translates the rule into the source of a Python function, with var lookups,
+comparisons, integer arithmetic, and the short-circuiting of and/or/if
+written out inline, and compiles that with the builtin compile().
+
+Whatever isn't inlined (an operator with no generator, or an inlined
+operator whose args turn out not to be of the types the inline code
+handles) calls the operator itself, with args pathed exactly as compile()
+would path them, so that results and errors are always the same as
+evaluate()'s. Each generated line is recorded against the JSONPath of the
+logic it was generated for, so that an error raised by the generated code
+itself can be traced back to the rule (see the note added by annotate()).
+
+A rule called with a budget or a tracer runs code generated with
+metered=True, which enters and exits each operation with the evaluation's
+Meter in line (see jsonlogic.jsonlogic.Operations), rather than through
+nested calls.
+
+Generated functions are cached per rule; see generate.cache_info().
+"""
+
+import linecache
+
+from contextlib import contextmanager
+from functools import lru_cache
+from hashlib import sha256
+from types import TracebackType
+from typing import Callable, Hashable, Iterator
+
+from .compiler import CompiledRule, Node, is_constant
+from .json import JSON, Null, Boolean, Integer, Float, NativeFloat, String, Array, Object, Numbers, interned_booleans
+from .jsonlogic import Operations, operators, eager_operators, meter
+from .jsonpath import JSONPath
+from .operators import stream_stage, streamable, wrong_type
+
+# The names every generated module can use, besides its own constants
+builtins: dict[str, object] = {
+    "JSON": JSON,
+    "Null": Null,
+    "Integer": Integer,
+    "String": String,
+    "Array": Array,
+    "Object": Object,
+    "booleans": interned_booleans,
+    "numbers": (Boolean, Integer, Float, NativeFloat),
+    "wrong_type": wrong_type,
+    "Operations": Operations,
+    "meter": meter,
+}
+
+# Deeper than this, the generated code moves on to a new function, rather
+# than nest blocks further than Python's parser allows
+max_indent = 12
+
+class Function:
+    """
+    The source of one generated function, taking data and returning the
+    value of some logic (with the same path as compile_node's would have).
+    """
+
+    def __init__(self, module: 'Module', name: str):
+        self.module = module
+        self.name = name
+        self.lines: list[tuple[str, JSONPath]] = []
+        self.indent = 1
+        self.n_locals = 0
+
+    def emit(self, code: str, path: JSONPath):
+        self.lines.append(("    " * self.indent + code, path))
+
+    @contextmanager
+    def indented(self) -> Iterator[None]:
+        self.indent += 1
+        try:
+            yield
+        finally:
+            self.indent -= 1
+
+    def local(self) -> str:
+        self.n_locals += 1
+        return f"v{self.n_locals}"
+
+    def constant(self, value: object) -> str:
+        return self.module.constant(value)
+
+    def value(self, logic: JSON) -> tuple[str, JSONPath | None]:
+        """
+        Emits the code to evaluate logic, and returns an expression for its
+        value, with the path that value is known to have (if any).
+        """
+        if is_constant(logic):
+            return self.constant(logic), logic.path
+        if self.indent >= max_indent:
+            v = self.local()
+            self.emit(f"{v} = {self.module.function(logic)}(data)", logic.path)
+            return v, natural_path(logic)
+
+        match logic:
+            case Object() if len(logic) == 1 and self.module.metered and next(iter(logic)) in operators:
+                op, arg = next(iter(logic.items()))
+                self.emit(f"operations.enter({op!r}, {self.constant(logic.path)}, {self.constant(arg)})", logic.path)
+                expr, known = self.operation(op, arg)
+                v = self.local()
+                self.emit(f"{v} = operations.exit({expr})", logic.path)
+                return v, known
+            case Object() if len(logic) == 1:
+                op, arg = next(iter(logic.items()))
+                if op in operators:
+                    return self.operation(op, arg)
+                else:
+                    error = self.constant(f"{logic.path}: Unrecognized operator: '{op}'")
+                    self.emit(f"raise ValueError({error})", logic.path)
+                    return "None", None
+            case Object():
+                items = ", ".join(
+                    f"{key!r}: {self.pathed(value, value.path)}"
+                    for key, value in logic.items()
+                )
+                return f"Object({{{items}}}, {self.constant(logic.path)})", logic.path
+            case Array():
+                return self.array(logic, [self.value(item) for item in logic]), logic.path
+            case _:
+                return self.constant(logic), logic.path
+
+    def operation(self, op: str, arg: JSON) -> tuple[str, JSONPath | None]:
+        """
+        Emits the code to evaluate the operation {op: arg}, and returns an
+        expression for its value, as value does.
+        """
+        if g := generators.get(op):
+            return g(self, arg)
+        return self.call(op, arg)
+
+    def pathed(self, logic: JSON, path: JSONPath) -> str:
+        """
+        Like value, but returns an expression for the value with path.
+        """
+        expr, known = self.value(logic)
+        return self.repath(expr, known, path)
+
+    def repath(self, expr: str, known: JSONPath | None, path: JSONPath) -> str:
+        if known == path:
+            return expr
+        return f"JSON({expr}, {self.constant(path)})"
+
+    def array(self, logic: Array, values: list[tuple[str, JSONPath | None]]) -> str:
+        """
+        An expression for the Array which compile_node(logic) would build,
+        given the (already emitted) values of its items.
+        """
+        items = ", ".join(
+            self.repath(expr, known, item.path)
+            for item, (expr, known) in zip(logic, values)
+        )
+        return f"Array([{items}], {self.constant(logic.path)})"
+
+    def call(self, op: str, arg: JSON, values: list[tuple[str, JSONPath | None]] | None = None) -> tuple[str, JSONPath]:
+        """
+        Emits a call to the operator op itself, as compile() would make it.
+        If arg is an Array whose items have already been emitted, values are
+        their values.
+        """
+        v = self.local()
+        path = self.constant(arg.path)
+        if op not in eager_operators:
+            self.emit(f"{v} = JSON({self.constant(operators[op])}({self.constant(arg)}, data), {path})", arg.path)
+            return v, arg.path
+
+        match arg:
+            case Array() if values is not None:
+                args = self.array(arg, values)
+            case _:
+                args = self.pathed(arg, natural_path(arg))
+        self.emit(f"{v} = JSON({self.constant(eager_operators[op])}({args}, data), {path})", arg.path)
+        return v, arg.path
+
+    def stream(self, logic: Object) -> str:
+        """
+        Emits the code to start streaming logic, a streamable "map" or
+        "filter", as stream() (in jsonlogic.operators) would, and returns a
+        local holding the iterator over its results.
+        """
+        op, items, fn = stream_stage(logic)
+        xs = self.each(items, null=op == "map")
+        fn_name = self.module.function(fn)
+        v = self.local()
+        self.emit(f"{v} = {op}({fn_name}, {xs})", logic.path)
+        return v
+
+    def each(self, items: JSON, null: bool = False) -> str:
+        """
+        Emits the code to get the items an iterating operator iterates over,
+        as each() (in jsonlogic.operators) would, and returns a local holding
+        them.
+        """
+        if streamable(items):
+            return self.stream(items)
+        xs = self.local()
+        self.emit(f"{xs} = {self.value(items)[0]}", items.path)
+        if null:
+            self.emit(f"if isinstance({xs}, Null):", items.path)
+            with self.indented():
+                self.emit(f"{xs} = ()", items.path)
+            self.emit(f"elif not isinstance({xs}, Array):", items.path)
+        else:
+            self.emit(f"if not isinstance({xs}, Array):", items.path)
+        with self.indented():
+            self.emit(f"raise wrong_type({self.constant(items)}, Array)", items.path)
+        return xs
+
+def natural_path(logic: JSON) -> JSONPath:
+    """
+    The path of the value which compile_node(logic) returns: for an
+    operator, the path of its arg, and otherwise, the path of logic.
+    """
+    match logic:
+        case Object() if len(logic) == 1:
+            return next(iter(logic.values())).path
+        case _:
+            return logic.path
+
+class Module:
+    """
+    The generated functions (and their constants) for one rule. If metered,
+    each operation is entered and exited with the Meter of the evaluation in
+    progress.
+    """
+
+    def __init__(self, metered: bool = False):
+        self.globals: dict[str, object] = dict(builtins)
+        self.functions: list[Function] = []
+        self.metered = metered
+
+    def constant(self, value: object) -> str:
+        name = f"k{len(self.globals) - len(builtins)}"
+        self.globals[name] = value
+        return name
+
+    def function(self, logic: JSON) -> str:
+        f = Function(self, f"f{len(self.functions)}")
+        self.functions.append(f)
+        expr = f.pathed(logic, natural_path(logic))
+        f.emit(f"return {expr}", logic.path)
+        return f.name
+
+    def source(self) -> tuple[str, list[JSONPath]]:
+        """
+        The source of the module, and the side table mapping each line of
+        it (by line number - 1) to the path it was generated for.
+        """
+        lines: list[str] = []
+        paths: list[JSONPath] = []
+        for f in reversed(self.functions):
+            lines.append(f"def {f.name}(data):")
+            paths.append(JSONPath.empty())
+            if self.metered:
+                # Each function exits the operations it entered, if one of
+                # them raises
+                lines += ["    operations = Operations(meter.get())", "    try:"]
+                paths += [JSONPath.empty()] * 2
+                for line, path in f.lines:
+                    lines.append("    " + line)
+                    paths.append(path)
+                lines += ["    except BaseException as error:", "        raise operations.unwind(error)"]
+                paths += [JSONPath.empty()] * 2
+                continue
+            for line, path in f.lines:
+                lines.append(line)
+                paths.append(path)
+        return "\n".join(lines) + "\n", paths
+
+type Generator = Callable[[Function, JSON], tuple[str, JSONPath | None]]
+
+generators: dict[str, Generator] = {}
+
+def generator(key: str):
+    """
+    Decorator for registering a Generator, which receives an operator's
+    unevaluated arg, emits the code which evaluates the operator into the
+    Function, and returns an expression for the result (and its path, if
+    known).
+    """
+
+    def decorator(g: Generator) -> Generator:
+        if key in generators:
+            raise TypeError
+        generators[key] = g
+        return g
+
+    return decorator
+
+@generator("var")
+def gen_var(f: Function, arg: JSON) -> tuple[str, JSONPath | None]:
+    match arg:
+        case String() | Integer() as key:
+            default: JSON = Null()
+        case Array([String() | Integer() as key]):
+            default = Null()
+        case Array([String() | Integer() as key, default]) if is_constant(default):
+            pass
+        case _:
+            return f.call("var", arg)
+
+    match key:
+        case String(""):
+            return f.call("var", arg)
+        case String():
+            key_path = JSONPath.from_dot_notation(key)
+        case Integer():
+            key_path = JSONPath([key])
+
+    # As JSON.at_path, but without the exceptions
+    v = f.local()
+    steps: list[str] = []
+    for k in key_path:
+        match k:
+            case int():
+                steps.append(f"isinstance({v}, Array) and -len({v}) <= {k} < len({v}) and ({v} := {v}[{k}]) is not None")
+            case str():
+                steps.append(f"isinstance({v}, Object) and ({v} := {v}.get({k!r})) is not None")
+    f.emit(f"{v} = data", arg.path)
+    f.emit(f"if not ({" and ".join(steps)}):", arg.path)
+    with f.indented():
+        f.emit(f"{v} = {f.constant(default)}", arg.path)
+    return v, None
+
+def comparison(op: str, operator: str, between: bool) -> Generator:
+    """
+    A Generator for a comparison, which is inlined for two numbers or two
+    Strings (which compare in Python exactly as they do in cmp()).
+    """
+
+    def g(f: Function, arg: JSON) -> tuple[str, JSONPath | None]:
+        match arg:
+            case Array([_, _]):
+                pass
+            case Array([_, _, _]) if between:
+                pass
+            case _:
+                return f.call(op, arg)
+
+        values = [f.value(item) for item in arg]
+        exprs = [expr for expr, _ in values]
+        same_kind = " and ".join(
+            f"(type({a}) in numbers and type({b}) in numbers or type({a}) is String and type({b}) is String)"
+            for a, b in zip(exprs, exprs[1:])
+        )
+        compare = " and ".join(f"{a} {operator} {b}" for a, b in zip(exprs, exprs[1:]))
+        v = f.local()
+        f.emit(f"if {same_kind}:", arg.path)
+        with f.indented():
+            f.emit(f"{v} = booleans[{compare}]", arg.path)
+        f.emit("else:", arg.path)
+        with f.indented():
+            result, _ = f.call(op, arg, values)
+            f.emit(f"{v} = {result}", arg.path)
+        return v, None
+
+    return g
+
+generator("==")(comparison("==", "==", between=False))
+generator("!=")(comparison("!=", "!=", between=False))
+generator("<")(comparison("<", "<", between=True))
+generator("<=")(comparison("<=", "<=", between=True))
+generator(">")(comparison(">", ">", between=True))
+generator(">=")(comparison(">=", ">=", between=True))
+
+def strict_comparison(op: str, negate: bool) -> Generator:
+    """
+    A Generator for === or !==, which is inlined when both args are of the
+    same (number or String) type.
+    """
+
+    def g(f: Function, arg: JSON) -> tuple[str, JSONPath | None]:
+        match arg:
+            case Array([_, _]):
+                pass
+            case _:
+                return f.call(op, arg)
+
+        values = [f.value(item) for item in arg]
+        (a, _), (b, _) = values
+        v = f.local()
+        f.emit(f"if type({a}) is type({b}) and (type({a}) in numbers or type({a}) is String):", arg.path)
+        with f.indented():
+            f.emit(f"{v} = booleans[{a} {"!=" if negate else "=="} {b}]", arg.path)
+        f.emit("else:", arg.path)
+        with f.indented():
+            result, _ = f.call(op, arg, values)
+            f.emit(f"{v} = {result}", arg.path)
+        return v, None
+
+    return g
+
+generator("===")(strict_comparison("===", negate=False))
+generator("!==")(strict_comparison("!==", negate=True))
+
+# The operators whose results are never Arrays
+scalar_operators = frozenset({
+    "==", "===", "!=", "!==", "!", "!!", "<", "<=", ">", ">=",
+    "+", "-", "*", "/", "%", "all", "some", "none", "in", "cat", "substr",
+})
+
+def negation(op: str, negate: bool) -> Generator:
+    """
+    A Generator for "!" or "!!". If their arg isn't an Array, it's negated
+    inline only if it can't evaluate to one: the operator negates the item
+    of a single-item Array rather than the Array itself.
+    """
+
+    def g(f: Function, arg: JSON) -> tuple[str, JSONPath | None]:
+        match arg:
+            case Array([item]):
+                expr, _ = f.value(item)
+            case Array(_):
+                return f.call(op, arg)
+            case Object() if len(arg) == 1 and next(iter(arg)) not in scalar_operators:
+                return f.call(op, arg)
+            case _:
+                expr, _ = f.value(arg)
+        return f"booleans[{"not " if negate else "not not "}{expr}]", None
+
+    return g
+
+generator("!")(negation("!", negate=True))
+generator("!!")(negation("!!", negate=False))
+
+def junction(op: str, stop_if_truthy: bool) -> Generator:
+    """
+    A Generator for "and" or "or", which evaluates its args in turn until
+    one of them stops it. The args are emitted one after another inside a
+    single-pass loop (so that stopping is a break), rather than as nested
+    ifs, which would nest as deep as the rule is wide.
+    """
+
+    def g(f: Function, arg: JSON) -> tuple[str, JSONPath | None]:
+        match arg:
+            case Array([_, *_]):
+                pass
+            case _:
+                return f.call(op, arg)
+
+        v = f.local()
+        f.emit("while True:", arg.path)
+        with f.indented():
+            for i, item in enumerate(arg):
+                expr, _ = f.value(item)
+                f.emit(f"{v} = {expr}", item.path)
+                if i < len(arg) - 1:
+                    f.emit(f"if {"" if stop_if_truthy else "not "}{v}:", item.path)
+                    with f.indented():
+                        f.emit("break", item.path)
+            f.emit("break", arg.path)
+        return v, None
+
+    return g
+
+generator("and")(junction("and", stop_if_truthy=False))
+generator("or")(junction("or", stop_if_truthy=True))
+
+@generator("if")
+@generator("?:")
+def gen_if(f: Function, arg: JSON) -> tuple[str, JSONPath | None]:
+    match arg:
+        case Array([]):
+            return f.constant(Null(path=arg.path)), arg.path
+        case Array([*args]):
+            pass
+        case _:
+            return f.call("if", arg)
+
+    v = f.local()
+    f.emit("while True:", arg.path)
+    with f.indented():
+        for condition, then in zip(args[0::2], args[1::2]):
+            expr, _ = f.value(condition)
+            f.emit(f"if {expr}:", condition.path)
+            with f.indented():
+                expr, _ = f.value(then)
+                f.emit(f"{v} = {expr}", then.path)
+                f.emit("break", then.path)
+        if len(args) % 2:
+            expr, _ = f.value(args[-1])
+            f.emit(f"{v} = {expr}", args[-1].path)
+        else:
+            f.emit(f"{v} = {f.constant(Null())}", arg.path)
+        f.emit("break", arg.path)
+    return v, None
+
+def arithmetic(op: str, operator: str) -> Generator:
+    """
+    A Generator for + or *, which is inlined when all the args are Integers
+    (whose arithmetic is exact, and the same in every number_mode).
+    """
+
+    def g(f: Function, arg: JSON) -> tuple[str, JSONPath | None]:
+        match arg:
+            case Array([_, *_]):
+                pass
+            case _:
+                return f.call(op, arg)
+
+        values = [f.value(item) for item in arg]
+        exprs = [expr for expr, _ in values]
+        v = f.local()
+        f.emit(f"if {" and ".join(f"type({e}) is Integer" for e in exprs)}:", arg.path)
+        with f.indented():
+            f.emit(f"{v} = Integer({f" {operator} ".join(exprs)})", arg.path)
+        f.emit("else:", arg.path)
+        with f.indented():
+            result, _ = f.call(op, arg, values)
+            f.emit(f"{v} = {result}", arg.path)
+        return v, None
+
+    return g
+
+generator("+")(arithmetic("+", "+"))
+generator("*")(arithmetic("*", "*"))
+
+@generator("-")
+def gen_sub(f: Function, arg: JSON) -> tuple[str, JSONPath | None]:
+    match arg:
+        case Array([_]) | Array([_, _]):
+            pass
+        case _:
+            return f.call("-", arg)
+
+    values = [f.value(item) for item in arg]
+    exprs = [expr for expr, _ in values]
+    v = f.local()
+    f.emit(f"if {" and ".join(f"type({e}) is Integer" for e in exprs)}:", arg.path)
+    with f.indented():
+        f.emit(f"{v} = Integer({" - ".join(exprs) if len(exprs) == 2 else f"-{exprs[0]}"})", arg.path)
+    f.emit("else:", arg.path)
+    with f.indented():
+        result, _ = f.call("-", arg, values)
+        f.emit(f"{v} = {result}", arg.path)
+    return v, None
+
+def iteration(op: str) -> Generator:
+    """
+    A Generator for map, filter, all, some, or none, whose function is
+    generated as a function of its own, called once per item.
+    """
+
+    def g(f: Function, arg: JSON) -> tuple[str, JSONPath | None]:
+        match arg:
+            case Array([items, fn]):
+                pass
+            case _:
+                return f.call(op, arg)
+
+        if streamable(items):
+            return streamed(f, arg, items, fn)
+        path = f.constant(arg.path)
+        xs = f.local()
+        v = f.local()
+        f.emit(f"{xs} = {f.pathed(items, items.path)}", items.path)
+        fn_name = f.module.function(fn)
+        f.emit(f"if isinstance({xs}, Array):", arg.path)
+        with f.indented():
+            match op:
+                case "map":
+                    f.emit(f"{v} = Array([{fn_name}(x) for x in {xs}], {path})", arg.path)
+                case "filter":
+                    f.emit(f"{v} = Array([x for x in {xs} if {fn_name}(x)], {path})", arg.path)
+                case "all":
+                    # An empty Array is not "all", according to spec
+                    f.emit(f"{v} = booleans[len({xs}) > 0 and all({fn_name}(x) for x in {xs})]", arg.path)
+                case "some":
+                    f.emit(f"{v} = booleans[any({fn_name}(x) for x in {xs})]", arg.path)
+                case "none":
+                    f.emit(f"{v} = booleans[not any({fn_name}(x) for x in {xs})]", arg.path)
+        if op == "map":
+            f.emit(f"elif isinstance({xs}, Null):", arg.path)
+            with f.indented():
+                f.emit(f"{v} = Array([], {path})", arg.path)
+        f.emit("else:", arg.path)
+        with f.indented():
+            f.emit(f"raise wrong_type({f.constant(items)}, Array)", items.path)
+        return v, (arg.path if op in ("map", "filter") else None)
+
+    def streamed(f: Function, arg: JSON, items: Object, fn: JSON) -> tuple[str, JSONPath | None]:
+        path = f.constant(arg.path)
+        xs = f.stream(items)
+        fn_name = f.module.function(fn)
+        v = f.local()
+        match op:
+            case "map":
+                f.emit(f"{v} = Array([{fn_name}(x) for x in {xs}], {path})", arg.path)
+            case "filter":
+                f.emit(f"{v} = Array([x for x in {xs} if {fn_name}(x)], {path})", arg.path)
+            case "all":
+                # No items is not "all", according to spec
+                f.emit(f"{v} = booleans[False]", arg.path)
+                f.emit(f"for x in {xs}:", arg.path)
+                with f.indented():
+                    f.emit(f"if not {fn_name}(x):", fn.path)
+                    with f.indented():
+                        f.emit(f"{v} = booleans[False]", arg.path)
+                        f.emit("break", arg.path)
+                    f.emit(f"{v} = booleans[True]", arg.path)
+            case "some":
+                f.emit(f"{v} = booleans[any(map({fn_name}, {xs}))]", arg.path)
+            case "none":
+                f.emit(f"{v} = booleans[not any(map({fn_name}, {xs}))]", arg.path)
+        return v, (arg.path if op in ("map", "filter") else None)
+
+    return g
+
+for op in ("map", "filter", "all", "some", "none"):
+    generator(op)(iteration(op))
+
+@generator("reduce")
+def gen_reduce(f: Function, arg: JSON) -> tuple[str, JSONPath | None]:
+    match arg:
+        case Array([items, fn, initial]):
+            pass
+        case _:
+            return f.call("reduce", arg)
+
+    if streamable(items):
+        xs = f.stream(items)
+        accumulator, context, v = f.local(), f.local(), f.local()
+        f.emit(f"{accumulator} = {f.pathed(initial, initial.path)}", initial.path)
+        fn_name = f.module.function(fn)
+        f.emit(f"{context} = Object({{'current': None, 'accumulator': {accumulator}}})", arg.path)
+        f.emit(f"for x in {xs}:", arg.path)
+        with f.indented():
+            f.emit(f"{context}['current'] = x", fn.path)
+            f.emit(f"{context}['accumulator'] = {fn_name}({context})", fn.path)
+        f.emit(f"{v} = {context}['accumulator']", arg.path)
+        return v, None
+
+    xs, accumulator, context, v = f.local(), f.local(), f.local(), f.local()
+    f.emit(f"{xs} = {f.pathed(items, items.path)}", items.path)
+    f.emit(f"{accumulator} = {f.pathed(initial, initial.path)}", initial.path)
+    fn_name = f.module.function(fn)
+    f.emit(f"if isinstance({xs}, Array):", arg.path)
+    with f.indented():
+        f.emit(f"{context} = Object({{'current': None, 'accumulator': {accumulator}}})", arg.path)
+        f.emit(f"for x in {xs}:", arg.path)
+        with f.indented():
+            f.emit(f"{context}['current'] = x", fn.path)
+            f.emit(f"{context}['accumulator'] = {fn_name}({context})", fn.path)
+        f.emit(f"{v} = {context}['accumulator']", arg.path)
+    f.emit(f"elif isinstance({xs}, Null):", arg.path)
+    with f.indented():
+        f.emit(f"{v} = {accumulator}", arg.path)
+    f.emit("else:", arg.path)
+    with f.indented():
+        f.emit(f"raise wrong_type({f.constant(items)}, Array)", items.path)
+    return v, None
+
+@generator("in")
+def gen_in(f: Function, arg: JSON) -> tuple[str, JSONPath | None]:
+    match arg:
+        case Array([needle, haystack]) if streamable(haystack):
+            pass
+        case _:
+            return f.call("in", arg)
+
+    # Stops streaming the haystack at the first match
+    n, v = f.local(), f.local()
+    f.emit(f"{n} = {f.value(needle)[0]}", needle.path)
+    xs = f.stream(haystack)
+    f.emit(f"{v} = booleans[any(x is {n} or x == {n} for x in {xs})]", arg.path)
+    return v, None
+
+def rule_key(logic: JSON) -> Hashable:
+    """
+    A hashable key which is equal for two rules exactly when they would
+    generate the same code (with the same constants, and the same paths).
+    """
+    match logic:
+        case Object():
+            return Object, logic.path, tuple((key, rule_key(value)) for key, value in logic.items())
+        case Array():
+            return Array, logic.path, tuple(rule_key(item) for item in logic)
+        case Null():
+            return Null, logic.path
+        case _:
+            return type(logic), logic.path, str(logic)
+
+class Rule:
+    """
+    A rule, hashed and compared by its rule_key, so that it can be looked up
+    in generate's cache.
+    """
+
+    def __init__(self, logic: JSON):
+        self.logic = logic
+        self.key = rule_key(logic)
+        self.hash = hash(self.key)
+
+    def __hash__(self):
+        return self.hash
+
+    def __eq__(self, other: object):
+        return isinstance(other, Rule) and self.key == other.key
+
+@lru_cache(maxsize=1024)
+def generate(rule: Rule, metered: bool = False) -> tuple[Node, str]:
+    """
+    Generates, and compiles, the code for rule (metered, or not), and
+    returns it as a Node, with its source.
+    """
+    module = Module(metered)
+    entry = module.function(rule.logic)
+    source, paths = module.source()
+
+    filename = f"<jsonlogic {sha256(source.encode()).hexdigest()[:12]}>"
+    linecache.cache[filename] = (len(source), None, source.splitlines(True), filename)
+    exec(compile(source, filename, "exec"), module.globals)
+    function: Node = module.globals[entry]  # type: ignore[assignment]
+
+    def node(data: JSON) -> JSON:
+        try:
+            return function(data)
+        except Exception as error:
+            annotate(error, filename, paths)
+            raise
+
+    return node, source
+
+def annotate(error: Exception, filename: str, paths: list[JSONPath]):
+    """
+    Adds a note to error with the path of the logic for which the generated
+    code was running when it was raised.
+    """
+    tb: TracebackType | None = error.__traceback__
+    path = None
+    while tb is not None:
+        if tb.tb_frame.f_code.co_filename == filename:
+            path = paths[tb.tb_lineno - 1]
+        tb = tb.tb_next
+    if path is not None:
+        error.add_note(f"While evaluating the logic at {path}")
+
+class GeneratedRule(CompiledRule):
+    """
+    A CompiledRule whose logic has been compiled to Python source (see
+    compile_to_python), rather than to closures.
+    """
+
+    source: str
+
+    def build(self, logic: JSON) -> Node:
+        node, self.source = generate(Rule(logic))
+        return node
+
+    def build_metered(self, logic: JSON) -> Node:
+        node, _ = generate(Rule(logic), metered=True)
+        return node
+
+    def __repr__(self):
+        if self.numbers != "decimal":
+            return f"GeneratedRule({self.logic!r}, numbers={self.numbers!r})"
+        return f"GeneratedRule({self.logic!r})"
+
+def compile_to_python(logic: object, *, numbers: Numbers = "decimal") -> GeneratedRule:
+    """
+    Like compile(logic), but the rule is translated into Python source, and
+    compiled into a single specialized function (see jsonlogic.codegen).
+    """
+    return GeneratedRule(logic, numbers)
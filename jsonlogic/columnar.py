@@ -0,0 +1,424 @@
+"""
+Columnar evaluation of JSONLogic with NumPy.
+
+evaluate_columns() evaluates one rule against many flat records at once:
+rather than walking the logic once per record, it walks it once in total,
+evaluating each operator over whole NumPy arrays (one element per record).
+
+Only part of JSONLogic can be evaluated this way: var (of a literal key), the
+comparisons (==, !=, ===, !==, <, <=, >, >=), the boolean operators (!, !!,
+and, or), the arithmetic operators (+, -, *, /), and in (against a literal
+Array), over columns of booleans, numbers, or strings. If the logic uses
+anything else, or the columns hold anything else (e.g. a record is missing a
+key, so that a column contains None), or a column mixes values of different
+types (which NumPy would coerce to one), evaluate_columns() falls back to
+evaluating the records one at a time, with the same results as evaluate().
+
+Vectorized arithmetic on Float columns is done in (IEEE 754) float64, rather
+than in Decimal, so may differ from evaluate() in its last digits. Everything
+else gives the same results as evaluate().
+
+This module requires NumPy, which is not otherwise a dependency of jsonlogic:
+install it with the columnar extra (pip install "jsonlogic[columnar]").
+"""
+
+from decimal import Decimal
+from typing import Callable, Mapping, Protocol, Sequence
+
+try:
+    import numpy as np
+except ImportError as e:
+    raise ImportError(
+        'jsonlogic.columnar requires NumPy: install it with pip install "jsonlogic[columnar]"',
+        name=__name__,
+    ) from e
+
+from .compiler import compile
+from .json import JSON, Boolean, Integer, Float, String, Array, Object
+from .jsonpath import JSONPath
+
+class Unvectorizable(Exception):
+    """
+    Raised (and handled by evaluate_columns) when some part of the logic
+    can't be evaluated column-wise.
+    """
+
+class Columns:
+    """
+    The data for evaluate_columns(): the values of each var path, for each
+    of n records, either given directly, or transposed (on demand, and only
+    for the paths the logic actually uses) from a list of records.
+    """
+
+    n: int
+    # The columns as given, if they were (rather than records)
+    data: Mapping[str, Sequence[object] | np.ndarray]
+    records: Sequence[Mapping[str, object]] | None
+
+    def __init__(self, data: Mapping[str, Sequence[object] | np.ndarray] | Sequence[Mapping[str, object]]):
+        self.columns: dict[str, np.ndarray] = {}
+        if isinstance(data, Mapping):
+            self.data = data
+            self.records = None
+            lengths = {len(column) for column in data.values()}
+            if len(lengths) > 1:
+                raise ValueError(f"Columns must all be the same length, but got lengths {sorted(lengths)}")
+            self.n = lengths.pop() if lengths else 0
+        else:
+            self.data = {}
+            self.records = data
+            self.n = len(data)
+
+    def column(self, key: str) -> np.ndarray:
+        if key not in self.columns:
+            if self.records is not None:
+                path = JSONPath.from_dot_notation(key)
+                self.columns[key] = homogeneous([lookup(record, path) for record in self.records])
+            elif key in self.data:
+                values = self.data[key]
+                self.columns[key] = values if isinstance(values, np.ndarray) else homogeneous(values)
+            else:
+                raise Unvectorizable
+        column = self.columns[key]
+        if column.ndim != 1 or column.dtype.kind not in "biufU":
+            raise Unvectorizable
+        if column.dtype.kind == "f" and np.isnan(column).any():
+            # Comparing a Decimal NaN raises, rather than being False
+            raise Unvectorizable
+        return column
+
+    def rows(self) -> Sequence[object]:
+        """
+        The data as a list of records, for evaluating row by row.
+        """
+        if self.records is not None:
+            return self.records
+
+        rows: list[dict[str, object]] = [{} for _ in range(self.n)]
+        for key, column in self.data.items():
+            path = JSONPath.from_dot_notation(key)
+            values = column.tolist() if isinstance(column, np.ndarray) else column
+            for row, value in zip(rows, values):
+                place(row, path, value, key)
+        return rows
+
+    def vectorize(self, logic: JSON) -> np.ndarray:
+        match logic:
+            case Object() if len(logic) == 1:
+                op, arg = next(iter(logic.items()))
+                if v := vectorizers.get(op):
+                    return v(arg, self)
+                raise Unvectorizable
+            case Boolean():
+                return np.asarray(bool(logic))
+            case Integer() if -2 ** 63 <= logic < 2 ** 63:
+                return np.asarray(int(logic), dtype=np.int64)
+            case Float() if Decimal(float(logic)) == logic:
+                return np.asarray(float(logic))
+            case String():
+                return np.asarray(str(logic))
+            case _:
+                raise Unvectorizable
+
+def homogeneous(values: Sequence[object]) -> np.ndarray:
+    """
+    values as an array, unless they're of more than one JSON type: NumPy would
+    coerce them to one type (e.g. True and 1 to integers, or 1 and "x" to
+    strings), after which they'd compare differently than in evaluate().
+    """
+    if len({kind_of(type(value)) for value in values}) > 1:
+        raise Unvectorizable
+    return np.asarray(values)
+
+def kind_of(t: type) -> str:
+    """
+    The dtype kind (see kind()) of a column of values of type t.
+    """
+    if issubclass(t, bool):
+        return "b"
+    if issubclass(t, int):
+        return "i"
+    if issubclass(t, float):
+        return "f"
+    if issubclass(t, str):
+        return "U"
+    return "O"
+
+def lookup(record: object, path: JSONPath) -> object:
+    """
+    The value at path in record, as "var" would read it, or None.
+    """
+    for key in path:
+        match key:
+            case str() if isinstance(record, Mapping) and key in record:
+                record = record[key]
+            case int() if isinstance(record, Sequence) and not isinstance(record, str) and -len(record) <= key < len(record):
+                record = record[key]
+            case _:
+                return None
+    match record:
+        case Boolean():
+            # Otherwise NumPy would take it for the int it subclasses
+            return bool(record)
+        case _:
+            return record
+
+def place(row: dict[str, object], path: JSONPath, value: object, column: str):
+    """
+    Puts value at path in row, so that lookup() finds it there, creating
+    dicts (for string keys) and lists (for integer keys) on the way.
+    """
+    container: object = row
+    for i, key in enumerate(path):
+        last = i == len(path) - 1
+        new = None if last else {} if isinstance(path[i + 1], str) else []
+        match container, key:
+            case dict(), str():
+                if last:
+                    container[key] = value
+                else:
+                    container = container.setdefault(key, new)
+            case list(), int() if key >= 0:
+                container.extend([None] * (key + 1 - len(container)))
+                if last:
+                    container[key] = value
+                else:
+                    if container[key] is None:
+                        container[key] = new
+                    container = container[key]
+            case _:
+                raise ValueError(f"Cannot build records with a column {column!r} alongside the other columns")
+
+class Vectorizer(Protocol):
+    """
+    A Vectorizer receives an operator's unevaluated arg, and the Columns,
+    and returns the result of the operator for every record, as an array.
+    """
+    def __call__(self, arg: JSON, columns: Columns) -> np.ndarray: ...
+
+vectorizers: dict[str, Vectorizer] = {}
+
+def vectorizer(key: str):
+    def decorator(v: Vectorizer) -> Vectorizer:
+        vectorizers[key] = v
+        return v
+    return decorator
+
+def kind(a: np.ndarray) -> str:
+    """
+    The JSON type of the values of a, as a dtype kind: "b" (Boolean), "i"
+    (Integer), "f" (Float), or "U" (String).
+    """
+    return "i" if a.dtype.kind == "u" else a.dtype.kind
+
+def truthy(a: np.ndarray) -> np.ndarray:
+    match kind(a):
+        case "b":
+            return a
+        case "U":
+            return a != ""
+        case _:
+            return a != 0
+
+def args(arg: JSON, columns: Columns) -> list[np.ndarray]:
+    match arg:
+        case Array():
+            return [columns.vectorize(item) for item in arg]
+        case _:
+            return [columns.vectorize(arg)]
+
+def comparable(left: np.ndarray, right: np.ndarray):
+    """
+    Raises Unvectorizable unless left and right compare in NumPy exactly as
+    they would in cmp(), i.e. both are numeric, or both are strings.
+    """
+    if (kind(left) == "U") != (kind(right) == "U"):
+        raise Unvectorizable
+    exact(left, right)
+
+def exact(*values: np.ndarray):
+    """
+    Raises Unvectorizable if NumPy would convert some of values from integers
+    to float64 inexactly, i.e. if some are floats, and some are integers
+    beyond 2 ** 53.
+    """
+    if any(kind(value) == "f" for value in values) and any(
+        kind(value) == "i" and np.any((value > 2 ** 53) | (value < -2 ** 53))
+        for value in values
+    ):
+        raise Unvectorizable
+
+@vectorizer("var")
+def v_var(arg: JSON, columns: Columns) -> np.ndarray:
+    match arg:
+        case String() as key if key:
+            pass
+        case Array([String() as key, *_]) if key and len(arg) <= 2:
+            # A column has a value for every record, so a default never applies
+            pass
+        case _:
+            raise Unvectorizable
+    return columns.column(key)
+
+def comparison(compare: Callable[[np.ndarray, np.ndarray], np.ndarray], between: bool):
+    def v(arg: JSON, columns: Columns) -> np.ndarray:
+        match args(arg, columns):
+            case [left, right]:
+                comparable(left, right)
+                return compare(left, right)
+            case [left, middle, right] if between:
+                comparable(left, middle)
+                comparable(middle, right)
+                return compare(left, middle) & compare(middle, right)
+            case _:
+                raise Unvectorizable
+    return v
+
+vectorizer("==")(comparison(np.equal, between=False))
+vectorizer("!=")(comparison(np.not_equal, between=False))
+vectorizer("<")(comparison(np.less, between=True))
+vectorizer("<=")(comparison(np.less_equal, between=True))
+vectorizer(">")(comparison(np.greater, between=True))
+vectorizer(">=")(comparison(np.greater_equal, between=True))
+
+@vectorizer("===")
+def v_eq_eq(arg: JSON, columns: Columns) -> np.ndarray:
+    match args(arg, columns):
+        case [left, right] if kind(left) == kind(right):
+            return np.equal(left, right)
+        case [left, right]:
+            comparable(left, right)
+            return np.zeros(np.broadcast_shapes(left.shape, right.shape), dtype=bool)
+        case _:
+            raise Unvectorizable
+
+@vectorizer("!==")
+def v_neq_eq(arg: JSON, columns: Columns) -> np.ndarray:
+    return ~v_eq_eq(arg, columns)
+
+@vectorizer("!")
+def v_not(arg: JSON, columns: Columns) -> np.ndarray:
+    match arg:
+        case Array([value]):
+            return ~truthy(columns.vectorize(value))
+        case Array(_):
+            raise Unvectorizable
+        case _:
+            return ~truthy(columns.vectorize(arg))
+
+@vectorizer("!!")
+def v_not_not(arg: JSON, columns: Columns) -> np.ndarray:
+    return ~v_not(arg, columns)
+
+def junction(keep_going: Callable[[np.ndarray], np.ndarray]):
+    """
+    "and" and "or" return the first value which stops them (falsy for "and",
+    truthy for "or"), or else the last value. Values of different types can't
+    share an array, so this only vectorizes when all the values have one type.
+    """
+    def v(arg: JSON, columns: Columns) -> np.ndarray:
+        match arg:
+            case Array([_, *_]):
+                values = args(arg, columns)
+            case _:
+                raise Unvectorizable
+        if len({kind(value) for value in values}) != 1:
+            raise Unvectorizable
+        *values, result = values
+        for value in reversed(values):
+            result = np.where(keep_going(value), result, value)
+        return result
+    return v
+
+vectorizer("and")(junction(truthy))
+vectorizer("or")(junction(lambda value: ~truthy(value)))
+
+def numbers(arg: JSON, columns: Columns) -> list[np.ndarray]:
+    values = args(arg, columns)
+    if any(kind(value) not in "if" for value in values):
+        raise Unvectorizable
+    exact(*values)
+    return values
+
+def checked(result: np.ndarray, estimate: np.ndarray) -> np.ndarray:
+    """
+    Integers don't overflow in JSONLogic, but they do in NumPy; so integer
+    results whose float64 estimate gets anywhere near the limit are handed
+    back to the scalar evaluator.
+    """
+    if kind(result) == "i" and np.any(np.abs(estimate) >= 2.0 ** 62):
+        raise Unvectorizable
+    return result
+
+@vectorizer("+")
+def v_add(arg: JSON, columns: Columns) -> np.ndarray:
+    values = numbers(arg, columns)
+    result, estimate = np.asarray(0), np.asarray(0.0)
+    for value in values:
+        result, estimate = result + value, estimate + np.abs(value.astype(float))
+    return checked(result, estimate)
+
+@vectorizer("*")
+def v_mul(arg: JSON, columns: Columns) -> np.ndarray:
+    values = numbers(arg, columns)
+    result, estimate = np.asarray(1), np.asarray(1.0)
+    for value in values:
+        result, estimate = result * value, estimate * value.astype(float)
+    return checked(result, estimate)
+
+@vectorizer("-")
+def v_sub(arg: JSON, columns: Columns) -> np.ndarray:
+    match numbers(arg, columns):
+        case [value]:
+            return checked(-value, value.astype(float))
+        case [left, right]:
+            return checked(left - right, np.abs(left.astype(float)) + np.abs(right.astype(float)))
+        case _:
+            raise Unvectorizable
+
+@vectorizer("/")
+def v_div(arg: JSON, columns: Columns) -> np.ndarray:
+    match numbers(arg, columns):
+        case [left, right] if np.all(right != 0):
+            return np.true_divide(left, right)
+        case _:
+            # Division by zero raises, rather than giving inf
+            raise Unvectorizable
+
+@vectorizer("in")
+def v_in(arg: JSON, columns: Columns) -> np.ndarray:
+    match arg:
+        case Array([needle, Array() as haystack]) if len(haystack) > 0:
+            needle = columns.vectorize(needle)
+            values = [columns.vectorize(item) for item in haystack]
+            for value in values:
+                comparable(needle, value)
+            return np.isin(needle, np.asarray(values))
+        case _:
+            raise Unvectorizable
+
+def evaluate_columns(
+    logic: object,
+    data: Mapping[str, Sequence[object] | np.ndarray] | Sequence[Mapping[str, object]],
+) -> np.ndarray:
+    """
+    Evaluates logic against many records at once, and returns an array of
+    the results, one per record.
+
+    data is either a mapping from var paths (e.g. "user.age") to columns of
+    values, or a list of records (which will be transposed into columns).
+
+    If logic can be vectorized, the result is an array of booleans, numbers,
+    or strings. Otherwise, logic is evaluated against one record at a time,
+    and the result is an array (of dtype object) of JSON values.
+    """
+    logic = JSON(logic)
+    columns = Columns(data)
+    try:
+        result = columns.vectorize(logic)
+    except Unvectorizable:
+        results = np.empty(columns.n, dtype=object)
+        for i, value in enumerate(compile(logic).map(columns.rows())):
+            results[i] = value
+        return results
+    return np.array(np.broadcast_to(result, (columns.n,)))
@@ -0,0 +1,571 @@
+"""
+Compilation of JSONLogic into reusable rule objects.
+
+evaluate() interprets its logic from scratch on every call: it re-wraps the
+logic as JSON, re-matches the shape of every node, and looks up every
+operator in the registry. compile() does all of that once, producing a
+CompiledRule: a tree of closures which can be called against any number of
+data documents.
+
+Errors which depend only on the shape of the logic (an unrecognized
+operator, or an "if" whose arg is not an Array) are detected at compile
+time, but are raised when the offending node is actually evaluated, so that
+a CompiledRule behaves exactly like evaluate() (which never reaches, and so
+never complains about, e.g. the untaken branch of an "if").
+"""
+
+from typing import Callable, Iterable, Iterator, Protocol
+
+from .budget import Budget
+from .json import JSON, Null, Boolean, Integer, String, Array, Object, Numbers, check_numbers, number_mode
+from .jsonlogic import Meter, operators, eager_operators, meter, metering
+from .jsonpath import JSONPath
+from .operators import stream_stage, streamable, wrong_arity, wrong_type
+from .tracing import Tracer
+
+type Node = Callable[[JSON], JSON]
+
+class Compiler(Protocol):
+    """
+    A Compiler receives an operator's unevaluated arg, and a function for
+    compiling sub-logic, and returns a Node which, given the data, does the
+    same thing as the operator would.
+    """
+    def __call__(self, arg: JSON, compile: Callable[[JSON], Node]) -> Node: ...
+
+compilers: dict[str, Compiler] = {}
+
+def compiler(key: str):
+    """
+    Decorator for Compiler registration. Use like:
+
+    @compiler("if")
+    def compile_if(arg: JSON, compile: Callable[[JSON], Node]) -> Node:
+        ...
+
+    Operators without a registered Compiler are still compiled: those
+    registered with eval_arg=True have their arg compiled, and the rest are
+    called with their arg as-is, exactly as evaluate() would call them.
+    """
+
+    def decorator(c: Compiler) -> Compiler:
+        if key in compilers:
+            raise TypeError
+        compilers[key] = c
+        return c
+
+    return decorator
+
+def raises(error: Callable[[], Exception]) -> Node:
+    """
+    Returns a Node which raises a (fresh) error whenever it is evaluated.
+    """
+
+    def node(data: JSON) -> JSON:
+        raise error()
+
+    return node
+
+def is_constant(logic: JSON) -> bool:
+    match logic:
+        case Object() if len(logic) == 1:
+            return False
+        case Object():
+            return all(is_constant(value) for value in logic.values())
+        case Array():
+            return all(is_constant(item) for item in logic)
+        case _:
+            return True
+
+def compile_node(logic: JSON, compile: Callable[[JSON], Node] | None = None) -> Node:
+    """
+    Compiles logic into a Node which, given the data, returns the same
+    result as evaluate(logic, data).
+
+    Sub-logic is compiled with compile, which is compile_node itself unless
+    given, so that a caller can intercept (e.g. share) the compilation of
+    every node in the tree.
+    """
+    compile = compile or compile_node
+
+    if is_constant(logic):
+        return lambda data: logic
+
+    match logic:
+        case Object() if len(logic) == 1:
+            op, arg = next(iter(logic.items()))
+            if c := compilers.get(op):
+                return c(arg, compile)
+            elif operator := eager_operators.get(op):
+                return compile_eager(operator, arg, compile)
+            elif operator := operators.get(op):
+                return compile_lazy(operator, arg)
+            else:
+                path = logic.path
+                return raises(lambda: ValueError(f"{path}: Unrecognized operator: '{op}'"))
+        case Object():
+            path = logic.path
+            values = [
+                (key, value.path, compile(value))
+                for key, value in logic.items()
+            ]
+
+            def compiled_object(data: JSON) -> JSON:
+                return Object({
+                    key: JSON(node(data), value_path)
+                    for key, value_path, node in values
+                }, path=path)
+
+            return compiled_object
+        case Array():
+            path = logic.path
+            items = [
+                (item.path, compile(item))
+                for item in logic
+            ]
+
+            def compiled_array(data: JSON) -> JSON:
+                return Array([
+                    JSON(node(data), item_path)
+                    for item_path, node in items
+                ], path=path)
+
+            return compiled_array
+        case _:
+            return lambda data: logic
+
+def compile_eager(operator: Callable[[JSON, JSON], JSON], arg: JSON, compile: Callable[[JSON], Node] = compile_node) -> Node:
+    path = arg.path
+    args = compile(arg)
+
+    def node(data: JSON) -> JSON:
+        return JSON(operator(args(data), data), path=path)
+
+    return node
+
+def compile_lazy(operator: Callable[[JSON, JSON], JSON], arg: JSON) -> Node:
+    path = arg.path
+
+    def node(data: JSON) -> JSON:
+        return JSON(operator(arg, data), path=path)
+
+    return node
+
+@compiler("var")
+def compile_var(arg: JSON, compile: Callable[[JSON], Node]) -> Node:
+    """
+    The overwhelmingly common case of "var" is a literal key (and maybe a
+    literal default), whose path can be parsed once, here, rather than on
+    every evaluation. Anything else is compiled like any other operator.
+    """
+    path = arg.path
+    match arg:
+        case String() | Integer() as key:
+            default = Null()
+        case Array([String() | Integer() as key]):
+            default = Null()
+        case Array([String() | Integer() as key, default]) if is_constant(default):
+            pass
+        case _:
+            return compile_eager(eager_operators["var"], arg, compile)
+
+    match key:
+        case String(""):
+            return compile_eager(eager_operators["var"], arg, compile)
+        case String():
+            key_path = JSONPath.from_dot_notation(key)
+        case Integer():
+            key_path = JSONPath([key])
+
+    def node(data: JSON) -> JSON:
+        try:
+            return JSON(data.at_path(key_path), path=path)
+        except (KeyError, IndexError, ValueError):
+            return JSON(default, path=path)
+
+    return node
+
+@compiler("if")
+@compiler("?:")
+def compile_if(arg: JSON, compile: Callable[[JSON], Node]) -> Node:
+    path = arg.path
+    match arg:
+        case Array([]):
+            return lambda data: Null(path=path)
+        case Array([*args]):
+            branches = [
+                (compile(condition), compile(then))
+                for condition, then in zip(args[0::2], args[1::2])
+            ]
+            otherwise = compile(args[-1]) if len(args) % 2 else None
+
+            def node(data: JSON) -> JSON:
+                for condition, then in branches:
+                    if condition(data):
+                        return JSON(then(data), path=path)
+                if otherwise:
+                    return JSON(otherwise(data), path=path)
+                return Null(path=path)
+
+            return node
+        case _:
+            return raises(lambda: wrong_type(arg, Array))
+
+@compiler("or")
+def compile_or(arg: JSON, compile: Callable[[JSON], Node]) -> Node:
+    path = arg.path
+    match arg:
+        case Array([_, *_]):
+            first, *rest = [compile(item) for item in arg]
+
+            def node(data: JSON) -> JSON:
+                result = first(data)
+                for n in rest:
+                    if result:
+                        break
+                    result = n(data)
+                return JSON(result, path=path)
+
+            return node
+        case Array(_):
+            return raises(lambda: wrong_arity(arg, "one or more"))
+        case _:
+            return raises(lambda: wrong_type(arg, Array))
+
+@compiler("and")
+def compile_and(arg: JSON, compile: Callable[[JSON], Node]) -> Node:
+    path = arg.path
+    match arg:
+        case Array([_, *_]):
+            first, *rest = [compile(item) for item in arg]
+
+            def node(data: JSON) -> JSON:
+                result = first(data)
+                for n in rest:
+                    if not result:
+                        break
+                    result = n(data)
+                return JSON(result, path=path)
+
+            return node
+        case Array(_):
+            return raises(lambda: wrong_arity(arg, "one or more"))
+        case _:
+            return raises(lambda: wrong_type(arg, Array))
+
+def compile_stream(logic: Object, compile: Callable[[JSON], Node]) -> Callable[[JSON], Iterator[JSON]]:
+    """
+    Compiles a streamable "map" or "filter" into a function which, given the
+    data, returns the same iterator as stream(logic, data).
+    """
+    op, items, fn = stream_stage(logic)
+    each, fn_node = compile_each(items, compile, null=op == "map"), compile(fn)
+    if op == "map":
+        return lambda data: map(fn_node, each(data))
+    return lambda data: filter(fn_node, each(data))
+
+def compile_each(items: JSON, compile: Callable[[JSON], Node], null: bool = False) -> Callable[[JSON], Iterable[JSON]]:
+    """
+    Compiles the items of an iterating operator into a function which, given
+    the data, returns the same as each(items, data).
+    """
+    if streamable(items):
+        return compile_stream(items, compile)
+    items_node = compile(items)
+
+    def each(data: JSON) -> Iterable[JSON]:
+        match items_node(data):
+            case Null() if null:
+                return ()
+            case Array(_) as xs:
+                return xs
+            case _:
+                raise wrong_type(items, Array)
+
+    return each
+
+@compiler("map")
+def compile_map(arg: JSON, compile: Callable[[JSON], Node]) -> Node:
+    path = arg.path
+    match arg:
+        case Array([items, fn]):
+            each, fn_node = compile_each(items, compile, null=True), compile(fn)
+
+            def node(data: JSON) -> JSON:
+                return Array([fn_node(x) for x in each(data)], path=path)
+
+            return node
+        case Array(_):
+            return raises(lambda: wrong_arity(arg, "two"))
+        case _:
+            return raises(lambda: wrong_type(arg, Array))
+
+@compiler("filter")
+def compile_filter(arg: JSON, compile: Callable[[JSON], Node]) -> Node:
+    path = arg.path
+    match arg:
+        case Array([items, fn]):
+            each, fn_node = compile_each(items, compile), compile(fn)
+
+            def node(data: JSON) -> JSON:
+                return Array([x for x in each(data) if fn_node(x)], path=path)
+
+            return node
+        case Array(_):
+            return raises(lambda: wrong_arity(arg, "two"))
+        case _:
+            return raises(lambda: wrong_type(arg, Array))
+
+@compiler("reduce")
+def compile_reduce(arg: JSON, compile: Callable[[JSON], Node]) -> Node:
+    path = arg.path
+    match arg:
+        case Array([items, fn, initial]) if streamable(items):
+            stream, fn_node, initial_node = compile_stream(items, compile), compile(fn), compile(initial)
+
+            def streamed_node(data: JSON) -> JSON:
+                xs = stream(data)
+                value = Object({
+                    "current": None,
+                    "accumulator": JSON(initial_node(data), path=initial.path)
+                })
+                for x in xs:
+                    value["current"] = x
+                    value["accumulator"] = fn_node(value)
+                return JSON(value["accumulator"], path=path)
+
+            return streamed_node
+        case Array([items, fn, initial]):
+            items_node, fn_node, initial_node = compile(items), compile(fn), compile(initial)
+
+            def node(data: JSON) -> JSON:
+                xs = JSON(items_node(data), path=items.path)
+                accumulator = JSON(initial_node(data), path=initial.path)
+                match xs:
+                    case Null():
+                        return JSON(accumulator, path=path)
+                    case Array(_):
+                        value = Object({
+                            "current": None,
+                            "accumulator": accumulator
+                        })
+                        for x in xs:
+                            value["current"] = x
+                            value["accumulator"] = fn_node(value)
+                        return JSON(value["accumulator"], path=path)
+                    case _:
+                        raise wrong_type(items, Array)
+
+            return node
+        case Array(_):
+            return raises(lambda: wrong_arity(arg, "three"))
+        case _:
+            return raises(lambda: wrong_type(arg, Array))
+
+@compiler("all")
+def compile_all(arg: JSON, compile: Callable[[JSON], Node]) -> Node:
+    path = arg.path
+    match arg:
+        case Array([items, fn]):
+            each, fn_node = compile_each(items, compile), compile(fn)
+
+            def node(data: JSON) -> JSON:
+                # No items is false, which is stupid, but it's according to spec
+                empty = True
+                for x in each(data):
+                    if not fn_node(x):
+                        return Boolean(False, path=path)
+                    empty = False
+                return Boolean(not empty, path=path)
+
+            return node
+        case Array(_):
+            return raises(lambda: wrong_arity(arg, "two"))
+        case _:
+            return raises(lambda: wrong_type(arg, Array))
+
+@compiler("some")
+def compile_some(arg: JSON, compile: Callable[[JSON], Node]) -> Node:
+    path = arg.path
+    match arg:
+        case Array([items, fn]):
+            each, fn_node = compile_each(items, compile), compile(fn)
+
+            def node(data: JSON) -> JSON:
+                return Boolean(any(map(fn_node, each(data))), path=path)
+
+            return node
+        case Array(_):
+            return raises(lambda: wrong_arity(arg, "two"))
+        case _:
+            return raises(lambda: wrong_type(arg, Array))
+
+@compiler("none")
+def compile_none(arg: JSON, compile: Callable[[JSON], Node]) -> Node:
+    path = arg.path
+    match arg:
+        case Array([items, fn]):
+            each, fn_node = compile_each(items, compile), compile(fn)
+
+            def node(data: JSON) -> JSON:
+                return Boolean(not any(map(fn_node, each(data))), path=path)
+
+            return node
+        case Array(_):
+            return raises(lambda: wrong_arity(arg, "two"))
+        case _:
+            return raises(lambda: wrong_type(arg, Array))
+
+@compiler("in")
+def compile_in(arg: JSON, compile: Callable[[JSON], Node]) -> Node:
+    path = arg.path
+    match arg:
+        case Array([needle, haystack]) if streamable(haystack):
+            needle_node, stream = compile(needle), compile_stream(haystack, compile)
+
+            def node(data: JSON) -> JSON:
+                n = needle_node(data)
+                return Boolean(any(x is n or x == n for x in stream(data)), path=path)
+
+            return node
+        case _:
+            return compile_eager(eager_operators["in"], arg, compile)
+
+def compile_metered(logic: JSON) -> Node:
+    """
+    Like compile_node, but every operation is passed through the Meter of
+    the evaluation in progress (see jsonlogic.jsonlogic.Meter), which there
+    must be.
+    """
+    node = compile_node(logic, compile_metered)
+    match logic:
+        case Object() if len(logic) == 1 and next(iter(logic)) in operators:
+            # As in evaluate(), an unrecognized operator raises unmetered
+            [(op, arg)] = logic.items()
+            path = logic.path
+
+            def metered_node(data: JSON) -> JSON:
+                return meter.get().call(op, path, arg, node, data)  # type: ignore[union-attr]
+
+            return metered_node
+        case _:
+            return node
+
+class CompiledRule:
+    """
+    A JSONLogic rule which has been compiled once, and can then be
+    evaluated against any number of data documents. Calling a CompiledRule
+    gives the same result (or raises the same error) as evaluate():
+
+    rule = compile({"<": [{"var": "age"}, 18]})
+    rule({"age": 12})  # == evaluate({"<": [{"var": "age"}, 18]}, {"age": 12})
+
+    A rule compiled with numbers="float" is always evaluated as if by
+    evaluate(..., numbers="float"), i.e. with native floats.
+
+    Calling a rule with a budget (or a tracer) evaluates it as evaluate(...,
+    budget=..., tracer=...) would, by a separately built (and slower) Node
+    which meters each operation (see build_metered); the Node for other
+    calls is unaffected.
+    """
+
+    logic: JSON
+    numbers: Numbers
+    _metered_node: Node | None = None
+
+    def __init__(self, logic: object, numbers: Numbers = "decimal"):
+        self.numbers = check_numbers(numbers)
+        token = number_mode.set(self.numbers)
+        try:
+            self.logic = JSON(logic)
+        finally:
+            number_mode.reset(token)
+        self._node = self.build(self.logic)
+
+    def build(self, logic: JSON) -> Node:
+        """
+        Compiles logic into the Node which the rule evaluates.
+        """
+        return compile_node(logic)
+
+    def build_metered(self, logic: JSON) -> Node:
+        """
+        Compiles logic into the Node which the rule evaluates when called
+        with a budget or a tracer, which passes each operation through the
+        Meter of the evaluation in progress.
+        """
+        return compile_metered(logic)
+
+    def __call__(self, data: object, *, budget: Budget | None = None, tracer: Tracer | None = None) -> JSON:
+        if (budget is not None or tracer is not None) and (metered := metering(budget, tracer)) is not None:
+            return self.call_metered(metered, data)
+        if number_mode.get() == self.numbers:
+            return self._node(JSON(data))
+        token = number_mode.set(self.numbers)
+        try:
+            return self._node(JSON(data))
+        finally:
+            number_mode.reset(token)
+
+    def call_metered(self, metered: Meter, data: object) -> JSON:
+        """
+        Evaluates the rule against data, with each operation passed through
+        metered.
+        """
+        if self._metered_node is None:
+            token = number_mode.set(self.numbers)
+            try:
+                self._metered_node = self.build_metered(self.logic)
+            finally:
+                number_mode.reset(token)
+        numbers_token = number_mode.set(self.numbers)
+        meter_token = meter.set(metered)
+        try:
+            return self._metered_node(JSON(data))
+        finally:
+            meter.reset(meter_token)
+            number_mode.reset(numbers_token)
+
+    def map(self, records: Iterable[object], *, budget: Budget | None = None, tracer: Tracer | None = None) -> Iterator[JSON]:
+        """
+        Evaluates the rule against each of records in turn, yielding the
+        results in order. With a budget, each record has a budget of its own;
+        with a tracer, each record is a separate evaluation to sample.
+        """
+        if budget is not None or tracer is not None:
+            for record in records:
+                yield self(record, budget=budget, tracer=tracer)
+            return
+        node, numbers = self._node, self.numbers
+        for record in records:
+            # Set for each record, rather than around the loop, so that the
+            # mode doesn't leak out to the caller between results
+            token = number_mode.set(numbers)
+            try:
+                result = node(JSON(record))
+            finally:
+                number_mode.reset(token)
+            yield result
+
+    def __repr__(self):
+        if self.numbers != "decimal":
+            return f"CompiledRule({self.logic!r}, numbers={self.numbers!r})"
+        return f"CompiledRule({self.logic!r})"
+
+def compile(logic: object, *, numbers: Numbers = "decimal") -> CompiledRule:
+    return CompiledRule(logic, numbers)
+
+def evaluate_many(
+    logic: object,
+    records: Iterable[object],
+    *,
+    numbers: Numbers = "decimal",
+    budget: Budget | None = None,
+    tracer: Tracer | None = None,
+) -> Iterator[JSON]:
+    """
+    Like (evaluate(logic, record, numbers=numbers, budget=budget,
+    tracer=tracer) for record in records), but the logic is only compiled
+    once, up front, rather than interpreted for every record.
+    """
+    return compile(logic, numbers=numbers).map(records, budget=budget, tracer=tracer)
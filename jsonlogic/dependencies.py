@@ -0,0 +1,268 @@
+"""
+Analysis of which parts of the data a rule may read, and projection of data
+down to just those parts.
+
+dependencies(logic) walks a rule, and returns the paths (relative to the
+data) of every value it may read, through "var", "missing", and
+"missing_some". A rule depends on the whole of the value at each path,
+including everything below it. Within "map", "filter", "reduce", "all",
+"some", and "none", whose function is evaluated against each item of an
+array rather than against the data, paths go through the array with a
+wildcard: e.g. {"map": [{"var": "items"}, {"var": "price"}]} depends on
+$.items[*].price. A "var" whose key is computed could read anything in the
+data its evaluated against, and so depends on the whole of it.
+
+project(data, paths) then builds a copy of data with only the values at
+those paths, against which the rule gives exactly the same result as
+against data, e.g. to avoid converting a large payload to JSON, or to fetch
+only the columns of a record which a rule actually uses.
+"""
+
+from typing import Iterable, Literal, Mapping, NamedTuple, Sequence
+
+from .compiler import is_constant
+from .json import JSON, Null, Integer, String, Array, Object
+from .jsonpath import JSONPath, Wildcard, wildcard
+from .operators import wrong_type
+from .optimizer import pure_operators
+
+class ReduceScope(NamedTuple):
+    """
+    The data of a reduce's function: {"current": item, "accumulator": ...}.
+    The accumulator is computed from the initial value and earlier results,
+    whose dependencies are already counted, so reading it reads no new data.
+    """
+    current: JSONPath | None
+
+# What a sub-logic's "var"s read: the data at some path, a ReduceScope, or
+# None for values which aren't in the data (e.g. the items of a literal
+# Array, or of a computed one, whose dependencies are already counted)
+type Scope = JSONPath | ReduceScope | None
+
+# A trie of paths, where True marks the end of a path (below which everything
+# is kept)
+type Trie = dict[int | str | Wildcard, Trie] | Literal[True]
+
+def dependencies(logic: object) -> frozenset[JSONPath]:
+    """
+    The paths of the values in the data which logic may read. No path is
+    below another in the set.
+    """
+    return minimal(depends(JSON(logic), JSONPath.empty()))
+
+def depends(logic: JSON, scope: Scope) -> set[JSONPath]:
+    match logic:
+        case Object() if len(logic) == 1:
+            [(op, arg)] = logic.items()
+        case Object():
+            return set().union(*(depends(value, scope) for value in logic.values()))
+        case Array():
+            return set().union(*(depends(item, scope) for item in logic))
+        case _:
+            return set()
+
+    match op, arg:
+        case "var", _:
+            match key_path(arg):
+                case JSONPath() as path:
+                    read = resolve(scope, path)
+                    paths = {read} if read is not None else set()
+                    # A literal key's default is the only part evaluated
+                    return paths | (depends(arg[1], scope) if isinstance(arg, Array) and len(arg) == 2 else set())
+                case _:
+                    return depends(arg, scope) | whole(scope)
+        case "missing", _:
+            keys = arg if isinstance(arg, Array) else [arg]
+            if not is_constant(arg) or not all(isinstance(key, (String, Integer)) for key in keys):
+                return depends(arg, scope) | whole(scope)
+            return found(scope, keys)
+        case "missing_some", Array([_, Array() as keys]) if is_constant(arg) and all(isinstance(key, (String, Integer)) for key in keys):
+            return found(scope, keys)
+        case "missing_some", _:
+            return depends(arg, scope) | whole(scope)
+        case ("map" | "all" | "some" | "none"), Array([items, fn]):
+            paths, item_scope = iterated(items, scope)
+            return paths | per_item(fn, item_scope)
+        case "filter", Array([items, fn]):
+            # The result is (some of) the items themselves
+            paths, item_scope = iterated(items, scope)
+            return paths | per_item(fn, item_scope) | whole(item_scope)
+        case "reduce", Array([items, fn, initial]):
+            paths, item_scope = iterated(items, scope)
+            return paths | depends(initial, scope) | per_item(fn, ReduceScope(item_scope))
+        case _ if op in pure_operators or op == "log":
+            return depends(arg, scope)
+        case _:
+            # Any other operator (a custom one, or an unrecognized one, which
+            # raises whatever the data) may read anything
+            return depends(arg, scope) | whole(scope)
+
+def iterated(items: JSON, scope: Scope) -> tuple[set[JSONPath], JSONPath | None]:
+    """
+    The dependencies of the items of an iterating operator, on the
+    assumption that only the items which its function reads are used, and
+    the Scope of those items.
+    """
+    match items:
+        case Object() if len(items) == 1 and (path := key_path(items.get("var"))) is not None:
+            var_arg = items["var"]
+            paths = depends(var_arg[1], scope) if isinstance(var_arg, Array) and len(var_arg) == 2 else set()
+            array = resolve(scope, path)
+            return paths, (JSONPath([*array, wildcard]) if array is not None else None)
+        case Object() if len(items) == 1 and isinstance(filter_arg := items.get("filter"), Array) and len(filter_arg) == 2:
+            # The items of a filter are (some of) the items of its own items
+            inner, fn = filter_arg
+            paths, item_scope = iterated(inner, scope)
+            return paths | depends(fn, item_scope), item_scope
+        case _:
+            return depends(items, scope), None
+
+def per_item(fn: JSON, item_scope: Scope) -> set[JSONPath]:
+    """
+    The dependencies of fn, evaluated against each item. Even if fn reads
+    nothing, the number of items (at least) matters.
+    """
+    paths = depends(fn, item_scope)
+    if not paths:
+        match item_scope:
+            case JSONPath([*array, Wildcard()]):
+                return {JSONPath(array)}
+            case ReduceScope(JSONPath([*array, Wildcard()])):
+                return {JSONPath(array)}
+    return paths
+
+def key_path(arg: JSON | None) -> JSONPath | None:
+    """
+    The path which a "var" with arg reads, if its key is literal.
+    """
+    match arg:
+        case Null() | String() | Integer():
+            return path_of(arg)
+        case Array([]):
+            return JSONPath.empty()
+        case Array([Null() | String() | Integer() as key, *rest]) if len(rest) <= 1:
+            return path_of(key)
+        case _:
+            return None
+
+def path_of(key: JSON) -> JSONPath:
+    match key:
+        case Null() | String(""):
+            return JSONPath.empty()
+        case String():
+            try:
+                return JSONPath.from_dot_notation(key)
+            except ValueError:
+                return JSONPath([key])
+        case Integer():
+            return JSONPath([key])
+        case _:
+            raise wrong_type(key, String, Integer)
+
+def resolve(scope: Scope, path: JSONPath) -> JSONPath | None:
+    """
+    The path in the data of the value at path in scope, if it's in the data.
+    """
+    match scope:
+        case JSONPath():
+            return JSONPath([*scope, *path])
+        case ReduceScope(current):
+            if not path:
+                return current
+            if path[0] == "current":
+                return resolve(current, JSONPath(path[1:]))
+            return None
+        case _:
+            return None
+
+def found(scope: Scope, keys: Iterable[JSON]) -> set[JSONPath]:
+    return {
+        path
+        for key in keys
+        if (path := resolve(scope, path_of(key))) is not None
+    }
+
+def whole(scope: Scope) -> set[JSONPath]:
+    match scope:
+        case JSONPath():
+            return {scope}
+        case ReduceScope(current):
+            return whole(current)
+        case _:
+            return set()
+
+def minimal(paths: set[JSONPath]) -> frozenset[JSONPath]:
+    """
+    Drops each of paths which is below another (and so already included).
+    """
+    kept: list[JSONPath] = []
+    for path in sorted(paths, key=len):
+        if not any(covers(prefix, path) for prefix in kept):
+            kept.append(path)
+    return frozenset(kept)
+
+def covers(prefix: JSONPath, path: JSONPath) -> bool:
+    return len(prefix) <= len(path) and all(
+        isinstance(key, Wildcard) or key == other
+        for key, other in zip(prefix, path)
+    )
+
+def project(data: object, paths: Iterable[JSONPath]) -> object:
+    """
+    Returns a copy of data with only the values at paths (which it shares
+    with data, rather than copying), and the containers on the way to them.
+    Arrays keep their length, with None for the items which aren't needed,
+    so that e.g. a negative index still reads the same item.
+    """
+    trie: dict[int | str | Wildcard, Trie] = {}
+    for path in sorted(paths, key=len):
+        if not path:
+            return data
+        *parents, last = path
+        node: Trie = trie
+        for key in parents:
+            node = node.setdefault(key, {})
+            if node is True:
+                break
+        else:
+            node[last] = True
+    return projected(data, trie)
+
+def projected(value: object, trie: Trie) -> object:
+    if trie is True:
+        return value
+    match value:
+        case str():
+            return value
+        case _ if isinstance(value, Mapping):
+            result = {}
+            for key in value:
+                if (child := merged(trie.get(key), trie.get(wildcard))) is not None:
+                    result[key] = projected(value[key], child)
+            return result
+        case _ if isinstance(value, Sequence):
+            # Indexes may be negative, i.e. from the end
+            children: dict[int, Trie] = {}
+            for key, child in trie.items():
+                if isinstance(key, int) and -len(value) <= key < len(value):
+                    index = key % len(value)
+                    children[index] = merged(children.get(index), child)  # type: ignore[assignment]
+            return [
+                projected(item, child) if (child := merged(children.get(i), trie.get(wildcard))) is not None else None
+                for i, item in enumerate(value)
+            ]
+        case _:
+            return value
+
+def merged(a: Trie | None, b: Trie | None) -> Trie | None:
+    if a is None:
+        return b
+    if b is None:
+        return a
+    if a is True or b is True:
+        return True
+    children: dict[int | str | Wildcard, Trie] = {}
+    for key in a.keys() | b.keys():
+        if (child := merged(a.get(key), b.get(key))) is not None:
+            children[key] = child
+    return children
@@ -0,0 +1,155 @@
+"""
+Incremental re-evaluation of a rule, as its data changes a little at a time.
+
+An IncrementalRule holds a rule and a data document, and caches the result
+of every operation in the rule which is evaluated against the data, along
+with the paths of the data which the operation depends on (see
+jsonlogic.dependencies). Patching the data (e.g. after the user of a form
+edits a field) only discards the results which depend on the patched paths,
+so re-evaluating the rule only recomputes the affected operations.
+"""
+
+from typing import Mapping
+
+from .compiler import Node, compile_node
+from .dependencies import depends, minimal
+from .json import JSON, Array, Object, Numbers, check_numbers, json_type, number_mode
+from .jsonpath import JSONPath, Wildcard
+
+class IncrementalRule:
+    """
+    A rule, evaluated against data which changes. Use like:
+
+    rule = IncrementalRule({"if": [{"var": "a"}, {"var": "b"}, {"var": "c"}]}, {"a": True, "b": 1})
+    rule.result()  # 1
+    rule.update({"b": 2})  # 2: only the "if" and {"var": "b"} are re-evaluated
+
+    Each result is the same as evaluate(logic, data) for the data as
+    patched so far.
+    """
+
+    logic: JSON
+    data: JSON
+    numbers: Numbers
+
+    def __init__(self, logic: object, data: object, *, numbers: Numbers = "decimal"):
+        self.numbers = check_numbers(numbers)
+        token = number_mode.set(self.numbers)
+        try:
+            self.logic = JSON(logic)
+            self.data = JSON(data)
+        finally:
+            number_mode.reset(token)
+
+        # The cached results, by slot, and the dependencies of each slot
+        self.results: dict[int, JSON] = {}
+        self.dependencies: list[frozenset[JSONPath]] = []
+        self.hits = 0
+        self.misses = 0
+
+        def compile(logic: JSON) -> Node:
+            node = compile_node(logic, compile)
+            match logic:
+                case Object() if len(logic) == 1:
+                    self.dependencies.append(minimal(depends(logic, JSONPath.empty())))
+                    return self.cached(len(self.dependencies) - 1, node)
+                case _:
+                    return node
+
+        self.node = compile(self.logic)
+
+    def cached(self, slot: int, node: Node) -> Node:
+        results = self.results
+
+        def cached_node(data: JSON) -> JSON:
+            # Only results against the data itself are cached, not those
+            # against e.g. the items of a "map"
+            if data is not self.data:
+                return node(data)
+            if (result := results.get(slot)) is not None:
+                self.hits += 1
+                return result
+            self.misses += 1
+            result = results[slot] = node(data)
+            return result
+
+        return cached_node
+
+    def result(self) -> JSON:
+        """
+        Evaluates the rule against the data, re-using every cached result
+        which is still valid.
+        """
+        if number_mode.get() == self.numbers:
+            return self.node(self.data)
+        token = number_mode.set(self.numbers)
+        try:
+            return self.node(self.data)
+        finally:
+            number_mode.reset(token)
+
+    def update(self, patch: Mapping[str | JSONPath, object]) -> JSON:
+        """
+        Sets the value at each path in patch (a JSONPath, or a key in the dot
+        notation of "var"), and returns the new result. Missing Objects on
+        the way to a path are created.
+
+        The data is patched copy-on-write, so values which the data shares
+        with earlier results (or with the caller) are never modified.
+        """
+        data = self.data
+        paths: list[JSONPath] = []
+        token = number_mode.set(self.numbers)
+        try:
+            for key, value in patch.items():
+                path = key if isinstance(key, JSONPath) else JSONPath.from_dot_notation(key)
+                data = patched(data, path, value)
+                paths.append(path)
+        finally:
+            number_mode.reset(token)
+
+        # Only once every path has been patched, so that a patch which raises
+        # leaves the rule as it was
+        self.data = data
+
+        for slot in list(self.results):
+            if any(overlaps(dependency, path) for dependency in self.dependencies[slot] for path in paths):
+                del self.results[slot]
+        return self.result()
+
+    def __repr__(self):
+        return f"IncrementalRule({self.logic!r}, {self.data!r})"
+
+def patched(value: JSON, path: JSONPath, new: object, depth: int = 0) -> JSON:
+    """
+    A copy of value with new at path[depth:], sharing everything else.
+    """
+    if depth == len(path):
+        return JSON(new, path=value.path)
+    key = path[depth]
+    match value, key:
+        case Object(), str():
+            child = value[key] if key in value else Object({}, path=JSONPath([*value.path, key]))
+            copy = Object(value, path=value.path)
+            copy[key] = patched(child, path, new, depth + 1)
+            return copy
+        case Array(), int():
+            copy = Array(value, path=value.path)
+            copy[key] = patched(value[key], path, new, depth + 1)
+            return copy
+        case _:
+            raise ValueError(f"{value.path}: Cannot index {json_type(value).__name__} with {type(key).__name__}")
+
+def overlaps(a: JSONPath, b: JSONPath) -> bool:
+    """
+    Whether the value at a may be (or be within, or contain) the value at b.
+    """
+    for x, y in zip(a, b):
+        if isinstance(x, Wildcard) or isinstance(y, Wildcard):
+            continue
+        # A negative index may be any index, depending on the length
+        if isinstance(x, int) and isinstance(y, int) and (x < 0 or y < 0):
+            continue
+        if x != y:
+            return False
+    return True
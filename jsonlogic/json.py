@@ -2,46 +2,78 @@
 Definitions of JSON types in Python.
 """
 
+import json
+
+from contextvars import ContextVar
 from decimal import Decimal
-from typing import Literal, Mapping, Sequence, Self, final, overload
+from typing import Iterator, Literal, Mapping, Sequence, Self, SupportsIndex, final, overload
 
 from .jsonpath import JSONPath
 
+type Numbers = Literal["decimal", "float"]
+
+# How non-integral numbers are represented: as Floats (exact Decimals) by
+# default, or, when evaluating with numbers="float", as NativeFloats. Floats
+# converted from Python floats, and the results of the arithmetic operators,
+# follow this.
+number_mode: ContextVar[Numbers] = ContextVar("number_mode", default="decimal")
+
+def check_numbers(numbers: str) -> Numbers:
+    match numbers:
+        case "decimal" | "float":
+            return numbers
+        case _:
+            raise ValueError(f"numbers must be 'decimal' or 'float', not {numbers!r}")
+
 class JSON:
+    __slots__ = ()
+
     path: JSONPath
 
     @overload
-    def __new__(cls, value: None = None, path: JSONPath = JSONPath.empty()) -> 'Null': ...
+    def __new__(cls, value: None = None, path: JSONPath | None = None) -> 'Null': ...
+    @overload
+    def __new__(cls, value: 'Null', path: JSONPath | None = None) -> 'Null': ...
     @overload
-    def __new__(cls, value: 'Null', path: JSONPath = JSONPath.empty()) -> 'Null': ...
+    def __new__(cls, value: Literal[True, False] | 'Boolean', path: JSONPath | None = None) -> 'Boolean': ...
     @overload
-    def __new__(cls, value: Literal[True, False] | 'Boolean', path: JSONPath = JSONPath.empty()) -> 'Boolean': ...
+    def __new__(cls, value: int, path: JSONPath | None = None) -> 'Integer': ...
     @overload
-    def __new__(cls, value: int, path: JSONPath = JSONPath.empty()) -> 'Integer': ...
+    def __new__(cls, value: Decimal, path: JSONPath | None = None) -> 'Float': ...
     @overload
-    def __new__(cls, value: float | Decimal, path: JSONPath = JSONPath.empty()) -> 'Float': ...
+    def __new__(cls, value: float, path: JSONPath | None = None) -> 'Float | NativeFloat': ...
     @overload
-    def __new__(cls, value: str, path: JSONPath = JSONPath.empty()) -> 'String': ...
+    def __new__(cls, value: str, path: JSONPath | None = None) -> 'String': ...
     @overload
-    def __new__(cls, value: list | tuple, path: JSONPath = JSONPath.empty()) -> 'Array': ...
+    def __new__(cls, value: list | tuple, path: JSONPath | None = None) -> 'Array': ...
     @overload
-    def __new__(cls, value: Sequence, path: JSONPath = JSONPath.empty()) -> 'Array | Object': ...
+    def __new__(cls, value: Sequence, path: JSONPath | None = None) -> 'Array | Object': ...
     @overload
-    def __new__(cls, value: Mapping, path: JSONPath = JSONPath.empty()) -> 'Object': ...
+    def __new__(cls, value: Mapping, path: JSONPath | None = None) -> 'Object': ...
     @overload
-    def __new__(cls, value: object, path: JSONPath = JSONPath.empty()) -> 'JSON': ...
-    def __new__(cls, value: object = None, path: JSONPath = JSONPath.empty()) -> 'JSON':
+    def __new__(cls, value: object, path: JSONPath | None = None) -> 'JSON': ...
+    def __new__(cls, value: object = None, path: JSONPath | None = None) -> 'JSON':
         match value:
-            case Null():
-                return Null.__new__(Null, None, path)
+            case JSON() if path is None or path == value.path:
+                # Already JSON, so there's nothing to convert
+                return value
             case JSON():
+                # Re-path the value itself; if it's an Array or an Object, its
+                # items are shared rather than copied (see Array.__new__)
                 return type(value).__new__(type(value), value, path)
+
+        if path is None:
+            path = JSONPath.empty()
+
+        match value:
             case None:
                 return Null.__new__(Null, None, path)
             case True | False:
                 return Boolean.__new__(Boolean, value, path)
             case int():
                 return Integer.__new__(Integer, value, path)
+            case float() if number_mode.get() == "float":
+                return NativeFloat.__new__(NativeFloat, value, path)
             case float() | Decimal():
                 return Float.__new__(Float, value, path)
             case str():
@@ -53,30 +85,76 @@ class JSON:
             case _:
                 raise TypeError(f"{path}: Cannot convert {type(value).__name__} to JSON")
     
-    def __init__(self, value: object, path: JSONPath = JSONPath.empty()):
-        self.path = path
+    def __init__(self, value: object = None, path: JSONPath | None = None):
+        # Everything is done in __new__, so that JSON(value) can return value
+        # unchanged without Python re-initializing it
+        pass
 
     def at_path(self, path: JSONPath) -> 'JSON':
-        if not path:
-            return self
-        
-        key, path = path[0], JSONPath(path[1:])
-
-        match key, self:
-            case int(), Array():
-                return self[key].at_path(path)
-            case str(), Object():
-                return self[key].at_path(path)
-            case _:
-                raise ValueError(f"{self.path}: Cannot index {type(self).__name__} with {type(key).__name__}")
+        """
+        Returns the value at path, relative to self. Raises KeyError or
+        IndexError if there's no such value, or ValueError if path tries to
+        index a value which can't be indexed by that key.
+        """
+        value = self
+        for key in path:
+            # Not a match statement: this is the hottest loop in the library
+            if isinstance(key, int) and isinstance(value, Array):
+                value = value[key]
+            elif isinstance(key, str) and isinstance(value, Object):
+                value = value[key]
+            else:
+                raise ValueError(f"{value.path}: Cannot index {json_type(value).__name__} with {type(key).__name__}")
+        return value
+
+    def at_paths(self, paths: Sequence[JSONPath]) -> 'list[JSON | None]':
+        """
+        Like [self.at_path(path) for path in paths], but resolves the paths
+        together in a single walk, so that a prefix shared by several paths
+        is only resolved once. A path which can't be resolved (i.e. for which
+        at_path would raise) gives None, rather than raising.
+        """
+        # A trie of the paths: each node maps keys to child nodes, and None
+        # to the indexes of the paths which end there
+        trie: dict = {}
+        for i, path in enumerate(paths):
+            node = trie
+            for key in path:
+                node = node.setdefault(key, {})
+            node.setdefault(None, []).append(i)
+
+        results: list[JSON | None] = [None] * len(paths)
+        stack: list[tuple[JSON, dict]] = [(self, trie)]
+        while stack:
+            value, node = stack.pop()
+            for key, child in node.items():
+                if key is None:
+                    for i in child:
+                        results[i] = value
+                elif isinstance(key, int) and isinstance(value, Array):
+                    if -len(value) <= key < len(value):
+                        stack.append((value[key], child))
+                elif isinstance(key, str) and isinstance(value, Object):
+                    if key in value:
+                        stack.append((value[key], child))
+        return results
 
 @final
 class Null(JSON):
-    def __new__(cls, value: None = None, path: JSONPath = JSONPath.empty()) -> Self:
-        return object.__new__(cls)
-    
-    def __init__(self, value: None = None, path: JSONPath = JSONPath.empty()):
-        super().__init__(value, path)
+    """
+    Null() (without a path) is always the same object, as is Boolean(b), and
+    Integer(i) for small i: values which are created over and over, e.g. as
+    operator results, but which are immutable, and so can safely be shared.
+    """
+
+    __slots__ = ("path",)
+
+    def __new__(cls, value: None = None, path: JSONPath = JSONPath.empty()) -> 'Null':
+        if not path:
+            return interned_null
+        self = object.__new__(cls)
+        self.path = path
+        return self
 
     def __eq__(self, other: object):
         return other is None
@@ -84,47 +162,306 @@ class Null(JSON):
     def __repr__(self):
         return "Null()"
 
+    def __reduce__(self):
+        # Rather than the default, which would set path on the shared Null()
+        return Null, (None, self.path)
+
+# Subclasses of int and str can't have (non-empty) __slots__, so Boolean,
+# Integer, and String keep their path in __dict__. They only store it there
+# when it isn't empty, and then as a dict literal, which is about half the
+# size of the dict Python creates for self.path = path.
+
 @final
 class Boolean(int, JSON):  # bool cannot be subclassed
-    def __new__(cls, value: int, path: JSONPath = JSONPath.empty()) -> Self:
-        return int.__new__(cls, value)
+    path = JSONPath.empty()
+
+    def __new__(cls, value: int, path: JSONPath = JSONPath.empty()) -> 'Boolean':
+        if not path and value in (0, 1):
+            return interned_booleans[value]
+        self = int.__new__(cls, value)
+        if path:
+            self.__dict__ = {"path": path}
+        return self
     
     def __str__(self):
         return str(bool(self))
 
+    def __reduce__(self):
+        return Boolean, (int(self), self.path)
+
 @final
 class Integer(int, JSON):
-    def __new__(cls, value: int, path: JSONPath = JSONPath.empty()) -> Self:
-        return int.__new__(cls, value)
+    path = JSONPath.empty()
+
+    def __new__(cls, value: int, path: JSONPath = JSONPath.empty()) -> 'Integer':
+        if not path and -5 <= value <= 256:
+            return interned_integers[value + 5]
+        self = int.__new__(cls, value)
+        if path:
+            self.__dict__ = {"path": path}
+        return self
+
+    def __reduce__(self):
+        return Integer, (int(self), self.path)
 
 @final
 class Float(Decimal, JSON):
+    __slots__ = ("path",)
+
     def __new__(cls, value: float | Decimal, path: JSONPath = JSONPath.empty()) -> Self:
-        return Decimal.__new__(cls, value)
+        self = Decimal.__new__(cls, value)
+        self.path = path
+        return self
+
+    def __reduce__(self):
+        return Float, (Decimal(self), self.path)
+
+@final
+class NativeFloat(float, JSON):
+    """
+    A Float backed by a native (IEEE 754 double) float rather than by a
+    Decimal, as used when evaluating with numbers="float". It is faster, but
+    inexact; as far as JSONLogic is concerned it is a Float (see json_type).
+    """
+
+    __slots__ = ("path",)
+
+    def __new__(cls, value: float, path: JSONPath = JSONPath.empty()) -> Self:
+        self = float.__new__(cls, value)
+        self.path = path
+        return self
+
+    def __reduce__(self):
+        return NativeFloat, (float(self), self.path)
+
+    def __str__(self):
+        # As a Decimal would be, or as JavaScript would: 1.0 is "1", not "1.0"
+        if self.is_integer():
+            return str(int(self))
+        return float.__repr__(self)
 
 @final
 class String(str, JSON):
+    path = JSONPath.empty()
+
     def __new__(cls, value: str, path: JSONPath = JSONPath.empty()) -> Self:
-        return str.__new__(cls, value)
+        self = str.__new__(cls, value)
+        if path:
+            self.__dict__ = {"path": path}
+        return self
+
+    def __reduce__(self):
+        return String, (str(self), self.path)
+
+# The shared path-less values; see Null
+interned_null = object.__new__(Null)
+interned_null.path = JSONPath.empty()
+interned_booleans = (int.__new__(Boolean, False), int.__new__(Boolean, True))
+interned_integers = tuple(int.__new__(Integer, i) for i in range(-5, 257))
+
+class Array(list['JSON'], JSON):  # not final: see LazyArray
+    __slots__ = ("path",)
 
-@final
-class Array(list['JSON'], JSON):
     def __new__(cls, value: Sequence, path: JSONPath = JSONPath.empty()) -> Self:
-        return list.__new__(cls)
-    
+        """
+        Items which are already JSON are shared, not copied (and keep their
+        own paths), so wrapping an existing Array is a shallow copy.
+        """
+        self = list.__new__(cls)
+        self.path = path
+        self.extend(
+            item if isinstance(item, JSON) else JSON(item, path=JSONPath([*path, i]))
+            for i, item in enumerate(value)
+        )
+        return self
+
     def __init__(self, value: Sequence, path: JSONPath = JSONPath.empty()):
-        JSON.__init__(self, value, path)
-        for i, item in enumerate(value):
-            self.append(JSON(item, path=JSONPath([*path, i])))
+        pass
+
+    def __reduce__(self):
+        return type(self), (list(list.__iter__(self)), self.path)
     
-@final
-class Object(dict[str, 'JSON'], JSON):
+class Object(dict[str, 'JSON'], JSON):  # not final: see LazyObject
+    __slots__ = ("path",)
+
     def __new__(cls, value: Mapping, path: JSONPath = JSONPath.empty()) -> Self:
-        return dict.__new__(cls)
-    
-    def __init__(self, value: Mapping, path: JSONPath = JSONPath.empty()):
-        JSON.__init__(self, value, path)
+        """
+        Values which are already JSON are shared, not copied (and keep their
+        own paths), so wrapping an existing Object is a shallow copy.
+        """
+        self = dict.__new__(cls)
+        self.path = path
         for k, v in value.items():
             if not isinstance(k, str):
                 raise TypeError
-            self[k] = JSON(v, path=JSONPath([*path, k]))
+            self[k] = v if isinstance(v, JSON) else JSON(v, path=JSONPath([*path, k]))
+        return self
+
+    def __init__(self, value: Mapping, path: JSONPath = JSONPath.empty()):
+        pass
+
+    def __reduce__(self):
+        return type(self), (dict(self), self.path)
+
+@final
+class LazyArray(Array):
+    """
+    An Array view of a Python sequence, whose items are only converted to
+    JSON when they are first accessed (by indexing or iteration), and are
+    then memoized in place.
+
+    Comparisons (==, <, in, ...) work on the unconverted items, which compare
+    the same way as their JSON counterparts.
+    """
+
+    __slots__ = ("origin",)
+
+    origin: JSONPath
+
+    def __new__(cls, value: Sequence, path: JSONPath = JSONPath.empty()) -> Self:
+        self = list.__new__(cls)
+        self.path = path
+        if isinstance(value, LazyArray):
+            # Share the (possibly still unconverted) items, like Array does
+            self.origin = value.origin
+            list.extend(self, list.__iter__(value))
+        else:
+            self.origin = path
+            list.extend(self, value)
+        return self
+
+    def item(self, index: int) -> JSON:
+        value = list.__getitem__(self, index)
+        if not isinstance(value, JSON):
+            if index < 0:
+                index += len(self)
+            value = lazy(value, JSONPath([*self.origin, index]))
+            list.__setitem__(self, index, value)
+        return value
+
+    @overload
+    def __getitem__(self, index: SupportsIndex) -> JSON: ...
+    @overload
+    def __getitem__(self, index: slice) -> list[JSON]: ...
+    def __getitem__(self, index: SupportsIndex | slice) -> JSON | list[JSON]:
+        if isinstance(index, slice):
+            return [self.item(i) for i in range(*index.indices(len(self)))]
+        return self.item(index.__index__())
+
+    def __iter__(self) -> Iterator[JSON]:
+        for i in range(len(self)):
+            yield self.item(i)
+
+    def __reversed__(self) -> Iterator[JSON]:
+        for i in reversed(range(len(self))):
+            yield self.item(i)
+
+@final
+class LazyObject(Object):
+    """
+    An Object view of a Python mapping, whose values are only converted to
+    JSON when they are first accessed, and are then memoized in place.
+
+    Keys are not checked up front, so the mapping must already have str keys
+    (as e.g. the output of json.load always does).
+    """
+
+    __slots__ = ("origin",)
+
+    origin: JSONPath
+
+    def __new__(cls, value: Mapping, path: JSONPath = JSONPath.empty()) -> Self:
+        self = dict.__new__(cls)
+        self.path = path
+        self.origin = value.origin if isinstance(value, LazyObject) else path
+        # For a LazyObject, this shares its (possibly still unconverted) values
+        dict.update(self, dict.items(value) if isinstance(value, LazyObject) else value)
+        return self
+
+    def __getitem__(self, key: str) -> JSON:
+        value = dict.__getitem__(self, key)
+        if not isinstance(value, JSON):
+            value = lazy(value, JSONPath([*self.origin, key]))
+            dict.__setitem__(self, key, value)
+        return value
+
+    def get(self, key: str, default: object = None) -> object:  # type: ignore[override]
+        if key in self:
+            return self[key]
+        return default
+
+    def values(self) -> list[JSON]:  # type: ignore[override]
+        return [self[key] for key in self]
+
+    def items(self) -> list[tuple[str, JSON]]:  # type: ignore[override]
+        return [(key, self[key]) for key in self]
+
+    def __iter__(self) -> Iterator[str]:
+        # The same keys as dict's own, but overriding it stops dict(), {**...},
+        # and dict.update from copying the raw values: they go via __getitem__
+        return dict.__iter__(self)
+
+    def copy(self) -> dict[str, JSON]:
+        return dict(self)
+
+    def __or__(self, other: Mapping[str, object]) -> dict[str, object]:  # type: ignore[override]
+        return {**self, **other}
+
+def lazy(value: object, path: JSONPath | None = None) -> JSON:
+    """
+    Like JSON(value, path), except that Python sequences and mappings are
+    wrapped as LazyArray/LazyObject views rather than converted up front, so
+    only the parts of the value which are actually used are ever converted.
+    """
+    match value:
+        case JSON() | str():
+            return JSON(value, path)
+        case _ if isinstance(value, Mapping):
+            return LazyObject(value, path or JSONPath.empty())
+        case _ if isinstance(value, Sequence):
+            return LazyArray(value, path or JSONPath.empty())
+        case _:
+            return JSON(value, path)
+
+def json_type(value: JSON) -> type[JSON]:
+    """
+    The type of value as far as JSON is concerned, i.e. one of Null, Boolean,
+    Integer, Float, String, Array, or Object (lazy views report the type of
+    the value they're a view of, and a NativeFloat is a Float).
+    """
+    match value:
+        case NativeFloat():
+            return Float
+        case LazyArray():
+            return Array
+        case LazyObject():
+            return Object
+        case _:
+            return type(value)
+
+def dumps(value: JSON) -> str:
+    """
+    The JSON text of value, as json.dumps would write the equivalent Python
+    value. Floats are written exactly, as their Decimal digits.
+    """
+    match value:
+        case Null():
+            return "null"
+        case Boolean():
+            return "true" if value else "false"
+        case Integer():
+            return int.__repr__(value)
+        case Float() if value.is_finite():
+            return str(value)
+        case Float():
+            return "NaN" if value.is_nan() else "Infinity" if value > 0 else "-Infinity"
+        case NativeFloat():
+            return json.dumps(float(value))
+        case String():
+            return json.dumps(str(value))
+        case Array():
+            return "[" + ", ".join(dumps(item) for item in value) + "]"
+        case Object():
+            return "{" + ", ".join(f"{json.dumps(key)}: {dumps(item)}" for key, item in value.items()) + "}"
+        case _:
+            raise TypeError(f"Expected JSON, but got {type(value).__name__}")
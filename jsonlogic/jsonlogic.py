@@ -1,7 +1,11 @@
+from contextvars import ContextVar
 from functools import wraps
-from typing import Protocol
+from typing import Callable, Protocol
 
-from .json import JSON, Array, Object
+from .budget import Budget, Spending
+from .json import JSON, Array, Object, Numbers, check_numbers, number_mode
+from .jsonpath import JSONPath
+from .tracing import Tracer, Tracing
 
 class Operator[T: JSON](Protocol):
     """
@@ -13,6 +17,12 @@ class Operator[T: JSON](Protocol):
 
 operators: dict[str, Operator[JSON]] = {}
 
+# The undecorated implementation of each operator registered with
+# eval_arg=True (or the eager implementation given for one registered with
+# eval_arg=False), for callers which evaluate the arg themselves (such as
+# jsonlogic.compiler) and so have no use for the evaluates_arg wrapper.
+eager_operators: dict[str, Operator[JSON]] = {}
+
 def register(key: str, operator: Operator[JSON]):
     if key in operators:
         raise TypeError
@@ -32,7 +42,7 @@ def evaluates_arg[T: JSON](operator: Operator[T]) -> Operator[T]:
     return wrapped
     
 
-def operator(key: str, eval_arg: bool = True):
+def operator(key: str, eval_arg: bool = True, eager: Operator[JSON] | None = None):
     """
     Convenience decorator for Operator registration. Use like:
 
@@ -41,24 +51,129 @@ def operator(key: str, eval_arg: bool = True):
         ...
     
     The decorated function is returned unchanged.
+
+    An operator with eval_arg=False which evaluates its own arg only to do
+    so more cleverly (e.g. lazily) may give, as eager, the implementation
+    for callers which have evaluated the arg already.
     """
 
     def decorator[T: JSON](operator: Operator[T]) -> Operator[T]:
         if eval_arg:
             register(key, evaluates_arg(operator))
+            eager_operators[key] = operator
         else:
             register(key, operator)
+            if eager is not None:
+                eager_operators[key] = eager
         return operator
     
     return decorator
 
-def evaluate(logic: object, data: object) -> JSON:
+class Meter(Protocol):
+    """
+    A Meter observes (or limits) each operation of an evaluation: rather
+    than call function(*args) to evaluate the operation {key: arg} at path,
+    evaluate() calls meter.call(key, path, arg, function, *args), which
+    calls function(*args) itself.
+
+    Evaluators which don't recurse through Python frames (see jsonlogic.vm)
+    instead call enter() before evaluating the operation, and exit() once it
+    has returned its result (or raised error), keeping track of the
+    operations in progress with Operations. call() is the same as enter(),
+    then function(*args), then exit().
+    """
+    def call[*Ts](self, key: str, path: JSONPath, arg: JSON, function: Callable[[*Ts], JSON], *args: *Ts) -> JSON: ...
+
+    def enter(self, key: str, path: JSONPath, arg: JSON) -> None: ...
+
+    def exit(self, key: str, path: JSONPath, result: JSON | None, error: BaseException | None) -> None: ...
+
+class Operations:
+    """
+    The operations which an evaluation has entered with its Meter, and not
+    yet exited, innermost last.
+    """
+
+    __slots__ = ("meter", "entered")
+
+    def __init__(self, meter: Meter):
+        self.meter = meter
+        self.entered: list[tuple[str, JSONPath]] = []
+
+    def enter(self, key: str, path: JSONPath, arg: JSON):
+        self.meter.enter(key, path, arg)
+        self.entered.append((key, path))
+
+    def exit(self, result: JSON) -> JSON:
+        """
+        Exits the innermost operation, which returned result, and returns it.
+        """
+        key, path = self.entered.pop()
+        self.meter.exit(key, path, result, None)
+        return result
+
+    def unwind(self, error: BaseException) -> BaseException:
+        """
+        Exits every operation still in progress, innermost first, as having
+        raised error, and returns the error to raise in its place: error
+        itself, unless exiting an operation raised another.
+        """
+        while self.entered:
+            key, path = self.entered.pop()
+            try:
+                self.meter.exit(key, path, None, error)
+            except BaseException as e:
+                error = e
+        return error
+
+# The Meter of the evaluation in progress, if it has a Budget, or a Tracer
+# which sampled it
+meter: ContextVar[Meter | None] = ContextVar("meter", default=None)
+
+def metering(budget: Budget | None, tracer: Tracer | None) -> Meter | None:
+    """
+    The Meter for an evaluation which is starting, with budget and tracer
+    (either of which may be None), or None if it needs none.
+    """
+    metered: Meter | None = None if budget is None else Spending(budget)
+    if tracer is not None and tracer.sample():
+        metered = Tracing(tracer, metered)
+    return metered
+
+def evaluate(logic: object, data: object, *, numbers: Numbers | None = None, budget: Budget | None = None, tracer: Tracer | None = None) -> JSON:
+    """
+    Evaluates logic against data.
+
+    By default, non-integral numbers are exact Decimals (Floats). With
+    numbers="float", they are native floats (NativeFloats) instead, which
+    is faster, but inexact. Integer arithmetic is exact either way.
+
+    With a budget, the evaluation raises BudgetExceeded as soon as it
+    exceeds any of the budget's limits (see jsonlogic.budget). With a
+    tracer, the evaluation is traced if the tracer samples it (see
+    jsonlogic.tracing).
+    """
+    if numbers is not None and numbers != number_mode.get():
+        token = number_mode.set(check_numbers(numbers))
+        try:
+            return evaluate(logic, data, budget=budget, tracer=tracer)
+        finally:
+            number_mode.reset(token)
+    if (budget is not None or tracer is not None) and (metered := metering(budget, tracer)) is not None:
+        token = meter.set(metered)
+        try:
+            return evaluate(logic, data)
+        finally:
+            meter.reset(token)
+
     logic, data = JSON(logic), JSON(data)
     match logic:
         case Object() if len(logic) == 1:
             op, arg = next(iter(logic.items()))
             if operator := operators.get(op):
-                return JSON(operator(arg, data), path=arg.path)
+                if (metered := meter.get()) is None:
+                    return JSON(operator(arg, data), path=arg.path)
+                return JSON(metered.call(op, logic.path, arg, operator, arg, data), path=arg.path)
             else:
                 raise ValueError(f"{logic.path}: Unrecognized operator: '{op}'")
         case Object():
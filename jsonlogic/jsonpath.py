@@ -8,24 +8,41 @@ converted to/from:
 - The "dot notation" used by JSONLogic (https://jsonlogic.com/)
 """
 
-from typing import Self
+from functools import lru_cache
+from typing import Self, final
 
-class JSONPath(tuple[int | str, ...]):
+@final
+class Wildcard:
+    """
+    A key of a JSONPath which stands for every key (or index) of the value
+    at that point, as in $.items[*].price. There is one Wildcard, wildcard.
+    """
+
+    def __repr__(self):
+        return "wildcard"
+
+    def __reduce__(self):
+        return "wildcard"
+
+wildcard = Wildcard()
+
+class JSONPath(tuple[int | str | Wildcard, ...]):
     @classmethod
+    @lru_cache(maxsize=None)
     def empty(cls) -> Self:
         return cls([])
     
     @classmethod
+    @lru_cache(maxsize=4096)
     def from_dot_notation(cls, value: str) -> Self:
-        path = cls.empty()
-
-        for key in value.split('.'):
-            try:
-                path = cls([*path, int(key)])
-            except ValueError:
-                path = cls([*path, key])
-        
-        return path
+        """
+        Parses e.g. "a.0.b" into JSONPath(["a", 0, "b"]).
+
+        Rules tend to use the same handful of paths over and over, so parsed
+        paths (which are immutable) are cached; see
+        JSONPath.from_dot_notation.cache_info().
+        """
+        return cls([as_key(key) for key in value.split('.')])
     
     def rfc9535(self) -> str:
         value = "$"
@@ -35,7 +52,15 @@ class JSONPath(tuple[int | str, ...]):
                     value += f"[{key}]"
                 case str():
                     value += f".{key}"
+                case Wildcard():
+                    value += "[*]"
         return value
     
     def __str__(self):
         return self.rfc9535()
+
+def as_key(key: str) -> int | str:
+    try:
+        return int(key)
+    except ValueError:
+        return key
@@ -0,0 +1,330 @@
+"""
+Finding which of a large number of rules match (i.e. are truthy for) some data.
+
+Routing and feature-flag rules mostly start with simple predicates on the
+data, such as {"==": [{"var": "country"}, "US"]}, {"in": [{"var": "plan"},
+["pro", "team"]]}, or {">=": [{"var": "age"}, 18]}, either on their own or
+as the leading args of an "and". A RuleMatcher indexes those predicates by
+their var: equalities and memberships in hash tables, and ranges in a sorted
+interval list. For some data, it looks up each var's value in its indexes,
+and fully evaluates only the rules which the indexes can't rule out.
+
+A rule is only ruled out when its predicates prove that evaluate() would
+return a falsy value for it, without raising: e.g. a rule whose leading
+predicate is {"==": [{"var": "country"}, "US"]} is ruled out for a country
+of "FR", but not for a country of 1 (since comparing 1 to "US" raises). So
+matching gives exactly the rules for which evaluate() is truthy, and raises
+exactly when evaluating every rule in turn would.
+"""
+
+from bisect import bisect_right
+from decimal import Decimal
+from typing import Iterable, Mapping, NamedTuple, TypeGuard
+
+from .cache import canonical
+from .compiler import Node, compile_node, is_constant
+from .json import JSON, Null, Boolean, Integer, Float, NativeFloat, String, Array, Object, Numbers, check_numbers, number_mode
+
+type Number = int | Decimal | float
+
+def number_key(value: Boolean | Integer | Float | NativeFloat) -> Number:
+    """
+    The plain Python number for value, which hashes and compares as value
+    does in cmp (True as 1, and a Float exactly).
+    """
+    match value:
+        case Float():
+            return Decimal(value)
+        case NativeFloat():
+            return float(value)
+        case _:
+            return int(value)
+
+def is_number(value: JSON) -> TypeGuard[Integer | Float | NativeFloat]:
+    # NaN is never equal to, or ordered with, anything, and a Decimal NaN
+    # raises when ordered, so NaNs are never indexed
+    return isinstance(value, (Integer, Float, NativeFloat)) and value == value
+
+# The Strings, Booleans, and Numbers which predicates compare vars with
+type Scalar = String | Boolean | Integer | Float | NativeFloat
+
+def is_scalar(value: JSON) -> TypeGuard[Scalar]:
+    return isinstance(value, (String, Boolean)) or is_number(value)
+
+def is_var(logic: JSON) -> bool:
+    match logic:
+        case Object() if len(logic) == 1 and "var" in logic:
+            return is_constant(logic["var"])
+        case _:
+            return False
+
+class Index:
+    """
+    The indexed predicates on one var. Each predicate has an id, and a
+    lookup gives the ids of those which are true for the data, and of those
+    whose result can't be known without evaluating them (e.g. because they
+    may raise). The rest are false.
+    """
+
+    def __init__(self, var: JSON):
+        self.var = compile_node(var)
+        # "==" and "===", by the String or Number they compare with
+        self.strings: dict[str, set[int]] = {}
+        self.numbers: dict[Number, set[int]] = {}
+        self.string_equalities: set[int] = set()
+        self.number_equalities: set[int] = set()
+        # "in", by each of the items of its (literal) Array
+        self.members: dict[str | Number, set[int]] = {}
+        # "<", "<=", ">", and ">=", as (low, low is strict, high, high is
+        # strict, id), sorted by low (with -inf for no low)
+        self.bounds: list[tuple[Number, bool, Number | None, bool, int]] = []
+        self.lows: list[Number] = []
+        self.ranges: set[int] = set()
+        self.ids: set[int] = set()
+
+    def add_equality(self, literal: Scalar, id: int):
+        match literal:
+            case String():
+                self.strings.setdefault(str(literal), set()).add(id)
+                self.string_equalities.add(id)
+            case _:
+                self.numbers.setdefault(number_key(literal), set()).add(id)
+                self.number_equalities.add(id)
+
+    def add_membership(self, haystack: list[Scalar], id: int):
+        for item in haystack:
+            key = str(item) if isinstance(item, String) else number_key(item)
+            self.members.setdefault(key, set()).add(id)
+
+    def add_range(self, low: Number | None, low_strict: bool, high: Number | None, high_strict: bool, id: int):
+        self.bounds.append((float("-inf") if low is None else low, low_strict, high, high_strict, id))
+        self.bounds.sort(key=lambda bound: bound[0])
+        self.lows = [bound[0] for bound in self.bounds]
+        self.ranges.add(id)
+
+    def in_range(self, x: Number) -> set[int]:
+        if x != x:
+            return set()
+        return {
+            id
+            for low, low_strict, high, high_strict, id in self.bounds[:bisect_right(self.lows, x)]
+            if not (low_strict and x == low)
+            and (high is None or x < high or not high_strict and x == high)
+        }
+
+    def lookup(self, data: JSON) -> tuple[set[int], set[int]]:
+        """
+        Returns the ids of the predicates which are true for data, and of
+        those which are unknown.
+        """
+        try:
+            value = self.var(data)
+        except Exception:
+            # The predicates raise too, which only evaluating them will show
+            return set(), self.ids
+        match value:
+            case String():
+                # Comparing a String with a Number converts it, which may raise
+                true = self.strings.get(str(value), set()) | self.members.get(str(value), set())
+                return true, self.number_equalities | self.ranges
+            case Boolean() | Integer() | Float() | NativeFloat():
+                x = number_key(value)
+                true = self.numbers.get(x, set()) | self.members.get(x, set()) | self.in_range(x)
+                return true, self.string_equalities
+            case Null():
+                # Null compares as 0, but is in no Array of Strings and Numbers
+                return self.numbers.get(0, set()) | self.in_range(0), self.string_equalities
+            case _:
+                # Arrays and Objects compare with nothing here, and are in
+                # no Array of Strings and Numbers
+                return set(), set()
+
+# Whether each comparison is strict
+ranges = {
+    "<": True,
+    "<=": False,
+    ">": True,
+    ">=": False,
+}
+
+# The kinds of indexable predicate, each with the var it's on
+
+class Equality(NamedTuple):
+    var: JSON
+    literal: Scalar
+
+class Membership(NamedTuple):
+    var: JSON
+    haystack: list[Scalar]
+
+class Range(NamedTuple):
+    var: JSON
+    low: Number | None
+    low_strict: bool
+    high: Number | None
+    high_strict: bool
+
+type Predicate = Equality | Membership | Range
+
+def predicate(logic: JSON) -> Predicate | None:
+    """
+    If logic is an indexable predicate, returns its var, and how to index it.
+    """
+    match logic:
+        case Object() if len(logic) == 1:
+            [(op, arg)] = logic.items()
+        case _:
+            return None
+
+    match op, arg:
+        case ("==" | "==="), Array([var, literal]) if is_var(var) and is_scalar(literal):
+            return Equality(var, literal)
+        case ("==" | "==="), Array([literal, var]) if is_var(var) and is_scalar(literal):
+            return Equality(var, literal)
+        case "in", Array([var, Array() as haystack]) if is_var(var):
+            literals = [item for item in haystack if is_scalar(item)]
+            if len(literals) < len(haystack):
+                return None
+            return Membership(var, literals)
+        case ("<" | "<=" | ">" | ">="), Array([var, bound]) if is_var(var) and is_number(bound):
+            strict = ranges[op]
+            if op in ("<", "<="):
+                return Range(var, None, False, number_key(bound), strict)
+            return Range(var, number_key(bound), strict, None, False)
+        case ("<" | "<=" | ">" | ">="), Array([bound, var]) if is_var(var) and is_number(bound):
+            strict = ranges[op]
+            if op in ("<", "<="):
+                return Range(var, number_key(bound), strict, None, False)
+            return Range(var, None, False, number_key(bound), strict)
+        case ("<" | "<=" | ">" | ">="), Array([left, var, right]) if is_var(var) and is_number(left) and is_number(right):
+            strict = ranges[op]
+            if op in ("<", "<="):
+                return Range(var, number_key(left), strict, number_key(right), strict)
+            return Range(var, number_key(right), strict, number_key(left), strict)
+        case _:
+            return None
+
+class RuleMatcher:
+    """
+    Many JSONLogic rules, indexed by their leading predicates. match()
+    returns the keys of the rules which are truthy for the data, i.e. the
+    indexes of the rules (or, if the rules were given as a mapping, their
+    keys), in order:
+
+    matcher = RuleMatcher({
+        "us": {"==": [{"var": "country"}, "US"]},
+        "adult": {"and": [{">=": [{"var": "age"}, 18]}, {"var": "verified"}]},
+    })
+    matcher.match({"country": "US", "age": 40, "verified": True})  # ["us", "adult"]
+
+    An error raised by a rule is raised as it is, with a note of which rule
+    raised it.
+    """
+
+    # Keyed by name (as given), or by index
+    logic: dict[object, JSON]
+    numbers: Numbers
+
+    def __init__(self, rules: Iterable[object] | Mapping[str, object], *, numbers: Numbers = "decimal"):
+        self.numbers = check_numbers(numbers)
+        items = rules.items() if isinstance(rules, Mapping) else enumerate(rules)
+        token = number_mode.set(self.numbers)
+        try:
+            self.logic = {key: JSON(logic) for key, logic in items}
+        finally:
+            number_mode.reset(token)
+
+        self.keys = list(self.logic)
+        self.nodes: list[Node] = [compile_node(logic) for logic in self.logic.values()]
+        self.indexes: dict[str, Index] = {}
+        ids: dict[str, tuple[Index, int]] = {}
+        # For each rule, its leading (indexed) predicates, and for each
+        # predicate, the rules which it leads
+        self.prefixes: list[list[tuple[Index, int]]] = []
+        self.leading: dict[int, list[int]] = {}
+        self.unindexed: list[int] = []
+
+        for i, logic in enumerate(self.logic.values()):
+            match logic:
+                case Object() if len(logic) == 1 and isinstance(and_args := logic.get("and"), Array):
+                    args = list(and_args)
+                case _:
+                    args = [logic]
+
+            prefix: list[tuple[Index, int]] = []
+            for arg in args:
+                if (found := predicate(arg)) is None:
+                    break
+                key = canonical(arg, self.numbers)
+                if key not in ids:
+                    index = self.indexes.setdefault(canonical(found.var, self.numbers), Index(found.var))
+                    id = len(ids)
+                    match found:
+                        case Equality(_, literal):
+                            index.add_equality(literal, id)
+                        case Membership(_, haystack):
+                            index.add_membership(haystack, id)
+                        case Range(_, low, low_strict, high, high_strict):
+                            index.add_range(low, low_strict, high, high_strict, id)
+                    index.ids.add(id)
+                    ids[key] = index, id
+                prefix.append(ids[key])
+
+            self.prefixes.append(prefix)
+            if prefix:
+                self.leading.setdefault(prefix[0][1], []).append(i)
+            else:
+                self.unindexed.append(i)
+
+    def candidates(self, data: object) -> list[int]:
+        """
+        The positions of the rules which may match data, i.e. those which
+        can't be ruled out by their predicates.
+        """
+        data = JSON(data)
+        states = {index: index.lookup(data) for index in self.indexes.values()}
+
+        candidates = set(self.unindexed)
+        for true, unknown in states.values():
+            for predicate_id in true | unknown:
+                for i in self.leading.get(predicate_id, ()):
+                    if self.may_match(self.prefixes[i], states):
+                        candidates.add(i)
+        return sorted(candidates)
+
+    def may_match(self, prefix: list[tuple[Index, int]], states: dict[Index, tuple[set[int], set[int]]]) -> bool:
+        # The args of an "and" are evaluated in order, so a false predicate
+        # only rules the rule out if every one before it is known to be true
+        for index, predicate_id in prefix:
+            true, unknown = states[index]
+            if predicate_id in true:
+                continue
+            return predicate_id in unknown
+        return True
+
+    def match(self, data: object) -> list[object]:
+        """
+        The keys of the rules which are truthy for data, in order.
+        """
+        data = JSON(data)
+        token = number_mode.set(self.numbers) if number_mode.get() != self.numbers else None
+        try:
+            matches: list[object] = []
+            for i in self.candidates(data):
+                key = self.keys[i]
+                try:
+                    if self.nodes[i](data):
+                        matches.append(key)
+                except Exception as e:
+                    e.add_note(f"While evaluating rule {key!r}")
+                    raise
+            return matches
+        finally:
+            if token is not None:
+                number_mode.reset(token)
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def __repr__(self):
+        return f"<RuleMatcher of {len(self)} rules, indexing {len(self) - len(self.unindexed)} of them>"
@@ -1,7 +1,10 @@
+import math
+
+from collections.abc import Iterator
 from decimal import Decimal
-from typing import Literal
+from typing import Iterable, Literal, TypeGuard
 
-from .json import JSON, Null, Boolean, Integer, Float, String, Array, Object
+from .json import JSON, Null, Boolean, Integer, Float, NativeFloat, String, Array, Object, json_type, number_mode
 from .jsonlogic import evaluate, operator
 from .jsonpath import JSONPath
 
@@ -21,21 +24,80 @@ def wrong_type(arg: JSON, *expected: type[JSON]):
         case [*ts, t_last]:
             expected_msg = f"{", ".join(t.__name__ for t in ts)}, or {t_last.__name__}"
 
-    return TypeError(f"{arg.path}: Expected {expected_msg}, but got {type(arg).__name__}")
+    return TypeError(f"{arg.path}: Expected {expected_msg}, but got {json_type(arg).__name__}")
+
+type Number = Integer | Float | NativeFloat
 
-def as_number(arg: String) -> Integer | Float:
+def as_number(arg: String) -> Number:
     try:
         return Integer(int(arg))
     except ValueError:
         pass
 
     try:
+        if number_mode.get() == "float":
+            return NativeFloat(float(arg))
         return Float(Decimal(arg))
     except ValueError:
         pass
 
     raise ValueError(f"{arg.path}: Cannot convert String value to Number")
 
+def as_numbers(args: Iterable[JSON]) -> list[Number]:
+    """
+    Converts each of args to a number, as the arithmetic operators do, or
+    raises for the first which isn't a number or a numeric String.
+    """
+    numbers: list[Number] = []
+    for x in args:
+        match x:
+            case (Integer() | Float() | NativeFloat()):
+                numbers.append(x)
+            case String():
+                numbers.append(as_number(x))
+            case _:
+                raise wrong_type(x, Integer, Float, String)
+    return numbers
+
+def decimals(numbers: list[Number]) -> list[int | Decimal]:
+    """
+    Converts numbers for arithmetic with numbers="decimal": Integers are left
+    as they are (so that integer arithmetic is always exact), and
+    NativeFloats become Decimals.
+    """
+    return [Decimal(n) if isinstance(n, NativeFloat) else n for n in numbers]
+
+def floats(numbers: list[Number]) -> list[int | float]:
+    """
+    Converts numbers for arithmetic with numbers="float": Integers are left as
+    they are, and Floats become floats.
+    """
+    return [float(n) if isinstance(n, Float) else n for n in numbers]
+
+# Summed and multiplied right-to-left, so that Float results are rounded
+# exactly as they were when "+" and "*" were defined recursively
+
+def total[T: (int | Decimal, int | float)](numbers: list[T]) -> T | int:
+    result: T | int = 0
+    for n in reversed(numbers):
+        result = n + result
+    return result
+
+def product[T: (int | Decimal, int | float)](numbers: list[T]) -> T | int:
+    result: T | int = 1
+    for n in reversed(numbers):
+        result = n * result
+    return result
+
+def as_result(n: int | Decimal | float) -> Number:
+    match n:
+        case float():
+            return NativeFloat(n)
+        case Decimal():
+            return Float(n)
+        case _:
+            return Integer(n)
+
 type Cmp = Literal['lt', 'eq', 'gt']
 
 def cmp(left: JSON, right: JSON) -> Cmp | None:
@@ -47,7 +109,7 @@ def cmp(left: JSON, right: JSON) -> Cmp | None:
         case _, Null():
             return cmp(left, Integer(0))
 
-        case (Boolean() | Integer() | Float()), (Boolean() | Integer() | Float()):
+        case (Boolean() | Integer() | Float() | NativeFloat()), (Boolean() | Integer() | Float() | NativeFloat()):
             if left == right:
                 return 'eq'
             elif left < right:
@@ -57,9 +119,9 @@ def cmp(left: JSON, right: JSON) -> Cmp | None:
             else:
                 return None
         
-        case (Boolean() | Integer() | Float()), String():
+        case (Boolean() | Integer() | Float() | NativeFloat()), String():
             return cmp(left, as_number(right))
-        case String(), (Boolean() | Integer() | Float()):
+        case String(), (Boolean() | Integer() | Float() | NativeFloat()):
             return cmp(as_number(left), right)
         
         case String(), String():
@@ -131,25 +193,24 @@ def op_missing(arg: JSON, data: JSON) -> Array:
         case _:
             raise wrong_type(arg, String, Integer)
     
-    missing = Array([])
+    paths: list[JSONPath] = []
     for key in keys:
         match key:
             case String():
                 try:
-                    path = JSONPath.from_dot_notation(key)
+                    paths.append(JSONPath.from_dot_notation(key))
                 except ValueError:
-                    path = JSONPath([key])
+                    paths.append(JSONPath([key]))
             case Integer():
-                path = JSONPath([key])
+                paths.append(JSONPath([key]))
             case _:
                 raise wrong_type(arg, String, Integer)
-        
-        try:
-            data.at_path(path)
-        except (KeyError, IndexError, ValueError):
-            missing.append(key)
-        
-    return missing
+
+    return Array([
+        key
+        for key, value in zip(keys, data.at_paths(paths))
+        if value is None
+    ])
 
     
 @operator("missing_some")
@@ -177,15 +238,15 @@ def op_missing_some(arg: JSON, data: JSON) -> Array:
 @operator("?:", eval_arg=False)
 def op_if(arg: JSON, data: JSON) -> JSON:
     match arg:
-        case Array([]):
+        case Array(_):
+            # A loop rather than recursion, so that long if/else chains don't
+            # exhaust the stack
+            for i in range(0, len(arg) - 1, 2):
+                if evaluate(arg[i], data):
+                    return evaluate(arg[i + 1], data)
+            if len(arg) % 2:
+                return evaluate(arg[-1], data)
             return Null()
-        case Array([if_arg]):
-            return evaluate(if_arg, data)
-        case Array([if_arg, then_arg, *elses]):
-            if evaluate(if_arg, data):
-                return evaluate(then_arg, data)
-            else:
-                return op_if(Array(elses), data)
         case _:
             raise wrong_type(arg, Array)
 
@@ -203,7 +264,7 @@ def op_eq(arg: JSON, data: JSON) -> Boolean:
 def op_eq_eq(arg: JSON, data: JSON) -> Boolean:
     match arg:
         case Array([left, right]):
-            return Boolean(op_eq(arg, data) and type(left) == type(right))
+            return Boolean(op_eq(arg, data) and json_type(left) == json_type(right))
         case Array(_):
             raise wrong_arity(arg, "two")
         case _:
@@ -223,7 +284,7 @@ def op_neq(arg: JSON, data: JSON) -> Boolean:
 def op_neq_eq(arg: JSON, data: JSON) -> Boolean:
     match arg:
         case Array([left, right]):
-            return Boolean(op_neq(arg, data) or type(left) != type(right))
+            return Boolean(op_neq(arg, data) or json_type(left) != json_type(right))
         case Array(_):
             raise wrong_arity(arg, "two")
         case _:
@@ -331,9 +392,10 @@ def op_max(arg: JSON, data: JSON) -> JSON:
                 return right
             else:
                 return left
-        case Array([left, right, *args]):
-            value = op_max(Array([left, right]), data)
-            return op_max(Array([value, *args]), data)
+        case Array([value, *args]):
+            for right in args:
+                value = op_max(Array([value, right]), data)
+            return value
         case Array(_):
             raise wrong_arity(arg, "at least one")
         case _:
@@ -349,171 +411,192 @@ def op_min(arg: JSON, data: JSON) -> JSON:
                 return left
             else:
                 return right
-        case Array([left, right, *args]):
-            value = op_min(Array([left, right]), data)
-            return op_min(Array([value, *args]), data)
+        case Array([value, *args]):
+            for right in args:
+                value = op_min(Array([value, right]), data)
+            return value
         case Array(_):
             raise wrong_arity(arg, "at least one")
         case _:
             raise wrong_type(arg, Array)
 
 @operator("+")
-def op_add(arg: JSON, data: JSON) -> Integer | Float:
+def op_add(arg: JSON, data: JSON) -> Number:
     match arg:
-        case Array([]):
-            return Integer(0)
-
-        case Array([Integer() as n, *args]):
-            match op_add(Array(args), data):
-                case Integer() as ns:
-                    return Integer(n + ns)
-                case Float() as ns:
-                    return Float(n + ns)
-        case Array([Float() as n, *args]):
-            return Float(n + op_add(Array(args), data))
-        case Array([String() as s, *args]):
-            return op_add(Array([as_number(s), *args]), data)
-        case Array([x, *args]):
-            raise wrong_type(x, Integer, Float, String)
-
-        case (Integer() | Float() | String()):
-            return op_add(Array([arg]), data)
+        case Array(_):
+            numbers = as_numbers(arg)
+        case (Integer() | Float() | NativeFloat() | String()):
+            numbers = as_numbers([arg])
         case _:
             raise wrong_type(arg, Integer, Float, String, Array)
 
+    if number_mode.get() == "float":
+        return as_result(total(floats(numbers)))
+    return as_result(total(decimals(numbers)))
+
 @operator("-")
-def op_sub(arg: JSON, data: JSON) -> Integer | Float:
-    match arg:
-        case Array([Integer() as n]):
-            return Integer(-n)
-        case Array([Float() as n]):
-            return Float(-n)
-        case Array([String() as s]):
-            return op_sub(Array([as_number(s)]), data)
-
-        case Array([Integer() as left, Integer() as right]):
-            return Integer(left - right)
-        case Array([Integer() as left, Float() as right]):
-            return Float(left - right)
-        case Array([Integer() as left, String() as right]):
-            return op_sub(Array([left, as_number(right)]), data)
-
-        case Array([Float() as left, (Integer() | Float()) as right]):
-            return Float(left - right)
-        case Array([Float() as left, String() as right]):
-            return op_sub(Array([left, as_number(right)]), data)
-        
-        case Array([String() as left, right]):
-            return op_sub(Array([as_number(left), right]), data)
-        
-        case Array([(Integer() | Float() | String()) as left, right]):
-            raise wrong_type(right, Integer, Float, String)
-        case Array([left, right]):
-            raise wrong_type(left, Integer, Float, String)
-        
+def op_sub(arg: JSON, data: JSON) -> Number:
+    match arg:
+        case Array([_]) if number_mode.get() == "float":
+            [n] = floats(as_numbers(arg))
+            return as_result(-n)
+        case Array([_]):
+            [n] = decimals(as_numbers(arg))
+            return as_result(-n)
+        case Array([_, _]) if number_mode.get() == "float":
+            left, right = floats(as_numbers(arg))
+            return as_result(left - right)
+        case Array([_, _]):
+            left, right = decimals(as_numbers(arg))
+            return as_result(left - right)
         case Array(_):
             raise wrong_arity(arg, "one or two")
-        
-        case (Integer() | Float() | String()):
+        case (Integer() | Float() | NativeFloat() | String()):
             return op_sub(Array([arg]), data)
         case _:
             raise wrong_type(arg, Integer, Float, String, Array)
         
 @operator("*")
-def op_mul(arg: JSON, data: JSON) -> Integer | Float:
+def op_mul(arg: JSON, data: JSON) -> Number:
     match arg:
-        case Array([]):
-            return Integer(1)
-
-        case Array([Integer() as n, *args]):
-            match op_mul(Array(args), data):
-                case Integer() as ns:
-                    return Integer(n * ns)
-                case Float() as ns:
-                    return Float(n * ns)
-        case Array([Float() as n, *args]):
-            return Float(n * op_mul(Array(args), data))
-        case Array([String() as s, *args]):
-            return op_mul(Array([as_number(s), *args]), data)
-        case Array([x, *args]):
-            raise wrong_type(x, Integer, Float, String)
-
-        case (Integer() | Float() | String()):
-            return op_mul(Array([arg]), data)
+        case Array(_):
+            numbers = as_numbers(arg)
+        case (Integer() | Float() | NativeFloat() | String()):
+            numbers = as_numbers([arg])
         case _:
             raise wrong_type(arg, Integer, Float, String, Array)
 
+    if number_mode.get() == "float":
+        return as_result(product(floats(numbers)))
+    return as_result(product(decimals(numbers)))
+
 @operator("/")
-def op_div(arg: JSON, data: JSON) -> Integer | Float:
-    match arg:
-        case Array([Integer() as left, Integer() as right]):
-            return Float(Float(Decimal(str(left))) / Float(Decimal(str(right))))
-        case Array([Integer() as left, Float() as right]):
-            return Float(left / right)
-        case Array([Integer() as left, String() as right]):
-            return op_div(Array([left, as_number(right)]), data)
-
-        case Array([Float() as left, (Integer() | Float()) as right]):
-            return Float(left / right)
-        case Array([Float() as left, String() as right]):
-            return op_div(Array([left, as_number(right)]), data)
-        
-        case Array([String() as left, right]):
-            return op_div(Array([as_number(left), right]), data)
-        
-        case Array([(Integer() | Float() | String()) as left, right]):
-            raise wrong_type(right, Integer, Float, String)
-        case Array([left, right]):
-            raise wrong_type(left, Integer, Float, String)
-        
+def op_div(arg: JSON, data: JSON) -> Float | NativeFloat:
+    match arg:
+        case Array([_, _]):
+            numbers = as_numbers(arg)
         case Array(_):
             raise wrong_arity(arg, "two")
         case _:
             raise wrong_type(arg, Array)
 
+    # The result is a Float even if both args are Integers: int / int is
+    # correctly rounded, and Decimal(int) is exact
+    if number_mode.get() == "float":
+        left, right = floats(numbers)
+        if right == 0:
+            raise ZeroDivisionError(f"{arg.path}: Division by zero")
+        return NativeFloat(left / right)
+    left, right = decimals(numbers)
+    return Float(Decimal(left) / Decimal(right))
+
 @operator("%")
-def op_mod(arg: JSON, data: JSON) -> Integer | Float:
-    match arg:
-        case Array([Integer() as left, Integer() as right]):
-            return Float(Float(Decimal(str(left))) % Float(Decimal(str(right))))
-        case Array([Integer() as left, Float() as right]):
-            return Float(left % right)
-        case Array([Integer() as left, String() as right]):
-            return op_mod(Array([left, as_number(right)]), data)
-
-        case Array([Float() as left, (Integer() | Float()) as right]):
-            return Float(left % right)
-        case Array([Float() as left, String() as right]):
-            return op_mod(Array([left, as_number(right)]), data)
-        
-        case Array([String() as left, right]):
-            return op_mod(Array([as_number(left), right]), data)
-        
-        case Array([(Integer() | Float() | String()) as left, right]):
-            raise wrong_type(right, Integer, Float, String)
-        case Array([left, right]):
-            raise wrong_type(left, Integer, Float, String)
-        
+def op_mod(arg: JSON, data: JSON) -> Float | NativeFloat:
+    match arg:
+        case Array([_, _]):
+            numbers = as_numbers(arg)
         case Array(_):
             raise wrong_arity(arg, "two")
         case _:
             raise wrong_type(arg, Array)
 
+    if number_mode.get() != "float":
+        left, right = decimals(numbers)
+        return Float(Decimal(left) % Decimal(right))
+
+    # The remainder has the sign of the dividend (as in JavaScript, and as
+    # with Decimal), which for floats is fmod rather than %
+    left, right = floats(numbers)
+    match left, right:
+        case _, 0:
+            raise ZeroDivisionError(f"{arg.path}: Modulo by zero")
+        case int(), int():
+            remainder = abs(left) % abs(right)
+            return NativeFloat(-remainder if left < 0 else remainder)
+        case _:
+            return NativeFloat(math.fmod(left, right))
+
+def streamable(logic: JSON) -> TypeGuard[Object]:
+    """
+    Whether logic is a "map" or "filter" whose results can be streamed, one
+    at a time, to the operation consuming them (see stream()).
+    """
+    match logic:
+        case Object() if len(logic) == 1:
+            [(op, arg)] = logic.items()
+            return op in ("map", "filter") and isinstance(arg, Array) and len(arg) == 2
+        case _:
+            return False
+
+def stream_stage(logic: Object) -> tuple[str, JSON, JSON]:
+    """
+    The op ("map" or "filter"), items and fn of streamable logic.
+    """
+    [(op, arg)] = logic.items()
+    match arg:
+        case Array([items, fn]):
+            return op, items, fn
+        case _:
+            raise ValueError(f"{logic.path}: Not streamable")
+
+def streams(op: str, arg: JSON) -> bool:
+    """
+    Whether the operation {op: arg} consumes the results of a streamable
+    "map" or "filter" (as the items it iterates over, or as the haystack of
+    "in") one at a time, rather than as an Array.
+    """
+    match op, arg:
+        case ("map" | "filter" | "all" | "some" | "none"), Array([items, _]):
+            return streamable(items)
+        case "reduce", Array([items, _, _]):
+            return streamable(items)
+        case "in", Array([_, haystack]):
+            return streamable(haystack)
+        case _:
+            return False
+
+def stream(logic: JSON, data: JSON) -> Iterator[JSON] | None:
+    """
+    If logic is streamable, an iterator over the results of evaluating it
+    against data, which evaluates its fn for each item only as the next
+    result is needed; so that e.g. "some" of a "map" stops evaluating the
+    "map" at the first truthy result. Otherwise, None.
+
+    The items are evaluated (and their type checked) straight away, unless
+    they're streamable in turn.
+    """
+    if not streamable(logic):
+        return None
+    op, items, fn = stream_stage(logic)
+    xs = each(items, data, null=op == "map")
+    if op == "map":
+        return (evaluate(fn, x) for x in xs)
+    return (x for x in xs if evaluate(fn, x))
+
+def each(items: JSON, data: JSON, null: bool = False) -> Iterable[JSON]:
+    """
+    The items an iterating operator iterates over: streamed, if they can be,
+    or else evaluated, which must give an Array (or, if null, Null, for no
+    items).
+    """
+    if (xs := stream(items, data)) is not None:
+        return xs
+    match evaluate(items, data):
+        case Null() if null:
+            return ()
+        case Array(_) as xs:
+            return xs
+        case _:
+            raise wrong_type(items, Array)
+
 @operator("map", eval_arg=False)
 def op_map(arg: JSON, data: JSON) -> Array:
     match arg:
         case Array([items, fn]):
-            xs = JSON(evaluate(items, data), path=items.path)
-            match xs:
-                case Null():
-                    return Array([])
-                case Array(_):
-                    return Array([
-                        evaluate(fn, x)
-                        for x in xs
-                    ])
-                case _:
-                    raise wrong_type(items, Array)
+            return Array([
+                evaluate(fn, x)
+                for x in each(items, data, null=True)
+            ])
         case Array(_):
             raise wrong_arity(arg, "two")
         case _:
@@ -523,16 +606,11 @@ def op_map(arg: JSON, data: JSON) -> Array:
 def op_filter(arg: JSON, data: JSON) -> Array:
     match arg:
         case Array([items, fn]):
-            xs = JSON(evaluate(items, data), path=items.path)
-            match xs:
-                case Array(_):
-                    return Array([
-                        x
-                        for x in xs
-                        if evaluate(fn, x)
-                    ])
-                case _:
-                    raise wrong_type(items, Array)
+            return Array([
+                x
+                for x in each(items, data)
+                if evaluate(fn, x)
+            ])
         case Array(_):
             raise wrong_arity(arg, "two")
         case _:
@@ -542,12 +620,15 @@ def op_filter(arg: JSON, data: JSON) -> Array:
 def op_reduce(arg: JSON, data: JSON) -> JSON:
     match arg:
         case Array([items, fn, initial]):
-            xs = JSON(evaluate(items, data), path=items.path)
+            # A streamed "map" or "filter" is an Iterator
+            xs = stream(items, data)
+            if xs is None:
+                xs = JSON(evaluate(items, data), path=items.path)
             initial = JSON(evaluate(initial, data), path=initial.path)
             match xs:
                 case Null():
                     return initial
-                case Array(_):
+                case Array(_) | Iterator():
                     value = Object({
                         "current": None,
                         "accumulator": initial
@@ -567,18 +648,13 @@ def op_reduce(arg: JSON, data: JSON) -> JSON:
 def op_all(arg: JSON, data: JSON) -> Boolean:
     match arg:
         case Array([items, fn]):
-            xs = evaluate(items, data)
-            match xs:
-                case Array([]):
-                    # This is stupid, but it's according to spec
+            # No items is false, which is stupid, but it's according to spec
+            empty = True
+            for x in each(items, data):
+                if not evaluate(fn, x):
                     return Boolean(False)
-                case Array(_):
-                    for x in xs:
-                        if not evaluate(fn, x):
-                            return Boolean(False)
-                    return Boolean(True)
-                case _:
-                    raise wrong_type(items, Array)
+                empty = False
+            return Boolean(not empty)
         case Array(_):
             raise wrong_arity(arg, "two")
         case _:
@@ -588,15 +664,10 @@ def op_all(arg: JSON, data: JSON) -> Boolean:
 def op_some(arg: JSON, data: JSON) -> Boolean:
     match arg:
         case Array([items, fn]):
-            xs = evaluate(items, data)
-            match xs:
-                case Array(_):
-                    for x in xs:
-                        if evaluate(fn, x):
-                            return Boolean(True)
-                    return Boolean(False)
-                case _:
-                    raise wrong_type(items, Array)
+            for x in each(items, data):
+                if evaluate(fn, x):
+                    return Boolean(True)
+            return Boolean(False)
         case Array(_):
             raise wrong_arity(arg, "two")
         case _:
@@ -606,15 +677,10 @@ def op_some(arg: JSON, data: JSON) -> Boolean:
 def op_none(arg: JSON, data: JSON) -> Boolean:
     match arg:
         case Array([items, fn]):
-            xs = evaluate(items, data)
-            match xs:
-                case Array(_):
-                    for x in xs:
-                        if evaluate(fn, x):
-                            return Boolean(False)
-                    return Boolean(True)
-                case _:
-                    raise wrong_type(items, Array)
+            for x in each(items, data):
+                if evaluate(fn, x):
+                    return Boolean(False)
+            return Boolean(True)
         case Array(_):
             raise wrong_arity(arg, "two")
         case _:
@@ -623,16 +689,18 @@ def op_none(arg: JSON, data: JSON) -> Boolean:
 @operator("merge")
 def op_merge(arg: JSON, data: JSON) -> Array:
     match arg:
-        case Array([]):
-            return Array([])
-        case Array([Array() as a, *args]):
-            return Array([*a, *op_merge(Array(args), data)])
-        case Array([a, *args]):
-            return Array([a, *op_merge(Array(args), data)])
+        case Array(_):
+            merged: list[JSON] = []
+            for a in arg:
+                match a:
+                    case Array():
+                        merged.extend(a)
+                    case _:
+                        merged.append(a)
+            return Array(merged)
         case _:
             return Array([arg])
 
-@operator("in")
 def op_in(arg: JSON, data: JSON) -> Boolean:
     match arg:
         case Array([String() as needle, String() as haystack]):
@@ -647,20 +715,37 @@ def op_in(arg: JSON, data: JSON) -> Boolean:
             raise wrong_arity(arg, "two")
         case _:
             raise wrong_type(arg, Array)
+
+# "in" evaluates its own arg, so that it can stream a "map" or "filter"
+# haystack, stopping at the first match; but once its arg is evaluated, it's
+# op_in, which is what callers that evaluate the arg themselves want
+@operator("in", eval_arg=False, eager=op_in)
+def op_in_lazy(arg: JSON, data: JSON) -> Boolean:
+    match arg:
+        case Array([needle, haystack]) if streamable(haystack):
+            needle = evaluate(needle, data)
+            return Boolean(any(x is needle or x == needle for x in each(haystack, data)))
+        case _:
+            return op_in(evaluate(arg, data), data)
         
 @operator("cat")
 def op_cat(arg: JSON, data: JSON) -> String:
     match arg:
-        case Array([]):
-            return String("")
-        case Array([String() as s, *args]):
-            return String(s + op_cat(Array(args), data))
-        case Array([(Integer() | Float()) as n, *args]):
-            return op_cat(Array([String(str(n)), *args]), data)
-        case Array([x, *args]):
-            raise wrong_type(x, String)
-        case _:
-            return op_cat(Array([arg]), data)
+        case Array(_):
+            args = arg
+        case _:
+            args = [arg]
+
+    strings: list[str] = []
+    for x in args:
+        match x:
+            case String():
+                strings.append(x)
+            case (Integer() | Float() | NativeFloat()):
+                strings.append(str(x))
+            case _:
+                raise wrong_type(x, String)
+    return String("".join(strings))
 
 @operator("substr")
 def op_substr(arg: JSON, data: JSON) -> String:
@@ -0,0 +1,246 @@
+"""
+A simplification pass over JSONLogic, run before evaluation or compilation.
+
+Rules built by tools (rather than written by hand) are often full of
+sub-logic which doesn't depend on the data at all, such as {"+": [1, 2]},
+{"if": [true, x, y]}, or an "and" nested directly inside another "and".
+optimize() rewrites such logic into an equivalent, smaller rule:
+
+- data-independent sub-logic is evaluated once, with the existing operator
+  implementations, and replaced by its result;
+- nested "and", "or", "cat", "+" and "*" are flattened into their parent
+  (for "cat", "+" and "*", only when that can't change which error is
+  raised first);
+- constant conditions of "if" (and constant args of "and"/"or") are
+  resolved, dropping the branches which can never be taken.
+
+Every node keeps its original path, and a folded node takes the path that
+evaluating the logic it replaces would give its result, so errors raised by
+the optimized rule still point at the same place as the original rule's. (So
+an if, and or or left with a single non-constant arg stays an operation on
+that one arg: returning the arg itself would change the path of its result.)
+Sub-logic whose evaluation raises is left as it is, so the error is still
+raised when (and only if) it's reached.
+"""
+
+from .compiler import is_constant
+from .json import JSON, Null, Integer, Float, NativeFloat, String, Array, Object, Numbers, check_numbers, number_mode
+from .jsonlogic import eager_operators, evaluate
+from .jsonpath import JSONPath
+
+# The operators whose result depends only on their arg, and which have no
+# side effects (so not "log"), and so which may be evaluated ahead of time.
+# Custom operators with the same properties may be added.
+pure_operators: set[str] = {
+    "if", "?:", "and", "or", "!", "!!",
+    "==", "===", "!=", "!==", "<", "<=", ">", ">=",
+    "max", "min", "+", "-", "*", "/", "%",
+    "merge", "in", "cat", "substr",
+    "map", "filter", "reduce", "all", "some", "none",
+}
+
+# Operators which evaluate some of their args against each item of an array,
+# rather than against the data: these are data-independent as long as their
+# other args are, whatever those per-item args read.
+iterating_operators: dict[str, int] = {
+    "map": 2, "filter": 2, "all": 2, "some": 2, "none": 2, "reduce": 3,
+}
+
+# Operators for which op(a, op(b, c)) is op(a, b, c), whatever a, b and c.
+# "+" and "*" only qualify for their last arg: they add (multiply) right to
+# left, so moving any other arg's operands would change Float rounding.
+associative_operators = {"and", "or", "cat"}
+right_associative_operators = {"+", "*"}
+
+# The operators whose results are always numbers, or always strings
+numeric_operators = {"+", "-", "*", "/", "%"}
+string_operators = {"cat", "substr"}
+
+def optimize(logic: object, *, numbers: Numbers = "decimal") -> JSON:
+    """
+    Returns a simplified rule which gives the same result as logic for any
+    data. Rules are folded with the number mode they'll be evaluated with,
+    so pass the same numbers as to evaluate() or compile().
+    """
+    numbers = check_numbers(numbers)
+    if numbers != number_mode.get():
+        token = number_mode.set(numbers)
+        try:
+            return optimize(logic, numbers=numbers)
+        finally:
+            number_mode.reset(token)
+
+    return optimize_node(JSON(logic))
+
+def optimize_node(logic: JSON) -> JSON:
+    match logic:
+        case Object() if len(logic) == 1:
+            op, arg = next(iter(logic.items()))
+            if op not in eager_operators and not isinstance(arg, Array):
+                # An operator which doesn't evaluate its arg looks at it as it
+                # is, so optimizing it could change the result
+                return logic
+            arg_path = arg.path
+            match arg:
+                case Array() if op in iterating_operators:
+                    # The results of the function (the second arg) aren't
+                    # given its path, as the results of an Array's items are
+                    arg = Array([
+                        optimize_node(item) if i == 1 else optimize_item(item)
+                        for i, item in enumerate(arg)
+                    ], path=arg.path)
+                case _:
+                    arg = optimize_node(arg)
+            if isinstance(arg, Array):
+                if op in associative_operators:
+                    arg = flatten(op, arg, len(arg))
+                elif op in right_associative_operators and arg:
+                    arg = flatten(op, arg, 1)
+            match op, arg:
+                case ("if" | "?:"), Array():
+                    return simplify_if(op, arg, logic.path)
+                case ("and" | "or"), Array([_, *_]):
+                    return simplify_and_or(op, arg, logic.path)
+            return fold(Object({op: arg}, path=logic.path), arg_path)
+        case Object():
+            return Object({
+                key: optimize_item(value)
+                for key, value in logic.items()
+            }, path=logic.path)
+        case Array():
+            return Array([
+                optimize_item(item)
+                for item in logic
+            ], path=logic.path)
+        case _:
+            return logic
+
+def optimize_item(item: JSON) -> JSON:
+    """
+    Optimizes an item of an Array or Object. Evaluating these gives each
+    item's result the item's path, so a constant which replaces an item takes
+    its path too.
+    """
+    optimized = optimize_node(item)
+    if optimized is not item and is_constant(optimized):
+        return JSON(optimized, path=item.path)
+    return optimized
+
+def operation(logic: JSON) -> tuple[str, JSON] | None:
+    match logic:
+        case Object() if len(logic) == 1:
+            return next(iter(logic.items()))
+        case _:
+            return None
+
+def flatten(op: str, arg: Array, last: int) -> Array:
+    """
+    Splices the args of each of the last args of arg which is itself an op
+    (with a non-empty Array arg) into arg. An op with no args raises, so
+    splicing it in would drop the error.
+    """
+    items: list[JSON] = []
+    for i, item in enumerate(arg):
+        match operation(item):
+            case (inner_op, Array([_, *_]) as inner_arg) if inner_op == op and i >= len(arg) - last and (
+                op in ("and", "or") or all(convertible(op, x) for x in inner_arg)
+            ):
+                items.extend(inner_arg)
+            case _:
+                items.append(item)
+    return Array(items, path=arg.path)
+
+def convertible(op: str, item: JSON) -> bool:
+    """
+    Whether item is certain to be a number (or, for "cat", a string), and
+    so can't make "+", "*", or "cat" raise. The inner op converts its args
+    before the outer op converts any of its own, so only such args can be
+    flattened without changing which error is raised first.
+    """
+    match item, operation(item):
+        case (Integer() | Float() | NativeFloat()), _:
+            return True
+        case String(), _:
+            return op == "cat"
+        case _, (inner_op, _):
+            return inner_op in numeric_operators or (op == "cat" and inner_op in string_operators)
+        case _:
+            return False
+
+def simplify_if(op: str, arg: Array, path: JSONPath) -> JSON:
+    """
+    Drops the branches of an if which follow a constant truthy condition, or
+    which are guarded by a constant falsy one. A branch left on its own stays
+    the arg of an if, which gives its result the if's path.
+    """
+    items = list(arg)
+    while len(items) >= 2 and is_constant(items[0]):
+        condition, then, *items = items
+        if condition:
+            items = [then]
+            break
+    if len(items) < len(arg):
+        arg = Array(items, path=arg.path)
+    return fold(Object({op: arg}, path=path), arg.path)
+
+def simplify_and_or(op: str, arg: Array, path: JSONPath) -> JSON:
+    """
+    Drops the constant args of an and (or) which can't decide its result,
+    and the args after a constant one which always does.
+    """
+    items: list[JSON] = []
+    for i, item in enumerate(arg):
+        if not is_constant(item):
+            items.append(item)
+        elif bool(item) == (op == "or") or i == len(arg) - 1:
+            # This decides the result (or is the last arg, so is the result)
+            items.append(item)
+            break
+    return fold(Object({op: Array(items, path=arg.path)}, path=path), arg.path)
+
+def fold(logic: Object, arg_path: JSONPath) -> JSON:
+    """
+    Evaluates logic (an operation whose arg has been optimized), if it's
+    data-independent, and returns the result in its place, with arg_path
+    (the path of the arg before it was optimized); otherwise returns logic.
+    """
+    op, arg = next(iter(logic.items()))
+    if op not in pure_operators:
+        return logic
+    if (n := iterating_operators.get(op)) is not None:
+        # The data-independent args are the items (and reduce's initial);
+        # the function needs only to be pure
+        match arg:
+            case Array() if len(arg) == n:
+                if not (is_constant(arg[0]) and (n == 2 or is_constant(arg[2])) and is_pure(arg[1])):
+                    return logic
+            case _:
+                return logic
+    elif not is_constant(arg):
+        return logic
+
+    try:
+        result = evaluate(logic, Null())
+    except Exception:
+        return logic
+    # Only results which read back as themselves can stand in for the logic;
+    # e.g. an Object with a single key would be taken for an operation
+    if not is_constant(result):
+        return logic
+    # As evaluating logic would, give the result the path of its arg
+    return JSON(result, path=arg_path)
+
+def is_pure(logic: JSON) -> bool:
+    """
+    Whether logic uses only pure operators, and var/missing/missing_some.
+    """
+    match logic:
+        case Object() if len(logic) == 1:
+            op, arg = next(iter(logic.items()))
+            return (op in pure_operators or op in ("var", "missing", "missing_some")) and is_pure(arg)
+        case Object():
+            return all(is_pure(value) for value in logic.values())
+        case Array():
+            return all(is_pure(item) for item in logic)
+        case _:
+            return True
@@ -0,0 +1,128 @@
+"""
+Evaluation of one rule against many records, spread across processes.
+
+The interpreter is pure Python, so evaluate_many() can only ever use one
+core. evaluate_parallel() and evaluate_unordered() instead start a pool of
+worker processes, each of which compiles the rule once, and then stream the
+records to them in chunks. Only a bounded number of chunks is in flight at
+any time, so memory use does not depend on the number of records.
+"""
+
+import os
+
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from itertools import batched
+from typing import Iterable, Iterator
+
+from .compiler import CompiledRule, compile
+from .json import JSON, Numbers
+
+class RecordError(Exception):
+    """
+    Raised when evaluating a batch of records fails. The error raised by the
+    record which failed (with its JSONPath) is available as error (and as
+    __cause__), and its position in the batch as index.
+    """
+
+    index: int
+    error: Exception
+
+    def __init__(self, index: int, error: Exception):
+        super().__init__(index, error)
+        self.index = index
+        self.error = error
+
+    def __str__(self):
+        return f"Record {self.index}: {self.error}"
+
+# The rule being evaluated by this worker process; see init_worker
+worker_rule: CompiledRule | None = None
+
+def init_worker(logic: JSON, numbers: Numbers):
+    global worker_rule
+    worker_rule = compile(logic, numbers=numbers)
+
+def evaluate_chunk(start: int, records: tuple[object, ...]) -> list[JSON]:
+    assert worker_rule is not None
+    results: list[JSON] = []
+    for i, record in enumerate(records, start):
+        try:
+            results.append(worker_rule(record))
+        except Exception as error:
+            raise RecordError(i, error) from error
+    return results
+
+def chunks(records: Iterable[object], chunksize: int) -> Iterator[tuple[int, tuple[object, ...]]]:
+    start = 0
+    for chunk in batched(records, chunksize):
+        yield start, chunk
+        start += len(chunk)
+
+def executor(logic: object, workers: int | None) -> ProcessPoolExecutor:
+    match logic:
+        case CompiledRule():
+            logic, numbers = logic.logic, logic.numbers
+        case _:
+            logic, numbers = JSON(logic), "decimal"
+    return ProcessPoolExecutor(workers, initializer=init_worker, initargs=(logic, numbers))
+
+def evaluate_parallel(
+    logic: object,
+    records: Iterable[object],
+    *,
+    workers: int | None = None,
+    chunksize: int = 1000,
+) -> Iterator[JSON]:
+    """
+    Like evaluate_many(logic, records), but the records are evaluated by a
+    pool of (by default, one per CPU) worker processes. The results are
+    yielded in the same order as records.
+
+    logic may also be a CompiledRule (which is evaluated with the numbers it
+    was compiled with). If evaluating any record raises, a RecordError is
+    raised, and no further results are yielded.
+    """
+    workers = workers or os.process_cpu_count() or 1
+    pool = executor(logic, workers)
+    try:
+        pending: deque[Future[list[JSON]]] = deque()
+        for start, chunk in chunks(records, chunksize):
+            pending.append(pool.submit(evaluate_chunk, start, chunk))
+            if len(pending) >= 2 * workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+    finally:
+        pool.shutdown(cancel_futures=True)
+
+def evaluate_unordered(
+    logic: object,
+    records: Iterable[object],
+    *,
+    workers: int | None = None,
+    chunksize: int = 1000,
+) -> Iterator[tuple[int, JSON]]:
+    """
+    Like evaluate_parallel(), but yields (index, result) pairs as soon as
+    each chunk of records has been evaluated, rather than in order.
+    """
+    workers = workers or os.process_cpu_count() or 1
+    pool = executor(logic, workers)
+    try:
+        pending: dict[Future[list[JSON]], int] = {}
+
+        def completed() -> Iterator[tuple[int, JSON]]:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                start = pending.pop(future)
+                yield from enumerate(future.result(), start)
+
+        for start, chunk in chunks(records, chunksize):
+            pending[pool.submit(evaluate_chunk, start, chunk)] = start
+            if len(pending) >= 2 * workers:
+                yield from completed()
+        while pending:
+            yield from completed()
+    finally:
+        pool.shutdown(cancel_futures=True)
@@ -0,0 +1,228 @@
+"""
+Profiling of evaluate(), by operator and by the JSONPath of each operation.
+
+cProfile attributes the time spent evaluating a rule to evaluate() and to the
+functions implementing each operator, whatever part of the rule they were
+evaluating. A Profiler instead records, for each operator key and for each
+operation in the rule (by its JSONPath), how many times it was evaluated, how
+many of those raised, and the time spent in it, both in all (cumulative) and
+excluding the operations within it (self).
+
+While a Profiler is enabled, each operator in the registry (see
+jsonlogic.jsonlogic.operators) is replaced by a wrapper which records it.
+Disabling the Profiler puts the operators back, so that, when no Profiler is
+enabled, evaluate() runs exactly as it would without this module. Rules
+compiled while a Profiler is enabled call the operators they were compiled
+with, and so aren't profiled (except for operators without a Compiler,
+called as evaluate() would call them).
+
+A Profiler is global: while it's enabled, evaluations in every thread are
+profiled (each thread with its own stack of operations). Profilers may
+overlap, each wrapping the operators as it finds them; once every one of
+them is disabled, the registry has its original operators again.
+"""
+
+from threading import Lock, local
+from time import perf_counter
+from typing import Self
+
+from .json import JSON
+from .jsonlogic import Operator, operators
+from .jsonpath import JSONPath
+
+# Every Profiler wrapper which may still be in the registry, and what it
+# wraps, and those of them whose Profiler is enabled. A disabled Profiler's
+# wrappers are unwrapped once nothing enabled wraps them in turn.
+wrapped: dict[Operator[JSON], Operator[JSON]] = {}
+live: set[Operator[JSON]] = set()
+# Held while enabling or disabling a Profiler
+wrapping = Lock()
+
+def unwrap(operator: Operator[JSON]) -> Operator[JSON]:
+    """
+    Strips the wrappers of disabled Profilers from the outside of operator.
+    """
+    while operator in wrapped and operator not in live:
+        operator = wrapped.pop(operator)
+    return operator
+
+class Stats:
+    """
+    What a Profiler has recorded for one operator key, or one operation.
+    """
+
+    __slots__ = ("calls", "errors", "cumulative", "own")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        # In seconds. Time spent in nested calls of the same operator is
+        # only counted once, for the outermost call.
+        self.cumulative = 0.0
+        # Excluding the time spent in the operations within
+        self.own = 0.0
+
+    def __repr__(self):
+        return f"Stats(calls={self.calls}, errors={self.errors}, cumulative={self.cumulative:.6f}, own={self.own:.6f})"
+
+class Frame:
+    """
+    An operation being evaluated.
+    """
+
+    __slots__ = ("key", "path", "name", "start", "children")
+
+    def __init__(self, key: str, path: JSONPath, start: float):
+        self.key = key
+        self.path = path
+        self.name = f"{key}@{path}"
+        self.start = start
+        self.children = 0.0
+
+class Profiler:
+    """
+    Records how long each operator, and each operation, takes to evaluate.
+    Use like:
+
+    with Profiler() as profiler:
+        evaluate(logic, data)
+    print(profiler.report())
+
+    .operators and .paths hold the Stats by operator key and by JSONPath
+    respectively.
+    """
+
+    operators: dict[str, Stats]
+    paths: dict[JSONPath, Stats]
+    # The self time (in seconds) of each stack of operations
+    stacks: dict[tuple[str, ...], float]
+
+    def __init__(self):
+        self.operators = {}
+        self.paths = {}
+        self.stacks = {}
+        self.enabled = False
+        self.wrappers: dict[str, Operator[JSON]] = {}
+        self.local = local()
+        # Held while recording, since every thread records into the same Stats
+        self.lock = Lock()
+
+    def enable(self):
+        with wrapping:
+            if self.enabled:
+                return
+            self.enabled = True
+            for key, operator in list(operators.items()):
+                wrapper = self.wrap(key, operator)
+                wrapped[wrapper] = operator
+                live.add(wrapper)
+                self.wrappers[key] = operators[key] = wrapper
+
+    def disable(self):
+        with wrapping:
+            if not self.enabled:
+                return
+            self.enabled = False
+            live.difference_update(self.wrappers.values())
+            for key in self.wrappers:
+                # Unless something else has replaced it since, in which case
+                # the wrapper stays, but no longer records anything
+                if (operator := operators.get(key)) is not None:
+                    operators[key] = unwrap(operator)
+            self.wrappers.clear()
+
+    def __enter__(self) -> Self:
+        self.enable()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.disable()
+
+    def wrap(self, key: str, operator: Operator[JSON]) -> Operator[JSON]:
+        def profiled(arg: JSON, data: JSON) -> JSON:
+            if profiled not in live:
+                return operator(arg, data)
+            stack: list[Frame] | None = getattr(self.local, "stack", None)
+            if stack is None:
+                stack = self.local.stack = []
+            # arg is at the operation's path, followed by its key
+            frame = Frame(key, JSONPath(arg.path[:-1]), perf_counter())
+            stack.append(frame)
+            failed = True
+            try:
+                result = operator(arg, data)
+                failed = False
+                return result
+            finally:
+                stack.pop()
+                self.record(frame, perf_counter() - frame.start, failed, stack)
+
+        profiled.__wrapped__ = operator  # type: ignore[attr-defined]
+        return profiled
+
+    def record(self, frame: Frame, elapsed: float, failed: bool, stack: list[Frame]):
+        own = elapsed - frame.children
+        if stack:
+            stack[-1].children += elapsed
+
+        recursive = any(outer.key == frame.key for outer in stack)
+        names = (*(outer.name for outer in stack), frame.name)
+        with self.lock:
+            for stats, nested in (
+                (self.operators.setdefault(frame.key, Stats()), recursive),
+                (self.paths.setdefault(frame.path, Stats()), any(outer.path == frame.path for outer in stack)),
+            ):
+                stats.calls += 1
+                stats.errors += failed
+                stats.own += own
+                if not nested:
+                    stats.cumulative += elapsed
+            self.stacks[names] = self.stacks.get(names, 0.0) + own
+
+    def reset(self):
+        """
+        Discards everything recorded so far.
+        """
+        with self.lock:
+            self.operators.clear()
+            self.paths.clear()
+            self.stacks.clear()
+
+    def report(self, by: str = "operator", limit: int | None = None) -> str:
+        """
+        A table of the Stats by operator key (or, with by="path", by
+        JSONPath), most self time first.
+        """
+        match by:
+            case "operator":
+                rows = [(key, stats) for key, stats in self.operators.items()]
+            case "path":
+                rows = [(str(path), stats) for path, stats in self.paths.items()]
+            case _:
+                raise ValueError(f"Expected 'operator' or 'path', but got {by!r}")
+        rows.sort(key=lambda row: row[1].own, reverse=True)
+        rows = rows[:limit]
+
+        width = max([len(by), *(len(name) for name, _ in rows)])
+        lines = [f"{by:<{width}}  {'calls':>9}  {'errors':>9}  {'cumulative (s)':>14}  {'self (s)':>10}"]
+        lines += [
+            f"{name:<{width}}  {stats.calls:>9}  {stats.errors:>9}  {stats.cumulative:>14.6f}  {stats.own:>10.6f}"
+            for name, stats in rows
+        ]
+        return "\n".join(lines)
+
+    def collapsed(self) -> str:
+        """
+        The self time of each stack of operations, in microseconds, in the
+        "collapsed stack" format read by flamegraph tools (e.g.
+        flamegraph.pl, or speedscope): one line per stack, of the operations
+        (as key@path) from the outermost, separated by semicolons, then a
+        space and the time.
+        """
+        return "\n".join(
+            f"{';'.join(names)} {round(own * 1_000_000)}"
+            for names, own in self.stacks.items()
+        )
+
+    def __repr__(self):
+        return f"<Profiler{' (enabled)' if self.enabled else ''} of {len(self.paths)} operations>"
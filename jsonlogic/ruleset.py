@@ -0,0 +1,150 @@
+"""
+Evaluation of many rules together, against the same data.
+
+Bundles of rules tend to repeat the same sub-logic, such as
+{"var": "user.country"}, or a long {"in": [..., [...]]}, many times over.
+A RuleSet compiles all of its rules together, and shares each repeated
+sub-logic between them, so that it's evaluated at most once per data
+document, however many rules use it.
+
+Sub-logic is only shared where it's evaluated against the data document
+itself: e.g. the function of a "map" is evaluated against each item instead,
+so it's never shared. Each use of a shared sub-logic still gets a result
+with its own path, and still raises its own errors, since the sub-logic is
+evaluated (and so can fail) at whichever use is reached first.
+"""
+
+from contextvars import ContextVar
+from typing import Iterable, Iterator, Mapping
+
+from .cache import canonical
+from .compiler import Node, compile_node
+from .json import JSON, Array, Object, Numbers, check_numbers, number_mode
+from .jsonpath import JSONPath
+
+# The data document which a RuleSet is currently being evaluated against,
+# and the results of its shared sub-logic so far, by slot
+shared_results: ContextVar[tuple[JSON, dict[int, JSON]] | None] = ContextVar("shared_results", default=None)
+
+class RuleSet:
+    """
+    Many JSONLogic rules, compiled together. Calling a RuleSet evaluates all
+    of its rules against the data, and returns their results in a list (or,
+    if the rules were given as a mapping, in a dict with the same keys):
+
+    rules = RuleSet({
+        "minor": {"<": [{"var": "user.age"}, 18]},
+        "local": {"==": [{"var": "user.country"}, "US"]},
+    })
+    rules({"user": {"age": 12, "country": "US"}})  # {"minor": True, "local": True}
+
+    Each result is the same as evaluate() would give for its rule. An error
+    raised by a rule is raised as it is, with a note of which rule raised it.
+    """
+
+    # Keyed by name (as given), or by index
+    logic: dict[object, JSON]
+    numbers: Numbers
+
+    def __init__(self, rules: Iterable[object] | Mapping[str, object], *, numbers: Numbers = "decimal"):
+        self.numbers = check_numbers(numbers)
+        self.named = isinstance(rules, Mapping)
+        items = rules.items() if isinstance(rules, Mapping) else enumerate(rules)
+        token = number_mode.set(self.numbers)
+        try:
+            self.logic = {key: JSON(logic) for key, logic in items}
+        finally:
+            number_mode.reset(token)
+
+        # Count every sub-logic, so that only the repeated ones are shared
+        keys: dict[int, str] = {}
+        counts: dict[str, int] = {}
+        for logic in self.logic.values():
+            count_subexpressions(logic, self.numbers, keys, counts)
+
+        slots: dict[str, int] = {}
+
+        def share(logic: JSON) -> Node:
+            node = compile_node(logic, share)
+            match logic:
+                case Object() if (key := keys.get(id(logic))) is not None and counts[key] >= 2:
+                    [arg] = logic.values()
+                    return shared(slots.setdefault(key, len(slots)), node, arg.path)
+                case _:
+                    return node
+
+        self.nodes = [(key, share(logic)) for key, logic in self.logic.items()]
+        self.shared = len(slots)
+
+    def __call__(self, data: object) -> list[JSON] | dict[str, JSON]:
+        data = JSON(data)
+        token = shared_results.set((data, {}))
+        numbers_token = number_mode.set(self.numbers) if number_mode.get() != self.numbers else None
+        try:
+            results: dict[object, JSON] = {}
+            for key, node in self.nodes:
+                try:
+                    results[key] = node(data)
+                except Exception as e:
+                    e.add_note(f"While evaluating rule {key!r}")
+                    raise
+        finally:
+            if numbers_token is not None:
+                number_mode.reset(numbers_token)
+            shared_results.reset(token)
+        if self.named:
+            return results  # type: ignore[return-value]
+        return list(results.values())
+
+    def map(self, records: Iterable[object]) -> Iterator[list[JSON] | dict[str, JSON]]:
+        """
+        Evaluates the rules against each of records in turn, yielding the
+        results in order.
+        """
+        for record in records:
+            yield self(record)
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def __repr__(self):
+        return f"<RuleSet of {len(self)} rules, sharing {self.shared} sub-expressions>"
+
+def count_subexpressions(logic: JSON, numbers: Numbers, keys: dict[int, str], counts: dict[str, int]) -> str:
+    """
+    Returns the canonical text of logic, having recorded (in keys, by id) that
+    of each operation in logic, and counted (in counts) how many times each
+    appears. Built bottom-up, so that each node is only canonicalized once.
+    """
+    match logic:
+        case Object() if len(logic) == 1:
+            [(op, arg)] = logic.items()
+            key = "{" + canonical(op) + ":" + count_subexpressions(arg, numbers, keys, counts) + "}"
+            keys[id(logic)] = key
+            counts[key] = counts.get(key, 0) + 1
+            return key
+        case Object():
+            items = sorted(logic.items(), key=lambda item: item[0])
+            return "{" + ",".join(f"{canonical(key)}:{count_subexpressions(value, numbers, keys, counts)}" for key, value in items) + "}"
+        case Array():
+            return "[" + ",".join(count_subexpressions(item, numbers, keys, counts) for item in logic) + "]"
+        case _:
+            return canonical(logic, numbers)
+
+def shared(slot: int, node: Node, path: JSONPath) -> Node:
+    """
+    Returns a Node which evaluates node against the data document at most
+    once per RuleSet call, and re-uses the result (with path) thereafter.
+    """
+
+    def shared_node(data: JSON) -> JSON:
+        state = shared_results.get()
+        if state is None or data is not state[0]:
+            return node(data)
+        results = state[1]
+        if (result := results.get(slot)) is not None:
+            return JSON(result, path=path)
+        result = results[slot] = node(data)
+        return result
+
+    return shared_node
@@ -0,0 +1,222 @@
+"""
+Tracing of individual evaluations, operation by operation.
+
+A Profiler aggregates over every evaluation; a Tracer instead sees each
+operation of an evaluation as a span, as it enters and exits it, e.g. to
+attribute a latency spike to the client-authored rule which caused it. Pass
+a Tracer to evaluate() (or when calling a compiled rule) with tracer=.
+
+Tracing is sampled at the head: at the start of each evaluation, the Tracer
+decides (with sample()) whether to trace it, and evaluations which aren't
+traced cost no more than if there were no Tracer, so that a Tracer can stay
+on in production.
+
+TraceRecorder is a Tracer which records each traced evaluation in memory,
+and keeps the slowest of them.
+"""
+
+from heapq import heappush, heappushpop
+from itertools import count
+from threading import Lock, local
+from time import perf_counter
+from typing import Callable, Protocol
+
+from .json import JSON
+from .jsonpath import JSONPath
+
+class Tracer(Protocol):
+    """
+    A Tracer is told when each operation of a (sampled) evaluation is entered
+    and exited, along with its operator key, its JSONPath, its unevaluated
+    arg, and its result (or the error it raised).
+    """
+
+    def sample(self) -> bool:
+        """
+        Whether to trace the evaluation which is starting.
+        """
+        ...
+
+    def enter(self, key: str, path: JSONPath, arg: JSON) -> None: ...
+
+    def exit(self, key: str, path: JSONPath, result: JSON | None, error: BaseException | None) -> None: ...
+
+class Tracing:
+    """
+    The Meter (see jsonlogic.jsonlogic.Meter) of a traced evaluation, which
+    tells its Tracer of each operation, and then passes the operation on to
+    the evaluation's other Meter (e.g. its budget), if any.
+    """
+
+    __slots__ = ("tracer", "inner")
+
+    def __init__(self, tracer: Tracer, inner=None):
+        self.tracer = tracer
+        self.inner = inner
+
+    def call[*Ts](self, key: str, path: JSONPath, arg: JSON, function: Callable[[*Ts], JSON], *args: *Ts) -> JSON:
+        tracer = self.tracer
+        tracer.enter(key, path, arg)
+        try:
+            if self.inner is None:
+                result = function(*args)
+            else:
+                result = self.inner.call(key, path, arg, function, *args)
+        except BaseException as e:
+            tracer.exit(key, path, None, e)
+            raise
+        tracer.exit(key, path, result, None)
+        return result
+
+    def enter(self, key: str, path: JSONPath, arg: JSON):
+        self.tracer.enter(key, path, arg)
+        if self.inner is not None:
+            try:
+                self.inner.enter(key, path, arg)
+            except BaseException as e:
+                self.tracer.exit(key, path, None, e)
+                raise
+
+    def exit(self, key: str, path: JSONPath, result: JSON | None, error: BaseException | None):
+        if self.inner is not None:
+            try:
+                self.inner.exit(key, path, result, error)
+            except BaseException as e:
+                self.tracer.exit(key, path, None, e)
+                raise
+        self.tracer.exit(key, path, result, error)
+
+class Span:
+    """
+    One operation of a recorded evaluation. start is in seconds since the
+    start of the evaluation, and depth is the number of operations it's
+    within. arg and result are only recorded if the TraceRecorder records
+    values.
+    """
+
+    __slots__ = ("key", "path", "depth", "start", "duration", "error", "arg", "result")
+
+    def __init__(self, key: str, path: JSONPath, depth: int, start: float, arg: JSON | None):
+        self.key = key
+        self.path = path
+        self.depth = depth
+        self.start = start
+        self.duration = 0.0
+        self.error: BaseException | None = None
+        self.arg = arg
+        self.result: JSON | None = None
+
+    def __str__(self):
+        line = f"{'  ' * self.depth}{self.key} {self.path} {self.duration * 1_000_000:.0f}us"
+        if self.error is not None:
+            line += f" raised {type(self.error).__name__}: {self.error}"
+        elif self.result is not None:
+            line += f" -> {self.result!r}"
+        return line
+
+    def __repr__(self):
+        return f"<Span {self.key} {self.path} {self.duration * 1_000_000:.0f}us>"
+
+class Trace:
+    """
+    A recorded evaluation: its spans, in the order they were entered, and
+    how long it took in all.
+    """
+
+    def __init__(self, started: float):
+        self.started = started
+        self.duration = 0.0
+        self.spans: list[Span] = []
+
+    @property
+    def error(self) -> BaseException | None:
+        return self.spans[0].error if self.spans else None
+
+    def __str__(self):
+        return "\n".join([f"Evaluation of {self.duration * 1_000_000:.0f}us:", *map(str, self.spans)])
+
+    def __repr__(self):
+        return f"<Trace of {len(self.spans)} spans, {self.duration * 1_000_000:.0f}us>"
+
+class TraceRecorder:
+    """
+    A Tracer which traces one in each (every) evaluations, records each
+    traced evaluation as a Trace, and keeps the (keep) slowest. Use like:
+
+    recorder = TraceRecorder(every=100)
+    for data in requests:
+        evaluate(logic, data, tracer=recorder)
+    print(recorder.dump(5))
+
+    With values=True, each Span also records its operation's arg and result.
+    """
+
+    def __init__(self, every: int = 1, keep: int = 100, values: bool = False):
+        if every < 1:
+            raise ValueError(f"Expected every to be at least 1, but got {every}")
+        self.every = every
+        self.keep = keep
+        self.values = values
+        self.evaluations = count()
+        self.traced = 0
+        # The slowest traces, as a heap of (duration, n, trace)
+        self.heap: list[tuple[float, int, Trace]] = []
+        self.lock = Lock()
+        self.local = local()
+
+    def sample(self) -> bool:
+        return next(self.evaluations) % self.every == 0
+
+    def enter(self, key: str, path: JSONPath, arg: JSON):
+        now = perf_counter()
+        stack: list[Span] | None = getattr(self.local, "stack", None)
+        if not stack:
+            stack = self.local.stack = []
+            self.local.trace = Trace(now)
+        trace: Trace = self.local.trace
+        span = Span(key, path, len(stack), now - trace.started, arg if self.values else None)
+        trace.spans.append(span)
+        stack.append(span)
+
+    def exit(self, key: str, path: JSONPath, result: JSON | None, error: BaseException | None):
+        now = perf_counter()
+        stack: list[Span] = self.local.stack
+        span = stack.pop()
+        trace: Trace = self.local.trace
+        span.duration = now - trace.started - span.start
+        span.error = error
+        if self.values:
+            span.result = result
+        if not stack:
+            trace.duration = span.duration
+            self.record(trace)
+
+    def record(self, trace: Trace):
+        with self.lock:
+            self.traced += 1
+            entry = (trace.duration, self.traced, trace)
+            if len(self.heap) < self.keep:
+                heappush(self.heap, entry)
+            else:
+                heappushpop(self.heap, entry)
+
+    def slowest(self, n: int | None = None) -> list[Trace]:
+        """
+        The n slowest recorded traces (or all of them), slowest first.
+        """
+        with self.lock:
+            entries = sorted(self.heap, reverse=True)
+        return [trace for _, _, trace in entries[:n]]
+
+    def dump(self, n: int | None = None) -> str:
+        """
+        The spans of the n slowest recorded traces, as indented text.
+        """
+        return "\n\n".join(map(str, self.slowest(n)))
+
+    def clear(self):
+        with self.lock:
+            self.heap.clear()
+
+    def __repr__(self):
+        return f"<TraceRecorder of 1 in {self.every} evaluations, with {len(self.heap)} traces>"
@@ -0,0 +1,661 @@
+"""
+Evaluation of JSONLogic by a small virtual machine.
+
+evaluate(), and the closures built by compile(), both recurse through Python
+frames for every level of nesting in a rule, so deeply nested rules raise
+RecursionError. compile_to_vm() instead translates a rule into a flat list
+of instructions, which run() executes with an explicit stack of values (and
+of the data which "var" reads, which changes inside e.g. "map"), so that
+rules nested to any depth are evaluated in constant Python stack depth.
+
+The translation itself is iterative too, and the logic is converted to JSON
+lazily (see jsonlogic.lazy), which, unlike JSON(), doesn't recurse either.
+
+Each instruction is a NamedTuple of its operands, whose class is its
+opcode:
+
+Const(value)                push value
+Var(key_path, default, path)
+                            push the value at key_path in the data, or default
+Call(operator, path)        pop arg, and push operator(arg, data)
+Lazy(operator, arg, path)   push operator(arg, data), for operators which
+                            evaluate their own arg
+BuildArray(n, item_paths, path)
+                            pop n values, and push them as an Array
+BuildObject(keys, value_paths, path)
+                            pop len(keys) values, and push them as an Object
+Raise(error)                raise error()
+Jump(target)                continue from target
+PopJumpIfFalse(target)      pop a value, and continue from target if it's falsy
+JumpIfFalseOrPop(target)    continue from target if the top value is falsy,
+                            or else pop it
+JumpIfTrueOrPop(target)     continue from target if the top value is truthy,
+                            or else pop it
+Repath(path)                re-path the top value
+Iter(kind, items, initial)  pop the items (and the initial value, for
+                            "reduce"), and start a loop over them
+Next(end, staged)           make the next item the data, or continue from end
+                            if there are no more (or, if staged, push the item
+                            itself, even for "reduce")
+Step(next, end)             pop the function's result for the current item,
+                            and continue from next (or end, if the result
+                            decides the loop's)
+End(path)                   finish the loop, and push its result
+Return()                    pop the result, and return it
+
+An iterating operator over a streamable "map" or "filter" (see
+jsonlogic.operators.stream), or "in" with one as its haystack, runs a single
+loop over the innermost items, with each "map" or "filter" as a stage of
+the loop's body, so that it stops at the same item that stream() would:
+
+Stream(kind, items, null)   pop the items of the innermost stage (and the
+                            needle, for "in"), and start a loop over them (or
+                            over none, if they're Null and null)
+Initial(path)               pop the initial accumulator of a streamed "reduce"
+StageMap()                  pop the result of a "map" stage, which becomes the
+                            current item
+StageFilter(next)           pop the result of a "filter" stage, and if it's
+                            falsy, drop the current item and continue from next
+Current()                   make the current item the "current" of a "reduce"
+Item()                      push the current item (for "in")
+
+A rule called with a budget or a tracer runs code translated with
+metered=True, in which each operation is between:
+
+Enter(key, path, arg)       enter the operation with the evaluation's Meter
+Exit()                      exit the innermost operation, which returned the
+                            top value
+
+so that metering, too, takes constant Python stack depth.
+"""
+
+from typing import Callable, Literal, NamedTuple
+
+from .compiler import CompiledRule, Node
+from .json import JSON, Null, Boolean, Integer, String, Array, Object, Numbers, check_numbers, lazy, number_mode
+from .jsonlogic import Meter, Operations, Operator, operators, eager_operators, meter
+from .jsonpath import JSONPath
+from .operators import stream_stage, streamable, streams, wrong_arity, wrong_type
+
+class Const(NamedTuple):
+    value: JSON
+
+class Var(NamedTuple):
+    key_path: JSONPath
+    default: JSON
+    path: JSONPath
+
+class Call(NamedTuple):
+    operator: Operator[JSON]
+    path: JSONPath
+
+class Lazy(NamedTuple):
+    operator: Operator[JSON]
+    arg: JSON
+    path: JSONPath
+
+class BuildArray(NamedTuple):
+    n: int
+    item_paths: list[JSONPath]
+    path: JSONPath
+
+class BuildObject(NamedTuple):
+    keys: list[str]
+    value_paths: list[JSONPath]
+    path: JSONPath
+
+class Raise(NamedTuple):
+    error: Callable[[], Exception]
+
+class Jump(NamedTuple):
+    target: int
+
+class PopJumpIfFalse(NamedTuple):
+    target: int
+
+class JumpIfFalseOrPop(NamedTuple):
+    target: int
+
+class JumpIfTrueOrPop(NamedTuple):
+    target: int
+
+class Repath(NamedTuple):
+    path: JSONPath
+
+class Iter(NamedTuple):
+    kind: str
+    items: JSON
+    initial: JSON | None
+
+class Next(NamedTuple):
+    end: int
+    staged: bool
+
+class Step(NamedTuple):
+    next: int
+    end: int
+
+class End(NamedTuple):
+    path: JSONPath
+
+class Return(NamedTuple):
+    pass
+
+class Stream(NamedTuple):
+    kind: str
+    items: JSON
+    null: bool
+
+class Initial(NamedTuple):
+    path: JSONPath
+
+class StageMap(NamedTuple):
+    pass
+
+class StageFilter(NamedTuple):
+    next: int
+
+class Current(NamedTuple):
+    pass
+
+class Item(NamedTuple):
+    pass
+
+class Enter(NamedTuple):
+    key: str
+    path: JSONPath
+    arg: JSON
+
+class Exit(NamedTuple):
+    pass
+
+type Instruction = (
+    Const | Var | Call | Lazy | BuildArray | BuildObject | Raise
+    | Jump | PopJumpIfFalse | JumpIfFalseOrPop | JumpIfTrueOrPop | Repath
+    | Iter | Next | Step | End | Return
+    | Stream | Initial | StageMap | StageFilter | Current | Item
+    | Enter | Exit
+)
+
+# The arity of each operator which evaluates a function against each item
+iterating_operators = {"map": 2, "filter": 2, "reduce": 3, "all": 2, "some": 2, "none": 2}
+
+class Label:
+    """
+    The target of a jump, before the instructions are laid out.
+    """
+    target: int
+
+# An instruction which jumps to a Label, built once the instructions are
+# laid out and the Label's target is known
+type Deferred = Callable[[], Instruction]
+
+# The work still to do in translate(): sub-logic to translate, instructions
+# to emit, and labels to place
+type Work = tuple[Literal["node"], JSON] | tuple[Literal["emit"], Instruction | Deferred] | tuple[Literal["label"], Label]
+
+def constants(logic: JSON) -> set[int]:
+    """
+    The ids of the sub-logic of logic which is constant (as is_constant in
+    jsonlogic.compiler), found without recursion.
+    """
+    constant: set[int] = set()
+    stack: list[tuple[JSON, bool]] = [(logic, False)]
+    while stack:
+        node, visited = stack.pop()
+        match node:
+            case Object() | Array() if not visited:
+                stack.append((node, True))
+                stack.extend((child, False) for child in (node.values() if isinstance(node, Object) else node))
+            case Object() if len(node) == 1:
+                pass
+            case Object():
+                if all(id(value) in constant for value in node.values()):
+                    constant.add(id(node))
+            case Array():
+                if all(id(item) in constant for item in node):
+                    constant.add(id(node))
+            case _:
+                constant.add(id(node))
+    return constant
+
+def translate(logic: JSON, metered: bool = False) -> list[Instruction]:
+    """
+    Translates logic into instructions which, run against some data, give
+    the same result as evaluate(logic, data). If metered, each operation is
+    entered and exited with the Meter which run() is given.
+    """
+    constant = constants(logic)
+    code: list[Instruction | Deferred] = []
+
+    # The work still to do, last first
+    work: list[Work] = [("emit", Return()), ("node", logic)]
+    while work:
+        match work.pop():
+            case ("emit", instruction):
+                code.append(instruction)
+                continue
+            case ("label", label):
+                label.target = len(code)
+                continue
+            case ("node", node):
+                pass
+
+        if id(node) in constant:
+            code.append(Const(node))
+            continue
+
+        steps: list[Work]
+        match node:
+            case Object() if len(node) == 1:
+                [(op, arg)] = node.items()
+                steps = operation(op, arg, node.path, constant)
+                if metered and op in operators:
+                    # As in evaluate(), an unrecognized operator raises
+                    # without being entered
+                    steps = [("emit", Enter(op, node.path, arg)), *steps, ("emit", Exit())]
+            case Object():
+                steps = [("node", value) for value in node.values()]
+                steps.append(("emit", BuildObject(list(node), [value.path for value in node.values()], node.path)))
+            case Array():
+                steps = [("node", value) for value in node]
+                steps.append(("emit", BuildArray(len(node), [value.path for value in node], node.path)))
+            case _:
+                # Anything else is constant
+                continue
+        work.extend(reversed(steps))
+
+    # Lay out the labels
+    return [instruction() if callable(instruction) else instruction for instruction in code]
+
+def operation(op: str, arg: JSON, logic_path: JSONPath, constant: set[int]) -> list[Work]:
+    """
+    The steps which translate the operation {op: arg}.
+    """
+    path = arg.path
+
+    def raises(error: Callable[[], Exception]) -> list[Work]:
+        return [("emit", Raise(error))]
+
+    match op:
+        case "var":
+            match arg:
+                case String() | Integer() as key:
+                    default: JSON = Null()
+                case Array([String() | Integer() as key]):
+                    default = Null()
+                case Array([String() | Integer() as key, default]) if id(default) in constant:
+                    pass
+                case _:
+                    key = None
+            match key:
+                case None | String(""):
+                    pass
+                case String():
+                    return [("emit", Var(JSONPath.from_dot_notation(key), default, path))]
+                case Integer():
+                    return [("emit", Var(JSONPath([key]), default, path))]
+            return [("node", arg), ("emit", Call(eager_operators["var"], path))]
+
+        case "if" | "?:":
+            match arg:
+                case Array([]):
+                    return [("emit", Const(Null(path=path)))]
+                case Array(_):
+                    end = Label()
+                    steps: list[Work] = []
+                    for i in range(0, len(arg) - 1, 2):
+                        otherwise = Label()
+                        steps += [
+                            ("node", arg[i]),
+                            # otherwise is bound now, as it changes with i
+                            ("emit", lambda otherwise=otherwise: PopJumpIfFalse(otherwise.target)),
+                            ("node", arg[i + 1]),
+                            ("emit", Repath(path)),
+                            ("emit", lambda: Jump(end.target)),
+                            ("label", otherwise),
+                        ]
+                    if len(arg) % 2:
+                        steps += [("node", arg[-1]), ("emit", Repath(path))]
+                    else:
+                        steps.append(("emit", Const(Null(path=path))))
+                    steps.append(("label", end))
+                    return steps
+                case _:
+                    return raises(lambda: wrong_type(arg, Array))
+
+        case "and" | "or":
+            match arg:
+                case Array([first, *rest]):
+                    end = Label()
+                    jump = JumpIfFalseOrPop if op == "and" else JumpIfTrueOrPop
+                    steps = [("node", first)]
+                    for item in rest:
+                        steps += [("emit", lambda: jump(end.target)), ("node", item)]
+                    steps += [("label", end), ("emit", Repath(path))]
+                    return steps
+                case Array(_):
+                    return raises(lambda: wrong_arity(arg, "one or more"))
+                case _:
+                    return raises(lambda: wrong_type(arg, Array))
+
+        case _ if isinstance(arg, Array) and streams(op, arg):
+            return streamed(op, arg)
+
+        case _ if op in iterating_operators:
+            arity = iterating_operators[op]
+            match arg:
+                case Array(_) if len(arg) == arity:
+                    loop, end = Label(), Label()
+                    items, fn, *initial = arg
+                    return [
+                        ("node", items),
+                        *(("node", value) for value in initial),
+                        ("emit", Iter(op, items, initial[0] if initial else None)),
+                        ("label", loop),
+                        ("emit", lambda: Next(end.target, False)),
+                        ("node", fn),
+                        ("emit", lambda: Step(loop.target, end.target)),
+                        ("label", end),
+                        ("emit", End(path)),
+                    ]
+                case Array(_):
+                    return raises(lambda: wrong_arity(arg, "two" if arity == 2 else "three"))
+                case _:
+                    return raises(lambda: wrong_type(arg, Array))
+
+        case _ if (operator := eager_operators.get(op)) is not None:
+            return [("node", arg), ("emit", Call(operator, path))]
+        case _ if (operator := operators.get(op)) is not None:
+            return [("emit", Lazy(operator, arg, path))]
+        case _:
+            return raises(lambda: ValueError(f"{logic_path}: Unrecognized operator: '{op}'"))
+
+def streamed(op: str, arg: Array) -> list[Work]:
+    """
+    The steps which translate the operation {op: arg}, which streams a "map"
+    or "filter" (see jsonlogic.operators.streams), as one loop.
+    """
+    if op == "in":
+        needle, logic = arg
+        fn = initial = None
+    else:
+        logic, fn, *rest = arg
+        initial = rest[0] if rest else None
+
+    # The stages, innermost (i.e. first applied) first
+    stages: list[tuple[str, JSON]] = []
+    while streamable(logic):
+        stage, logic, stage_fn = stream_stage(logic)
+        stages.append((stage, stage_fn))
+    stages.reverse()
+
+    loop, end = Label(), Label()
+    steps: list[Work] = []
+    if op == "in":
+        steps.append(("node", needle))
+    steps += [("node", logic), ("emit", Stream(op, logic, stages[0][0] == "map"))]
+    if initial is not None:
+        steps += [("node", initial), ("emit", Initial(initial.path))]
+    steps += [("label", loop), ("emit", lambda: Next(end.target, True))]
+    for stage, stage_fn in stages:
+        steps.append(("node", stage_fn))
+        if stage == "map":
+            steps.append(("emit", StageMap()))
+        else:
+            steps.append(("emit", lambda: StageFilter(loop.target)))
+    if op == "reduce":
+        steps.append(("emit", Current()))
+    if fn is None:
+        steps.append(("emit", Item()))
+    else:
+        steps.append(("node", fn))
+    steps += [
+        ("emit", lambda: Step(loop.target, end.target)),
+        ("label", end),
+        ("emit", End(arg.path)),
+    ]
+    return steps
+
+class Loop:
+    """
+    The state of a loop over the items of an iterating operator.
+    """
+
+    __slots__ = ("kind", "items", "index", "results", "scope", "needle", "decided", "empty")
+
+    def __init__(self, kind: str, items: Array, scope: Object | None = None, needle: JSON | None = None):
+        self.kind = kind
+        self.items = items
+        self.index = 0
+        self.results: list[JSON] = []
+        # For "reduce", the data of its function
+        self.scope = scope
+        # For "in", what it's looking for
+        self.needle = needle
+        # For "all", "some", "none", and "in", the result, once it's decided
+        self.decided: Boolean | None = None
+        # For "all", whether its function has yet to be evaluated
+        self.empty = True
+
+def start(kind: str, items_logic: JSON, initial_logic: JSON | None, stack: list[JSON]) -> Loop:
+    if initial_logic is not None:
+        # "reduce"
+        accumulator = JSON(stack.pop(), path=initial_logic.path)
+        match JSON(stack.pop(), path=items_logic.path):
+            case Null():
+                return Loop(kind, Array([]), Object({"current": None, "accumulator": accumulator}))
+            case Array() as xs:
+                return Loop(kind, xs, Object({"current": None, "accumulator": accumulator}))
+            case _:
+                raise wrong_type(items_logic, Array)
+
+    xs = stack.pop()
+    match kind, xs:
+        case "map", Null():
+            return Loop(kind, Array([]))
+        case "map" | "filter", _:
+            xs = JSON(xs, path=items_logic.path)
+    match xs:
+        case Array():
+            return Loop(kind, xs)
+        case _:
+            raise wrong_type(items_logic, Array)
+
+def start_stream(kind: str, items_logic: JSON, null: bool, stack: list[JSON]) -> Loop:
+    match stack.pop():
+        case Null() if null:
+            xs = Array([])
+        case Array() as xs:
+            pass
+        case _:
+            raise wrong_type(items_logic, Array)
+    if kind == "in":
+        return Loop(kind, xs, needle=stack.pop())
+    return Loop(kind, xs)
+
+def finish(loop: Loop, path: JSONPath) -> JSON:
+    match loop.kind, loop.scope:
+        case ("map" | "filter"), _:
+            return Array(loop.results, path=path)
+        case "reduce", Object() as scope:
+            return JSON(scope["accumulator"], path=path)
+        case "all", _:
+            # No items is false, which is stupid, but it's according to spec
+            return Boolean(not loop.empty if loop.decided is None else loop.decided, path=path)
+        case ("some" | "in"), _:
+            return Boolean(False if loop.decided is None else loop.decided, path=path)
+        case _:
+            return Boolean(True if loop.decided is None else loop.decided, path=path)
+
+def run(code: list[Instruction], data: JSON, metered: Meter | None = None) -> JSON:
+    """
+    Runs code (as translated by translate()) against data, with each
+    operation passed through metered, if the code is metered.
+    """
+    operations = None if metered is None else Operations(metered)
+    try:
+        return execute(code, data, operations)
+    except BaseException as error:
+        if operations is None:
+            raise
+        raise operations.unwind(error)
+
+def execute(code: list[Instruction], data: JSON, operations: Operations | None) -> JSON:
+    stack: list[JSON] = []
+    datas: list[JSON] = [data]
+    loops: list[Loop] = []
+    pc = 0
+    while True:
+        instruction = code[pc]
+        pc += 1
+        # Roughly in order of frequency
+        if type(instruction) is Var:
+            key_path, default, path = instruction
+            try:
+                stack.append(JSON(datas[-1].at_path(key_path), path=path))
+            except (KeyError, IndexError, ValueError):
+                stack.append(JSON(default, path=path))
+        elif type(instruction) is Const:
+            stack.append(instruction.value)
+        elif type(instruction) is Call:
+            operator, path = instruction
+            stack.append(JSON(operator(stack.pop(), datas[-1]), path=path))
+        elif type(instruction) is BuildArray:
+            n, item_paths, path = instruction
+            if n:
+                values = stack[-n:]
+                del stack[-n:]
+            else:
+                values = []
+            stack.append(Array([JSON(value, item_path) for value, item_path in zip(values, item_paths)], path=path))
+        elif type(instruction) is PopJumpIfFalse:
+            if not stack.pop():
+                pc = instruction.target
+        elif type(instruction) is JumpIfFalseOrPop:
+            if not stack[-1]:
+                pc = instruction.target
+            else:
+                stack.pop()
+        elif type(instruction) is JumpIfTrueOrPop:
+            if stack[-1]:
+                pc = instruction.target
+            else:
+                stack.pop()
+        elif type(instruction) is Repath:
+            stack[-1] = JSON(stack[-1], path=instruction.path)
+        elif type(instruction) is Jump:
+            pc = instruction.target
+        elif type(instruction) is Next:
+            loop = loops[-1]
+            if loop.decided is not None or loop.index == len(loop.items):
+                pc = instruction.end
+            elif loop.scope is None or instruction.staged:
+                datas.append(loop.items[loop.index])
+            else:
+                loop.scope["current"] = loop.items[loop.index]
+                datas.append(loop.scope)
+        elif type(instruction) is Step:
+            loop = loops[-1]
+            result = stack.pop()
+            item = datas.pop()
+            match loop.kind, loop.scope:
+                case "map", _:
+                    loop.results.append(result)
+                case "filter", _:
+                    if result:
+                        loop.results.append(item)
+                case "reduce", Object() as scope:
+                    scope["accumulator"] = result
+                case "all", _:
+                    loop.empty = False
+                    if not result:
+                        loop.decided = Boolean(False)
+                case "some", _:
+                    if result:
+                        loop.decided = Boolean(True)
+                case "none", _:
+                    if result:
+                        loop.decided = Boolean(False)
+                case "in", _:
+                    if result is loop.needle or result == loop.needle:
+                        loop.decided = Boolean(True)
+            loop.index += 1
+            pc = instruction.next if loop.decided is None else instruction.end
+        elif type(instruction) is StageMap:
+            datas[-1] = stack.pop()
+        elif type(instruction) is StageFilter:
+            if not stack.pop():
+                datas.pop()
+                loops[-1].index += 1
+                pc = instruction.next
+        elif type(instruction) is Iter:
+            loops.append(start(instruction.kind, instruction.items, instruction.initial, stack))
+        elif type(instruction) is Stream:
+            loops.append(start_stream(instruction.kind, instruction.items, instruction.null, stack))
+        elif type(instruction) is Initial:
+            loops[-1].scope = Object({"current": None, "accumulator": JSON(stack.pop(), path=instruction.path)})
+        elif type(instruction) is Current:
+            scope = loops[-1].scope
+            assert scope is not None
+            scope["current"] = datas[-1]
+            datas[-1] = scope
+        elif type(instruction) is Item:
+            stack.append(datas[-1])
+        elif type(instruction) is End:
+            stack.append(finish(loops.pop(), instruction.path))
+        elif type(instruction) is BuildObject:
+            keys, value_paths, path = instruction
+            n = len(keys)
+            values = stack[-n:] if n else []
+            if n:
+                del stack[-n:]
+            stack.append(Object({
+                key: JSON(value, value_path)
+                for key, value, value_path in zip(keys, values, value_paths)
+            }, path=path))
+        elif type(instruction) is Lazy:
+            operator, arg, path = instruction
+            stack.append(JSON(operator(arg, datas[-1]), path=path))
+        elif type(instruction) is Raise:
+            raise instruction.error()
+        elif type(instruction) is Enter:
+            operations.enter(*instruction)  # type: ignore[union-attr]
+        elif type(instruction) is Exit:
+            operations.exit(stack[-1])  # type: ignore[union-attr]
+        elif type(instruction) is Return:
+            return stack.pop()
+
+class VMRule(CompiledRule):
+    """
+    A CompiledRule which is evaluated by run(), in constant Python stack
+    depth. Its .code is the translated instructions.
+    """
+
+    code: list[Instruction]
+
+    def __init__(self, logic: object, numbers: Numbers = "decimal"):
+        # Converted lazily, since JSON() recurses through the whole logic
+        self.numbers = check_numbers(numbers)
+        token = number_mode.set(self.numbers)
+        try:
+            self.logic = lazy(logic)
+            self._node = self.build(self.logic)
+        finally:
+            number_mode.reset(token)
+
+    def build(self, logic: JSON) -> Node:
+        code = self.code = translate(logic)
+        return lambda data: run(code, data)
+
+    def build_metered(self, logic: JSON) -> Node:
+        code = translate(logic, metered=True)
+        return lambda data: run(code, data, meter.get())
+
+def compile_to_vm(logic: object, *, numbers: Numbers = "decimal") -> VMRule:
+    """
+    Like compile(), but the rule is evaluated by a virtual machine rather
+    than by nested closures (see jsonlogic.vm), so that it can be nested to
+    any depth.
+    """
+    return VMRule(logic, numbers)
@@ -20,6 +20,20 @@ def load_tests():
 
 load_tests()
 
+def load_cases() -> list[tuple[object, object, object]]:
+    with tests_path.open() as f:
+        tests = json.load(f, parse_float=Decimal)
+    return [tuple(test) for test in tests if isinstance(test, list)]
+
+def pytest_generate_tests(metafunc: pytest.Metafunc):
+    """
+    Parametrizes any test which takes a `jsonlogic_test` argument with the
+    (logic, data, expected) triples from tests.json, so that alternative
+    evaluation strategies can be checked against the same cases as evaluate.
+    """
+    if "jsonlogic_test" in metafunc.fixturenames:
+        metafunc.parametrize("jsonlogic_test", load_cases())
+
 def pytest_collect_file(parent: object, file_path: Path):
     if file_path.name == 'tests.json':
         return JSONTestFile.from_parent(parent, path=file_path)
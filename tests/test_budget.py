@@ -0,0 +1,82 @@
+import pickle
+
+from typing import Callable
+
+import pytest
+
+from jsonlogic import Budget, BudgetExceeded, JSONPath, compile, compile_to_python, compile_to_vm, evaluate, evaluate_many
+
+ENGINES: dict[str, Callable[[object, object, Budget], object]] = {
+    "evaluate": lambda logic, data, budget: evaluate(logic, data, budget=budget),
+    "compile": lambda logic, data, budget: compile(logic)(data, budget=budget),
+    "codegen": lambda logic, data, budget: compile_to_python(logic)(data, budget=budget),
+    "vm": lambda logic, data, budget: compile_to_vm(logic)(data, budget=budget),
+}
+
+GENEROUS = Budget(steps=10_000, depth=100, size=10_000, seconds=60)
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_budget_doesnt_change_results(engine: str, jsonlogic_test: tuple[object, object, object]):
+    logic, data, expected = jsonlogic_test
+    assert expected == ENGINES[engine](logic, data, GENEROUS)
+
+# Doubles the accumulator for each item
+DOUBLING = {"reduce": [{"var": "xs"}, {"merge": [{"var": "accumulator"}, {"var": "accumulator"}]}, [1]]}
+
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize("budget, limit, path", [
+    (Budget(steps=20), "steps", JSONPath(["reduce", 1])),
+    (Budget(depth=2), "depth", JSONPath(["reduce", 1, "merge", 0])),
+    (Budget(size=1000), "size", JSONPath(["reduce", 1])),
+    (Budget(seconds=0), "seconds", JSONPath([])),
+])
+def test_budget_exceeded(engine: str, budget: Budget, limit: str, path: JSONPath):
+    with pytest.raises(BudgetExceeded) as e:
+        ENGINES[engine](DOUBLING, {"xs": list(range(30))}, budget)
+    assert e.value.limit == limit
+    assert e.value.path == path
+    assert e.value.budget is budget
+    assert str(e.value).startswith(f"{path}: Exceeded the {limit} budget")
+
+@pytest.mark.parametrize("engine, depth", [("compile", 150), ("codegen", 150), ("vm", 2000)])
+def test_budget_on_a_deep_rule(engine: str, depth: int):
+    # As deep as the engine can evaluate without a budget
+    logic: object = {"var": "x"}
+    for _ in range(depth):
+        logic = {"+": [logic, 1]}
+    assert ENGINES[engine](logic, {"x": 1}, Budget(steps=depth + 1)) == depth + 1
+    # The innermost "var" is one step too many
+    with pytest.raises(BudgetExceeded) as e:
+        ENGINES[engine](logic, {"x": 1}, Budget(steps=depth))
+    assert e.value.path == JSONPath(["+", 0] * depth)
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_budget_limits_are_inclusive(engine: str):
+    logic = {"+": [1, {"*": [2, {"var": "x"}]}]}
+    assert ENGINES[engine](logic, {"x": 3}, Budget(steps=3, depth=3)) == 7
+    with pytest.raises(BudgetExceeded):
+        ENGINES[engine](logic, {"x": 3}, Budget(steps=2))
+    with pytest.raises(BudgetExceeded):
+        ENGINES[engine](logic, {"x": 3}, Budget(depth=2))
+
+def test_budget_applies_to_each_record():
+    logic = {"map": [{"var": "xs"}, {"var": ""}]}
+    records = [{"xs": [1, 2]}, {"xs": [3, 4]}]
+    # "map", its "var", and one "var" per item
+    assert list(evaluate_many(logic, records, budget=Budget(steps=4))) == [[1, 2], [3, 4]]
+    with pytest.raises(BudgetExceeded):
+        list(evaluate_many(logic, records, budget=Budget(steps=3)))
+
+def test_budget_is_only_spent_within_its_evaluation():
+    rule = compile({"var": "x"})
+    with pytest.raises(BudgetExceeded):
+        rule({"x": [1, 2]}, budget=Budget(size=1))
+    assert rule({"x": [1, 2]}) == [1, 2]
+    assert evaluate({"var": "x"}, {"x": [1, 2]}) == [1, 2]
+
+def test_budget_exceeded_can_be_pickled():
+    with pytest.raises(BudgetExceeded) as e:
+        evaluate(DOUBLING, {"xs": list(range(30))}, budget=Budget(steps=20))
+    error = pickle.loads(pickle.dumps(e.value))
+    assert (error.path, error.limit, error.budget) == (e.value.path, e.value.limit, e.value.budget)
+    assert str(error) == str(e.value)
@@ -0,0 +1,53 @@
+from decimal import Decimal
+
+from jsonlogic import JSON, RuleCache, compile_to_python, GeneratedRule
+from jsonlogic.cache import canonical
+
+def test_canonical_ignores_key_order_and_representation():
+    assert canonical({"b": [1, 2.5, None], "a": True}) == canonical(JSON({"a": True, "b": [1, 2.5, None]}))
+    assert canonical({"a": 1}) == '{"a":1}'
+    assert canonical(0.5) == "d0.5"
+    assert canonical(0.5, "float") == "f0.5"
+
+def test_canonical_keeps_json_types():
+    assert len({canonical(x) for x in (1, 1.0, True, "1", Decimal("1.0"))}) == 5
+    assert canonical(1.0) == canonical(Decimal(1))
+
+def test_rule_cache_hits_and_misses():
+    cache = RuleCache()
+    rule = cache.get({"<": [{"var": "age"}, 18]})
+    assert cache.get({"<": [{"var": "age"}, 18]}) is rule
+    assert cache.evaluate({"<": [{"var": "age"}, 18]}, {"age": 12}) == True
+    assert cache.get({"<": [{"var": "age"}, 21]}) is not rule
+    info = cache.cache_info()
+    assert (info.hits, info.misses, info.evictions, info.size) == (2, 2, 0, 2)
+
+def test_rule_cache_evicts_least_recently_used():
+    cache = RuleCache(maxsize=2)
+    a = cache.get({"var": "a"})
+    cache.get({"var": "b"})
+    cache.get({"var": "a"})
+    cache.get({"var": "c"})
+    assert cache.cache_info().evictions == 1
+    assert cache.get({"var": "a"}) is a
+    assert len(cache) == 2
+
+def test_rule_cache_byte_budget():
+    cache = RuleCache(maxsize=None, max_bytes=40)
+    for key in "abcdef":
+        cache.get({"var": key})
+    info = cache.cache_info()
+    assert info.bytes <= 40
+    assert info.evictions == 6 - info.size
+
+def test_rule_cache_compiler_and_numbers():
+    cache = RuleCache(compiler=compile_to_python, numbers="float")
+    rule = cache.get({"+": [0.1, 0.2]})
+    assert isinstance(rule, GeneratedRule)
+    assert rule({}) == 0.1 + 0.2
+
+def test_rule_cache_clear():
+    cache = RuleCache()
+    cache.get({"var": "a"})
+    cache.clear()
+    assert tuple(cache.cache_info()) == (0, 0, 0, 0, 0)
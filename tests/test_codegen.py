@@ -0,0 +1,69 @@
+import pytest
+
+from jsonlogic import compile, compile_to_python, evaluate, GeneratedRule
+from jsonlogic.codegen import generate
+
+def test_generated_rule_matches_tests_json(jsonlogic_test: tuple[object, object, object]):
+    logic, data, expected = jsonlogic_test
+    assert expected == compile_to_python(logic)(data)
+
+def test_generated_rule_inlines_hot_operators():
+    rule = compile_to_python({"and": [{"<": [{"var": "age"}, 18]}, {"==": [{"var": "tags.0"}, "a"]}]})
+    assert isinstance(rule, GeneratedRule)
+    assert "booleans[" in rule.source
+    assert [rule({"age": age, "tags": ["a"]}) for age in (12, 40)] == [True, False]
+    assert rule({"age": 12, "tags": ["b"]}) == False
+
+@pytest.mark.parametrize("logic, data", [
+    ({"+": [{"var": "x"}, 1]}, {"x": []}),
+    ({"<": [{"var": "x"}, "a", {"var": "y"}]}, {"x": 1, "y": 2}),
+    ({"and": [1, {"nope": 1}]}, {}),
+    ({"map": [{"var": "x"}, 1]}, {"x": 3}),
+    ({"if": 5}, {}),
+    ({"var": 3.5}, []),
+    ({"all": [{"var": "x"}, 1]}, {"x": None}),
+])
+def test_generated_rule_errors_match_evaluate(logic: object, data: object):
+    with pytest.raises(Exception) as expected:
+        evaluate(logic, data)
+    with pytest.raises(type(expected.value)) as actual:
+        compile_to_python(logic)(data)
+    assert str(actual.value) == str(expected.value)
+
+@pytest.mark.parametrize("logic, data", [
+    ({"!": {"var": "xs"}}, {"xs": [0]}),
+    ({"!!": {"var": "xs"}}, {"xs": [1]}),
+    ({"!!": {"?:": [True, [0], 1]}}, {}),
+    ({"!": {"<": [{"var": "x"}, 1]}}, {"x": 0}),
+])
+def test_generated_negation_matches_evaluate(logic: object, data: object):
+    # The operator negates the item of a single-item Array, so an arg that
+    # evaluates to one can't be negated inline
+    assert compile_to_python(logic)(data) == evaluate(logic, data)
+
+def test_generated_rule_notes_path_of_failing_logic():
+    with pytest.raises(ArithmeticError) as error:
+        compile_to_python({"and": [1, {"/": [{"var": "x"}, 0]}]})({"x": 1})
+    assert error.value.__notes__ == ["While evaluating the logic at $.and[1]./"]
+
+def test_generated_rule_results_have_compiled_paths():
+    for logic in ({"var": "a.b"}, {"if": [{"var": "a.b"}, 1, 2]}, {"map": [[1], {"var": ""}]}):
+        data = {"a": {"b": 1}}
+        assert compile_to_python(logic)(data).path == compile(logic)(data).path
+
+def test_generated_rule_handles_deep_and_wide_logic():
+    deep: object = {"var": "x"}
+    for _ in range(50):
+        deep = {"if": [{"var": "x"}, {"+": [deep, 1]}, 0]}
+    assert compile_to_python(deep)({"x": 1}) == 51
+
+    wide = {"and": [{"<": [{"var": f"xs.{i}"}, 1000]} for i in range(1000)]}
+    assert compile_to_python(wide)({"xs": list(range(1000))}) == True
+
+def test_generated_code_is_cached_per_rule():
+    generate.cache_clear()
+    compile_to_python({"<": [{"var": "x"}, 1]})
+    compile_to_python({"<": [{"var": "x"}, 1]})
+    compile_to_python({"<": [{"var": "x"}, 2]})
+    assert generate.cache_info().hits == 1
+    assert generate.cache_info().misses == 2
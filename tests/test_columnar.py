@@ -0,0 +1,113 @@
+import importlib
+import pytest
+import re
+import sys
+
+np = pytest.importorskip("numpy")
+
+from jsonlogic import evaluate
+from jsonlogic.columnar import Columns, Unvectorizable, evaluate_columns
+from jsonlogic.json import JSON
+
+RECORDS = [
+    {"age": age, "score": score, "country": country, "vip": vip}
+    for age, score, country, vip in [
+        (12, 0.5, "US", False),
+        (18, 2.25, "FR", True),
+        (40, -1.0, "US", True),
+        (65, 0.0, "DE", False),
+    ]
+]
+
+VECTORIZABLE = [
+    {"==": [{"var": "country"}, "US"]},
+    {"!=": [{"var": "age"}, 18]},
+    {"===": [{"var": "age"}, 18.0]},
+    {"<": [{"var": "age"}, 18]},
+    {"<=": [13, {"var": "age"}, 40]},
+    {">=": [{"var": "score"}, 0]},
+    {"and": [{">": [{"var": "age"}, 15]}, {"var": "vip"}]},
+    {"or": [{"var": "vip"}, {"<": [{"var": "score"}, 1]}]},
+    {"or": [{"var": "age"}, 7]},
+    {"!": {"var": "vip"}},
+    {"!!": [{"var": "score"}]},
+    {"+": [{"var": "age"}, 1, {"var": "age"}]},
+    {"-": [{"var": "age"}]},
+    {"*": [{"var": "age"}, 2]},
+    {"/": [{"var": "age"}, 4]},
+    {"in": [{"var": "country"}, ["US", "DE"]]},
+    {"in": [{"var": "age"}, [12, 65, 99]]},
+]
+
+@pytest.mark.parametrize("logic", VECTORIZABLE)
+def test_vectorized_matches_evaluate(logic: object):
+    columns = Columns(RECORDS)
+    columns.vectorize(JSON(logic))  # i.e. doesn't raise Unvectorizable
+    expected = [evaluate(logic, record) for record in RECORDS]
+    assert evaluate_columns(logic, RECORDS).tolist() == expected
+
+def test_vectorized_columns():
+    columns = {key: np.array([r[key] for r in RECORDS]) for key in RECORDS[0]}
+    result = evaluate_columns({"and": [{"<": [{"var": "age"}, 50]}, {"var": "vip"}]}, columns)
+    assert result.dtype == bool
+    assert result.tolist() == [False, True, True, False]
+
+@pytest.mark.parametrize("logic", [
+    {"cat": [{"var": "country"}, "!"]},
+    {"==": [{"var": "age"}, "18"]},
+    {"/": [{"var": "age"}, {"-": [{"var": "age"}, 18]}]},
+    {"and": [{"var": "age"}, {"var": "country"}]},
+    {"+": [{"var": "vip"}, 1]},
+])
+def test_unvectorizable_falls_back_to_evaluate(logic: object):
+    with pytest.raises(Unvectorizable):
+        Columns(RECORDS).vectorize(JSON(logic))
+    try:
+        expected = [evaluate(logic, record) for record in RECORDS]
+    except Exception as error:
+        with pytest.raises(type(error), match=re.escape(str(error))):
+            evaluate_columns(logic, RECORDS)
+    else:
+        result = evaluate_columns(logic, RECORDS)
+        assert result.dtype == object
+        assert result.tolist() == expected
+
+def test_missing_values_fall_back_to_evaluate():
+    records = [{"a": 1}, {}, {"a": 3}]
+    assert evaluate_columns({">": [{"var": "a"}, 0]}, records).tolist() == [True, False, True]
+
+@pytest.mark.parametrize("logic, values", [
+    ({"===": [{"var": "a"}, 1]}, [True, 1]),
+    ({"===": [{"var": "a"}, 1]}, [1, 2.5]),
+    ({"<": [{"var": "a"}, "5"]}, [10, "x"]),
+    ({"===": [{"var": "a"}, "1"]}, [1, "1"]),
+    ({"+": [{"var": "a"}, 1]}, [True, 1]),
+    ({"==": [{"var": "a"}, 9007199254740992.0]}, [2 ** 53 + 1, 1]),
+    ({"<": [{"var": "a"}, {"var": "b"}]}, [2 ** 53 + 1, 1]),
+])
+@pytest.mark.parametrize("as_columns", [False, True])
+def test_mixed_or_inexact_columns_fall_back_to_evaluate(logic: object, values: list[object], as_columns: bool):
+    records = [{"a": value, "b": 9007199254740992.0} for value in values]
+    data = {"a": values, "b": [9007199254740992.0] * len(values)} if as_columns else records
+    with pytest.raises(Unvectorizable):
+        Columns(data).vectorize(JSON(logic))
+    try:
+        expected = [evaluate(logic, record) for record in records]
+    except Exception as error:
+        with pytest.raises(type(error), match=re.escape(str(error))):
+            evaluate_columns(logic, data)
+    else:
+        assert evaluate_columns(logic, data).tolist() == expected
+
+def test_columns_of_array_items():
+    assert evaluate_columns({"+": [{"var": "a.0"}, 1]}, [{"a": [5]}, {"a": [6, 7]}]).tolist() == [6, 7]
+    columns = {"a.0": [5, 6], "a.2": ["x", "y"], "b.c": [1, 2]}
+    logic = {"cat": [{"var": "a.0"}, {"var": "a.2"}, {"var": "b.c"}]}
+    assert evaluate_columns(logic, columns).tolist() == ["5x1", "6y2"]
+    assert evaluate_columns({"var": "a.1"}, columns).tolist() == [None, None]
+
+def test_import_without_numpy_names_the_extra(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setitem(sys.modules, "numpy", None)
+    monkeypatch.delitem(sys.modules, "jsonlogic.columnar")
+    with pytest.raises(ImportError, match=re.escape('pip install "jsonlogic[columnar]"')):
+        importlib.import_module("jsonlogic.columnar")
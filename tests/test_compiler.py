@@ -0,0 +1,60 @@
+import pytest
+
+from jsonlogic import compile, evaluate, evaluate_many, CompiledRule, JSONPath
+
+def test_compiled_rule_matches_tests_json(jsonlogic_test: tuple[object, object, object]):
+    logic, data, expected = jsonlogic_test
+    assert expected == compile(logic)(data)
+
+def test_compiled_rule_is_reusable():
+    rule = compile({"<": [{"var": "age"}, 18]})
+    assert isinstance(rule, CompiledRule)
+    assert [rule({"age": age}) for age in (12, 18, 40)] == [True, False, False]
+
+def test_compiled_rule_error_paths():
+    with pytest.raises(TypeError, match=r"^\$\.var: Expected String or Integer, but got Float$"):
+        compile({"var": 3.5})(["a", "b", "c"])
+    with pytest.raises(TypeError, match=r"^\$\.if: Expected Array, but got Integer$"):
+        compile({"if": 5})({})
+    with pytest.raises(TypeError, match=r"^\$\.and: Expected one or more args, but got 0$"):
+        compile({"and": []})({})
+
+def test_compiled_rule_defers_errors_to_evaluation():
+    rule = compile({"or": [{"var": "ok"}, {"nope": 1}]})
+    assert rule({"ok": True}) == evaluate({"or": [{"var": "ok"}, {"nope": 1}]}, {"ok": True})
+    with pytest.raises(ValueError, match=r"^\$\.or\[1\]: Unrecognized operator: 'nope'$"):
+        rule({"ok": False})
+
+def test_compiled_var_with_literal_key():
+    data = {"a": {"b": [10, 20]}, "c": None}
+    for arg, expected in [
+        ("a.b.1", 20),
+        (["a.b.2", "default"], "default"),
+        (["c", "default"], None),
+        (["nope"], None),
+        (0, None),
+        (["a.b", {"var": "c"}], [10, 20]),
+    ]:
+        logic = {"var": arg}
+        assert expected == compile(logic)(data)
+        assert expected == evaluate(logic, data)
+    assert compile({"var": "a.b.0"})(data).path == JSONPath(["var"])
+
+def test_evaluate_many():
+    logic = {"if": [{"<": [{"var": "n"}, 10]}, "small", "big"]}
+    records = ({"n": n} for n in (1, 50, 9))
+    results = evaluate_many(logic, records)
+    assert next(results) == "small"
+    assert list(results) == ["big", "small"]
+    assert list(compile(logic).map([{"n": 10}])) == ["big"]
+
+def test_compiled_rule_with_native_floats():
+    rule = compile({"*": [{"var": "price"}, 1.1]}, numbers="float")
+    assert rule({"price": 3}) == 3 * 1.1
+    assert list(rule.map([{"price": 1}, {"price": 2.5}])) == [1.1, 2.5 * 1.1]
+    assert list(evaluate_many({"/": [{"var": ""}, 4]}, [1, 2], numbers="float")) == [0.25, 0.5]
+
+    # The mode belongs to the rule, not to whatever calls it
+    exact = compile({"+": [0.1, 0.2]})
+    assert evaluate({"+": [0.1, 0.2]}, {}, numbers="float") == 0.1 + 0.2
+    assert str(exact({})) == str(evaluate({"+": [0.1, 0.2]}, {}))
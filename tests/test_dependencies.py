@@ -0,0 +1,43 @@
+import pytest
+
+from jsonlogic import JSONPath, dependencies, evaluate, project, wildcard
+
+def test_projected_data_gives_the_same_result(jsonlogic_test: tuple[object, object, object]):
+    logic, data, expected = jsonlogic_test
+    assert expected == evaluate(logic, project(data, dependencies(logic)))
+
+@pytest.mark.parametrize("logic, paths", [
+    ({"var": "a.b"}, [["a", "b"]]),
+    ({"var": ["a.0", {"var": "b"}]}, [["a", 0], ["b"]]),
+    ({"if": [{"var": "a"}, {"var": "a.b"}, {"var": "c"}]}, [["a"], ["c"]]),
+    ({"missing_some": [1, ["a", "b.c"]]}, [["a"], ["b", "c"]]),
+    ({"map": [{"var": "items"}, {"*": [{"var": "price"}, {"var": "qty"}]}]}, [["items", wildcard, "price"], ["items", wildcard, "qty"]]),
+    ({"filter": [{"var": "xs"}, {"var": "ok"}]}, [["xs", wildcard]]),
+    ({"some": [{"filter": [{"var": "xs"}, {"var": "ok"}]}, {"var": "v"}]}, [["xs", wildcard, "ok"], ["xs", wildcard, "v"]]),
+    ({"map": [{"var": "xs"}, {"map": [{"var": "ys"}, {"var": "z"}]}]}, [["xs", wildcard, "ys", wildcard, "z"]]),
+    ({"reduce": [{"var": "xs"}, {"+": [{"var": "current.v"}, {"var": "accumulator"}]}, {"var": "init"}]}, [["init"], ["xs", wildcard, "v"]]),
+    ({"all": [{"var": "xs"}, True]}, [["xs"]]),
+    ({"map": [[[1, 2]], {"var": 0}]}, []),
+    ({"var": {"cat": ["a", {"var": "k"}]}}, [[]]),
+    ({"map": [{"var": "xs"}, {"var": {"var": "k"}}]}, [["xs", wildcard]]),
+])
+def test_dependencies(logic: object, paths: list[list]):
+    assert dependencies(logic) == {JSONPath(path) for path in paths}
+
+def test_project():
+    data = {"a": {"b": 1, "c": 2}, "items": [{"price": 1, "qty": 2}, {"price": 3}, 5], "z": 9}
+    paths = [JSONPath(["a", "b"]), JSONPath(["items", wildcard, "price"]), JSONPath(["items", -1])]
+    assert project(data, paths) == {"a": {"b": 1}, "items": [{"price": 1}, {"price": 3}, 5]}
+    assert project(data, [JSONPath(["items", 1])]) == {"items": [None, {"price": 3}, None]}
+    assert project(data, [JSONPath([])]) is data
+
+@pytest.mark.parametrize("logic, data", [
+    ({"map": [{"var": "xs"}, {"var": "a.b"}]}, {"xs": [1, {"a": 2}, {"a": {"b": 3}}, "s"]}),
+    ({"reduce": [{"var": "xs"}, {"cat": [{"var": "accumulator"}, {"var": "current.s"}]}, ""]}, {"xs": [{"s": "a"}, {"s": "b", "t": 1}]}),
+    ({"var": "xs.-1.v"}, {"xs": [{"v": 1}, {"v": 2}]}),
+    ({"missing": ["a", "b"]}, {"a": None, "c": 1}),
+    ({"all": [{"var": "xs"}, {"var": "ok"}]}, {"xs": []}),
+])
+def test_projected_data_gives_the_same_result_in_scopes(logic: object, data: object):
+    # Compared by repr, since Null() != Null()
+    assert repr(evaluate(logic, data)) == repr(evaluate(logic, project(data, dependencies(logic))))
@@ -0,0 +1,73 @@
+import copy
+import random
+
+import pytest
+
+from jsonlogic import IncrementalRule, JSONPath, evaluate
+
+def test_incremental_rule_matches_tests_json(jsonlogic_test: tuple[object, object, object]):
+    logic, data, expected = jsonlogic_test
+    rule = IncrementalRule(logic, data)
+    assert expected == rule.result()
+    assert expected == rule.result()
+
+def test_incremental_rule_only_recomputes_affected_operations():
+    rule = IncrementalRule(
+        {"if": [{"var": "a"}, {"+": [{"var": "b"}, {"*": [{"var": "c"}, 2]}]}, {"var": "d"}]},
+        {"a": True, "b": 1, "c": 2},
+    )
+    assert rule.result() == 5
+    assert rule.misses == 6
+
+    rule.misses = 0
+    assert rule.update({"b": 10}) == 14
+    # The "if", the "+", and {"var": "b"}, but not the "*"
+    assert rule.misses == 3
+    assert rule.hits == 2
+
+    assert rule.update({"a": False, "d": "x"}) == "x"
+    assert rule.update({"e.f": 1}) == "x"
+    assert rule.data == {"a": False, "b": 10, "c": 2, "d": "x", "e": {"f": 1}}
+
+def test_incremental_rule_patches_copy_on_write():
+    data = {"xs": [{"v": 1}, {"v": 2}]}
+    rule = IncrementalRule({"map": [{"var": "xs"}, {"var": "v"}]}, data)
+    before = rule.result()
+    assert rule.update({JSONPath(["xs", -1, "v"]): 3}) == [1, 3]
+    assert before == [1, 2]
+    assert data == {"xs": [{"v": 1}, {"v": 2}]}
+
+def test_incremental_rule_patch_which_raises_changes_nothing():
+    rule = IncrementalRule({"var": "a"}, {"a": 1, "b": 2})
+    with pytest.raises(ValueError):
+        rule.update({"a": 3, "b.c": 4})
+    assert rule.result() == 1
+
+KEYS = ["a", "b", "c.d", "xs"]
+
+@pytest.mark.parametrize("seed", range(5))
+def test_incremental_rule_matches_evaluate(seed: int):
+    rng = random.Random(seed)
+    logic = {"and": [
+        {"if": [{"var": "a"}, {"cat": [{"var": "b"}, "!"]}, {"var": "c.d"}]},
+        {"some": [{"var": "xs"}, {">": [{"var": "n"}, {"var": ["", 0]}]}]},
+        {"or": [{"missing": ["a", "b"]}, {"<": [{"var": "c.d"}, 10]}]},
+        {"reduce": [{"var": "xs"}, {"+": [{"var": "accumulator"}, {"var": "current.n"}]}, 0]},
+    ]}
+    data = {"a": True, "b": "x", "c": {"d": 1}, "xs": [{"n": 1}]}
+    rule = IncrementalRule(logic, data)
+    for _ in range(30):
+        key = rng.choice(KEYS)
+        value = rng.choice([True, False, 0, 5, 20, "y", [{"n": 2}, {"n": 0}], []]) if key != "xs" else [{"n": rng.randrange(3)} for _ in range(rng.randrange(3))]
+        target = data
+        *parents, last = key.split(".")
+        for parent in parents:
+            target = target[parent]
+        target[last] = value
+        try:
+            expected = evaluate(logic, data)
+        except Exception as error:
+            with pytest.raises(type(error)):
+                rule.update({key: copy.deepcopy(value)})
+        else:
+            assert repr(expected) == repr(rule.update({key: copy.deepcopy(value)}))
@@ -1,7 +1,10 @@
+import pickle
+import pytest
+
 from decimal import Decimal
 from typing import assert_type
 
-from jsonlogic.json import JSON, Null, Boolean, Integer, Float, String, Array, Object
+from jsonlogic.json import JSON, Null, Boolean, Integer, Float, NativeFloat, String, Array, Object
 from jsonlogic.jsonpath import JSONPath
 
 def test_JSON_constructor_static_type_without_path():
@@ -9,7 +12,7 @@ def test_JSON_constructor_static_type_without_path():
     assert_type(JSON(True), Boolean)
     assert_type(JSON(False), Boolean)
     assert_type(JSON(0), Integer)
-    assert_type(JSON(3.5), Float)
+    assert_type(JSON(3.5), Float | NativeFloat)
     assert_type(JSON(Decimal("0")), Float)
     assert_type(JSON(""), String)
     assert_type(JSON([]), Array)
@@ -21,7 +24,7 @@ def test_JSON_constructor_static_type_with_path():
     assert_type(JSON(True, path=path), Boolean)
     assert_type(JSON(False, path=path), Boolean)
     assert_type(JSON(0, path=path), Integer)
-    assert_type(JSON(3.5, path=path), Float)
+    assert_type(JSON(3.5, path=path), Float | NativeFloat)
     assert_type(JSON(Decimal("0"), path=path), Float)
     assert_type(JSON("", path=path), String)
     assert_type(JSON([], path=path), Array)
@@ -99,3 +102,71 @@ def test_type_constructor_runtime_type_with_path():
     assert type(String("", path=path)) is String
     assert type(Array([], path=path)) is Array
     assert type(Object({}, path=path)) is Object
+
+def test_JSON_constructor_passes_JSON_through():
+    value = JSON({"a": [1, {"b": None}]})
+    assert JSON(value) is value
+    assert JSON(value, path=value.path) is value
+    a = value["a"]
+    assert JSON(a) is a
+
+def test_JSON_constructor_with_new_path_shares_items():
+    value = JSON({"a": [1, {"b": None}]})
+    a = value["a"]
+    assert isinstance(a, Array)
+    path = JSONPath(["x"])
+    moved = JSON(a, path=path)
+    assert moved is not a
+    assert moved.path == path
+    assert moved[1] is a[1]
+    assert moved[1].path == JSONPath(["a", 1])
+
+def test_at_path():
+    value = JSON({"a": [1, {"b": None}]})
+    a = value["a"]
+    assert isinstance(a, Array)
+    a1 = a[1]
+    assert isinstance(a1, Object)
+    assert value.at_path(JSONPath([])) is value
+    assert value.at_path(JSONPath(["a", 1, "b"])) is a1["b"]
+    assert value.at_path(JSONPath(["a", -1])) is a1
+    with pytest.raises(KeyError):
+        value.at_path(JSONPath(["b"]))
+    with pytest.raises(IndexError):
+        value.at_path(JSONPath(["a", 2]))
+    with pytest.raises(ValueError, match=r"^\$\.a: Cannot index Array with str$"):
+        value.at_path(JSONPath(["a", "b"]))
+
+def test_at_paths():
+    value = JSON({"a": [1, {"b": None}], "c": "d"})
+    a = value["a"]
+    assert isinstance(a, Array)
+    paths = [JSONPath(p) for p in (["a", 1, "b"], ["a", 0], ["a", 2], ["c"], ["c", 0], [], ["a", 0])]
+    assert value.at_paths(paths) == [
+        value.at_path(paths[0]), a[0], None, value["c"], None, value, a[0]
+    ]
+
+def test_pathless_values_are_interned():
+    assert Null() is Null()
+    assert Boolean(True) is JSON(True)
+    assert Integer(7) is JSON(7)
+    assert Integer(1000) is not Integer(1000)
+    # Values with paths are not
+    path = JSONPath(["a"])
+    assert Null(path=path) is not Null(path=path)
+    assert Integer(7, path=path).path == path
+    assert Integer(7).path == JSONPath.empty()
+
+def test_values_have_no_dict():
+    for value in (Null(path=JSONPath(["a"])), Float(1.5), Array([]), Object({})):
+        assert not hasattr(value, "__dict__")
+
+def test_pickling_keeps_paths_and_interned_values():
+    value = JSON({"a": [None, True, 7, 1.5, "s"]})
+    copy = pickle.loads(pickle.dumps(value))
+    a, copied = value["a"], copy["a"]
+    assert isinstance(a, Array) and isinstance(copied, Array)
+    assert copied[1:] == a[1:]
+    assert type(copied[0]) is Null
+    assert [item.path for item in copied] == [item.path for item in a]
+    assert Null().path == Boolean(True).path == Integer(7).path == JSONPath.empty()
@@ -0,0 +1,70 @@
+import pytest
+
+from jsonlogic import evaluate, compile, lazy
+from jsonlogic.json import JSON, Integer, String, Array, Object, LazyArray, LazyObject, json_type
+from jsonlogic.jsonpath import JSONPath
+
+def test_lazy_matches_tests_json(jsonlogic_test: tuple[object, object, object]):
+    logic, data, expected = jsonlogic_test
+    assert expected == evaluate(logic, lazy(data))
+    assert expected == compile(logic)(lazy(data))
+
+def test_lazy_runtime_type():
+    assert type(lazy([])) is LazyArray
+    assert type(lazy({})) is LazyObject
+    assert type(lazy("")) is String
+    assert type(lazy(0)) is Integer
+    assert json_type(lazy([])) is Array
+    assert json_type(lazy({})) is Object
+
+def test_lazy_converts_only_what_is_accessed():
+    raw = {"a": {"b": [1, 2]}, "c": [{"d": 3}]}
+    data = lazy(raw)
+    assert isinstance(data, LazyObject)
+    assert evaluate({"var": "a.b.1"}, data) == 2
+
+    assert dict.__getitem__(data, "c") is raw["c"]
+    a = data["a"]
+    assert isinstance(a, LazyObject)
+    b = a["b"]
+    assert type(b) is LazyArray
+    assert list.__getitem__(b, 0) == 1 and not isinstance(list.__getitem__(b, 0), JSON)
+    assert isinstance(list.__getitem__(b, 1), JSON)
+
+def test_lazy_memoizes_converted_values():
+    data = lazy({"a": [{"b": None}]})
+    assert isinstance(data, LazyObject)
+    a = data["a"]
+    assert isinstance(a, LazyArray)
+    assert data["a"] is a
+    assert a[0] is next(iter(a))
+    assert a[0].path == JSONPath(["a", 0])
+
+@pytest.mark.parametrize("copy", [
+    dict,
+    lambda data: {**data},
+    lambda data: data.copy(),
+    lambda data: data | {},
+    lambda data: {} | data,
+    lambda data: dict(data.items()),
+    lambda data: dict(zip(data, data.values())),
+])
+def test_lazy_object_copies_are_converted(copy):
+    data = lazy({"a": [1], "b": {"c": 2}})
+    copied = copy(data)
+    assert copied == {"a": [1], "b": {"c": 2}}
+    assert type(copied["a"]) is LazyArray
+    assert type(copied["b"]) is LazyObject
+    assert isinstance(data, LazyObject)
+    assert copied["a"] is data["a"]
+    assert copied["b"]["c"].path == JSONPath(["b", "c"])
+
+def test_lazy_object_rewrapped_shares_unconverted_values():
+    raw = {"a": [1]}
+    data = LazyObject(LazyObject(raw), JSONPath(["x"]))
+    assert dict.__getitem__(data, "a") is raw["a"]
+    assert data["a"].path == JSONPath(["a"])
+
+def test_lazy_error_messages_use_json_type_names():
+    with pytest.raises(TypeError, match=r"^\$\.\+\[0\]: Expected Integer, Float, or String, but got Array$"):
+        evaluate({"+": [{"var": "a"}]}, lazy({"a": [1]}))
@@ -0,0 +1,19 @@
+from jsonlogic.jsonpath import JSONPath
+
+def test_from_dot_notation():
+    assert JSONPath.from_dot_notation("a") == ("a",)
+    assert JSONPath.from_dot_notation("a.0.b") == ("a", 0, "b")
+    assert JSONPath.from_dot_notation("1.-1") == (1, -1)
+    assert JSONPath.from_dot_notation("a..b") == ("a", "", "b")
+
+def test_from_dot_notation_is_cached():
+    path = JSONPath.from_dot_notation("x.1.y")
+    assert type(path) is JSONPath
+    assert JSONPath.from_dot_notation("x.1.y") is path
+
+def test_wildcard():
+    import pickle
+    from jsonlogic.jsonpath import wildcard
+
+    assert str(JSONPath(["items", wildcard, "price"])) == "$.items[*].price"
+    assert pickle.loads(pickle.dumps(wildcard)) is wildcard
@@ -0,0 +1,89 @@
+import io
+import subprocess
+import sys
+
+from pathlib import Path
+
+import pytest
+
+from jsonlogic.__main__ import main
+
+RECORDS = '{"age": 12, "n": 1.5}\n\n{"age": 30, "n": 2}\n{"age": 17, "n": 0.1}\n'
+
+def run(monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str], *argv: str, input: str = RECORDS) -> tuple[int, str, str]:
+    monkeypatch.setattr(sys, "stdin", io.StringIO(input))
+    status = main(list(argv))
+    out, err = capsys.readouterr()
+    return status, out, err
+
+def test_main_writes_one_result_per_record(monkeypatch, capsys):
+    assert run(monkeypatch, capsys, '{"+": [{"var": "n"}, 0.2]}') == (0, "1.7\n2.2\n0.3\n", "")
+    assert run(monkeypatch, capsys, '{"merge": [{"var": "age"}, null, {"var": "n"}]}') == (
+        0, "[12, null, 1.5]\n[30, null, 2]\n[17, null, 0.1]\n", ""
+    )
+
+def test_main_parses_floats_natively(monkeypatch, capsys):
+    assert run(monkeypatch, capsys, "--numbers", "float", '{"+": [{"var": "n"}, 0.2]}') == (
+        0, "1.7\n2.2\n0.30000000000000004\n", ""
+    )
+
+def test_main_filters_records(monkeypatch, capsys, tmp_path: Path):
+    rule = tmp_path / "rule.json"
+    rule.write_text('{"<": [{"var": "age"}, 18]}')
+    records = tmp_path / "records.ndjson"
+    records.write_text(RECORDS)
+    expected = (0, '{"age": 12, "n": 1.5}\n{"age": 17, "n": 0.1}\n', "")
+    assert run(monkeypatch, capsys, "--filter", "--rule-file", str(rule)) == expected
+    assert run(monkeypatch, capsys, "--filter", "--rule-file", str(rule), str(records)) == expected
+    assert run(monkeypatch, capsys, "--filter", '{"<": [{"var": "age"}, 18]}', str(records)) == expected
+
+@pytest.mark.parametrize("workers", ["1", "2"])
+def test_main_reports_errors_with_line_numbers(monkeypatch, capsys, workers: str):
+    input = '{"x": 1}\n\n{"x": [2]}\n{"x": 3}\n'
+    status, out, err = run(monkeypatch, capsys, "-j", workers, "--chunksize", "1", '{"+": [{"var": "x"}, 1]}', input=input)
+    assert (status, out) == (1, "2\n")
+    assert err.startswith("line 3: $.+[0]: ")
+
+    status, out, err = run(monkeypatch, capsys, "-j", workers, "--chunksize", "1", '{"var": "x"}', input='{"x": 1}\n{"x"\n')
+    assert (status, out) == (1, "1\n")
+    assert err.startswith("line 2: ")
+
+def test_main_evaluates_in_parallel(monkeypatch, capsys):
+    input = "".join(f'{{"x": {i}}}\n' for i in range(50))
+    status, out, _ = run(monkeypatch, capsys, "-j", "2", "--chunksize", "7", "--filter", '{"==": [{"%": [{"var": "x"}, 10]}, 3]}', input=input)
+    assert status == 0
+    assert out == "".join(f'{{"x": {i}}}\n' for i in range(3, 50, 10))
+
+def test_main_takes_options_between_the_rule_and_the_input(monkeypatch, capsys, tmp_path: Path):
+    records = tmp_path / "records.ndjson"
+    records.write_text(RECORDS)
+    status, out, _ = run(monkeypatch, capsys, '{"<": [{"var": "age"}, 18]}', "--filter", "-j", "2", str(records))
+    assert (status, out) == (0, '{"age": 12, "n": 1.5}\n{"age": 17, "n": 0.1}\n')
+
+def test_main_rejects_bad_rules(monkeypatch, capsys):
+    assert run(monkeypatch, capsys, "{bad")[0] == 2
+    status, out, err = run(monkeypatch, capsys, '{"bogus": [1]}')
+    assert (status, out) == (2, "")
+    assert err == "Invalid rule: $: Unrecognized operator: 'bogus'\n"
+    # However deep, and whether or not it would be reached
+    assert run(monkeypatch, capsys, '{"if": [false, {"map": [[], {"bogus": 1}]}, 1]}')[0] == 2
+    with pytest.raises(SystemExit):
+        run(monkeypatch, capsys)
+    with pytest.raises(SystemExit):
+        run(monkeypatch, capsys, "--rule-file", "rule.json", "{}", "records.ndjson")
+
+@pytest.mark.parametrize("option", ["--workers", "--chunksize"])
+def test_main_rejects_bad_counts(monkeypatch, capsys, option: str):
+    with pytest.raises(SystemExit):
+        run(monkeypatch, capsys, option, "0", '{"var": "x"}')
+    assert "must be at least 1" in capsys.readouterr().err
+
+def test_main_runs_as_a_module():
+    completed = subprocess.run(
+        [sys.executable, "-m", "jsonlogic", '{"cat": [{"var": "a"}, "!"]}'],
+        input='{"a": "hi"}\n{"a": "\\u00e9"}\n',
+        capture_output=True,
+        text=True,
+        cwd=Path(__file__).parent.parent,
+    )
+    assert (completed.returncode, completed.stdout) == (0, '"hi!"\n"\\u00e9!"\n')
@@ -0,0 +1,81 @@
+import random
+
+from typing import Sequence
+
+import pytest
+
+from jsonlogic import RuleMatcher, evaluate
+
+def brute_force(rules: Sequence[object], data: object) -> list[int]:
+    return [i for i, rule in enumerate(rules) if evaluate(rule, data)]
+
+def test_rule_matcher_matches_by_key():
+    matcher = RuleMatcher({
+        "us": {"==": [{"var": "country"}, "US"]},
+        "adult": {"and": [{">=": [{"var": "age"}, 18]}, {"var": "verified"}]},
+        "pro": {"in": [{"var": "plan"}, ["pro", "team"]]},
+    })
+    assert matcher.match({"country": "US", "age": 40, "verified": True, "plan": "free"}) == ["us", "adult"]
+    assert matcher.match({"country": "FR", "age": 12, "plan": "team"}) == ["pro"]
+
+def test_rule_matcher_only_evaluates_candidates():
+    rules = [
+        {"and": [{"==": [{"var": "country"}, country]}, {"<": [18, {"var": "age"}, 65]}, {"var": "x"}]}
+        for country in ("US", "FR", "DE")
+        for _ in range(100)
+    ]
+    matcher = RuleMatcher(rules)
+    assert len(matcher.candidates({"country": "FR", "age": 30})) == 100
+    assert matcher.candidates({"country": "FR", "age": 10}) == []
+    # Comparing 1 with "US" raises, so no rule can be ruled out
+    assert len(matcher.candidates({"country": 1, "age": 30})) == 300
+
+def test_rule_matcher_raises_like_evaluate():
+    rules = [{"==": [{"var": "country"}, "US"]}, {"==": [{"var": "country"}, 1]}]
+    with pytest.raises(Exception) as expected:
+        brute_force(rules, {"country": 2})
+    with pytest.raises(type(expected.value)) as actual:
+        RuleMatcher(rules).match({"country": 2})
+    assert str(actual.value) == str(expected.value)
+    assert actual.value.__notes__ == ["While evaluating rule 0"]
+
+VALUES = ["US", "FR", "1", "", 0, 1, 1.5, 18, 65, True, False, None, [1], {"a": 1}]
+
+def random_predicate(rng: random.Random) -> object:
+    var = {"var": rng.choice(["a", "b", "c.d"])}
+    literal = rng.choice([v for v in VALUES if not isinstance(v, (list, dict))])
+    match rng.randrange(5):
+        case 0:
+            op = rng.choice(["==", "==="])
+            return {op: [var, literal] if rng.random() < 0.5 else [literal, var]}
+        case 1:
+            return {"in": [var, rng.sample(["US", "FR", "1", 0, 1, 1.5, True], rng.randrange(4))]}
+        case 2:
+            op, bound = rng.choice(["<", "<=", ">", ">="]), rng.choice([0, 1, 1.5, 18, 65])
+            return {op: [var, bound] if rng.random() < 0.5 else [bound, var]}
+        case 3:
+            op = rng.choice(["<", "<=", ">", ">="])
+            return {op: [rng.choice([0, 18]), var, rng.choice([1.5, 65])]}
+        case _:
+            return rng.choice([var, {"!": var}, {"+": [var, 1]}])
+
+@pytest.mark.parametrize("seed", range(5))
+def test_rule_matcher_matches_evaluate(seed: int):
+    rng = random.Random(seed)
+    rules = [
+        {"and": [random_predicate(rng) for _ in range(rng.randrange(1, 4))]} if rng.random() < 0.7 else random_predicate(rng)
+        for _ in range(200)
+    ]
+    matcher = RuleMatcher(rules)
+    for _ in range(50):
+        data = {key: rng.choice(VALUES) for key in ("a", "b") if rng.random() < 0.9}
+        if rng.random() < 0.5:
+            data["c"] = {"d": rng.choice(VALUES)}
+        try:
+            expected = brute_force(rules, data)
+        except Exception as error:
+            with pytest.raises(type(error)) as actual:
+                matcher.match(data)
+            assert str(actual.value) == str(error)
+        else:
+            assert expected == matcher.match(data)
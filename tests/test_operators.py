@@ -0,0 +1,48 @@
+import pytest
+
+from jsonlogic import Float, Integer, NativeFloat, evaluate
+
+def test_variadic_operators_handle_long_arrays():
+    n = 10_000
+    data = {"xs": list(range(n)), "ss": ["a"] * n}
+    assert evaluate({"+": {"var": "xs"}}, data) == n * (n - 1) // 2
+    assert evaluate({"*": {"var": "xs"}}, data) == 0
+    assert evaluate({"cat": {"var": "ss"}}, data) == "a" * n
+    assert evaluate({"merge": [{"var": "xs"}, {"var": "ss"}]}, data) == [*range(n), *["a"] * n]
+
+def test_native_floats_match_tests_json(jsonlogic_test: tuple[object, object, object]):
+    logic, data, expected = jsonlogic_test
+    assert expected == evaluate(logic, data, numbers="float")
+
+def test_native_float_arithmetic():
+    assert type(evaluate({"+": [0.1, 0.2]}, {}, numbers="float")) is NativeFloat
+    assert evaluate({"+": [0.1, 0.2]}, {}, numbers="float") == 0.1 + 0.2
+    assert evaluate({"*": [{"var": "x"}, "1.5"]}, {"x": 2}, numbers="float") == 3.0
+    assert evaluate({"/": [1, 3]}, {}, numbers="float") == 1 / 3
+    assert evaluate({"%": [-7, 3]}, {}, numbers="float") == -1.0
+    assert evaluate({"%": [-7.5, 2]}, {}, numbers="float") == -1.5
+
+    # Integer arithmetic stays exact, and Integer
+    big = 2 ** 64 + 1
+    assert type(evaluate({"+": [big, 1]}, {}, numbers="float")) is Integer
+    assert evaluate({"-": [big, 1]}, {}, numbers="float") == 2 ** 64
+    assert evaluate({"%": [big, 2 ** 64]}, {}, numbers="float") == 1
+
+    # A NativeFloat is still a Float, as far as === and cat are concerned
+    assert evaluate({"===": [{"/": [4, 2]}, 2.0]}, {}, numbers="float") == True
+    assert evaluate({"cat": [{"/": [4, 2]}, "x"]}, {}, numbers="float") == "2x"
+
+def test_native_float_errors():
+    with pytest.raises(ZeroDivisionError, match=r"^\$\./: Division by zero$"):
+        evaluate({"/": [1, 0]}, {}, numbers="float")
+    with pytest.raises(ZeroDivisionError, match=r"^\$\.\+\[0\]\./: Division by zero$"):
+        evaluate({"+": [{"/": [1.5, 0.0]}]}, {}, numbers="float")
+    with pytest.raises(ZeroDivisionError, match=r"^\$\.%: Modulo by zero$"):
+        evaluate({"%": [1.5, 0]}, {}, numbers="float")
+    with pytest.raises(ValueError, match="numbers"):
+        evaluate({"+": [1, 2]}, {}, numbers="double")  # type: ignore[arg-type]
+
+def test_decimal_is_the_default():
+    assert type(evaluate({"+": [0.1, 0.2]}, {})) is Float
+    # NativeFloats in the logic or data are converted back to Decimals
+    assert type(evaluate({"+": [NativeFloat(0.1), 0.2]}, {}, numbers="decimal")) is Float
@@ -0,0 +1,82 @@
+import pytest
+
+from jsonlogic import evaluate, optimize, JSON, JSONPath, NativeFloat, Array, Object
+
+def test_optimized_rule_matches_tests_json(jsonlogic_test: tuple[object, object, object]):
+    logic, data, expected = jsonlogic_test
+    assert expected == evaluate(optimize(logic), data)
+
+@pytest.mark.parametrize("logic, optimized", [
+    ({"+": [1, 2]}, 3),
+    ({"cat": ["a", "b"]}, "ab"),
+    ({"if": [True, {"var": "a"}, {"var": "b"}]}, {"if": [{"var": "a"}]}),
+    ({"if": [False, 1, {"var": "c"}, 2, 3]}, {"if": [{"var": "c"}, 2, 3]}),
+    ({"if": [{"==": [1, 2]}, 1, {"var": "c"}]}, {"if": [{"var": "c"}]}),
+    ({"if": [False, {"var": "a"}, 1]}, 1),
+    ({"and": [True, {"var": "a"}]}, {"and": [{"var": "a"}]}),
+    ({"and": [True, {"and": [{"var": "a"}, {"var": "b"}]}]}, {"and": [{"var": "a"}, {"var": "b"}]}),
+    ({"or": [{"var": "a"}, {"or": [{"var": "b"}, 1, {"var": "c"}]}]}, {"or": [{"var": "a"}, {"var": "b"}, 1]}),
+    ({"cat": [{"var": "a"}, {"cat": ["b", {"cat": ["c", {"var": "d"}]}]}]}, {"cat": [{"var": "a"}, "b", {"cat": ["c", {"var": "d"}]}]}),
+    ({"+": [{"var": "x"}, {"+": [2, {"*": [{"var": "y"}, 3]}]}]}, {"+": [{"var": "x"}, 2, {"*": [{"var": "y"}, 3]}]}),
+    ({"+": [1, {"+": [2, {"var": "x"}]}]}, {"+": [1, {"+": [2, {"var": "x"}]}]}),
+    ({"+": [{"+": [2, {"var": "x"}]}, 1]}, {"+": [{"+": [2, {"var": "x"}]}, 1]}),
+    ({"map": [[1, 2], {"*": [{"var": ""}, 2]}]}, [2, 4]),
+    ({"some": [{"var": "xs"}, {"<": [{"var": ""}, {"+": [1, 1]}]}]}, {"some": [{"var": "xs"}, {"<": [{"var": ""}, 2]}]}),
+    ({"a": {"+": [1, 1]}, "b": {"var": "b"}}, {"a": 2, "b": {"var": "b"}}),
+])
+def test_optimize(logic: object, optimized: object):
+    assert JSON(optimized) == optimize(logic)
+
+@pytest.mark.parametrize("logic", [
+    {"log": "hello"},
+    {"map": [[1], {"log": {"var": ""}}]},
+    {"/": [1, 0]},
+    {"+": [{"var": "x"}, {"-": [[], 1]}]},
+    {"nope": [1]},
+    {"and": [{"and": []}, {"var": "b"}]},
+    {"or": [{"or": []}, {"var": "b"}]},
+    {"if": {"+": [1, 2]}},
+    {"map": {"merge": [[1], {"var": ""}]}},
+])
+def test_optimize_leaves_impure_or_failing_logic(logic: object):
+    assert JSON(logic) == optimize(logic)
+
+@pytest.mark.parametrize("logic, data", [
+    ({"+": [{"var": "a"}, {"+": [{"var": "b"}]}]}, {"a": True, "b": None}),
+    ({"*": [{"var": "a"}, {"*": ["x"]}]}, {"a": []}),
+    ({"cat": [{"var": "a"}, {"cat": [{"var": "b"}]}]}, {"a": None, "b": []}),
+    ({"and": [{"and": []}, {"var": "b"}]}, {"b": 1}),
+    ({"or": [{"or": []}, {"var": "b"}]}, {"b": 1}),
+    # Folded nodes which aren't in an Array
+    ({"-": {"merge": []}}, {}),
+    ({"==": {"!": {"*": []}}}, {}),
+    ({"-": {"if": [True, {"merge": [[1], [2], [3]]}]}}, {}),
+    ({"-": {"map": [[1], {"!": [{"-": [0, 1]}, [None]]}]}}, {}),
+    # Branches left on their own by simplification
+    ({"-": [{"if": [True, {"var": "x"}, 1]}]}, {"x": "a"}),
+    ({"-": {"if": [False, 1, {"var": "x"}]}}, {"x": "a"}),
+    ({"-": [{"and": [True, {"var": "x"}]}]}, {"x": "a"}),
+    ({"-": {"or": [False, {"cat": ["a", "b"]}]}}, {}),
+])
+def test_optimized_rule_raises_the_same_error(logic: object, data: object):
+    with pytest.raises(Exception) as expected:
+        evaluate(logic, data)
+    with pytest.raises(type(expected.value)) as actual:
+        evaluate(optimize(logic), data)
+    assert str(actual.value) == str(expected.value)
+
+def test_folded_logic_keeps_its_path():
+    optimized = optimize({"and": [{"var": "x"}, {"+": [1, 2]}]})
+    assert isinstance(optimized, Object) and isinstance(arg := optimized["and"], Array)
+    assert arg[1].path == JSONPath(["and", 1])
+
+    with pytest.raises(TypeError) as expected:
+        evaluate({"*": [{"+": [1, 2]}, {"var": "x"}]}, {"x": []})
+    with pytest.raises(TypeError) as actual:
+        evaluate(optimize({"*": [{"+": [1, 2]}, {"var": "x"}]}), {"x": []})
+    assert str(actual.value) == str(expected.value)
+
+def test_optimize_with_native_floats():
+    optimized = optimize({"+": [0.1, 0.2]}, numbers="float")
+    assert isinstance(optimized, NativeFloat)
+    assert optimized == 0.1 + 0.2
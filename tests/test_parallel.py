@@ -0,0 +1,22 @@
+import pytest
+
+from jsonlogic import compile, evaluate_parallel, evaluate_unordered, RecordError
+
+LOGIC = {"if": [{"<": [{"var": "n"}, 50]}, {"*": [{"var": "n"}, 2]}, {"cat": ["big ", {"var": "n"}]}]}
+
+def test_evaluate_parallel_preserves_order():
+    records = ({"n": n} for n in range(100))
+    results = evaluate_parallel(LOGIC, records, workers=2, chunksize=7)
+    assert list(results) == list(compile(LOGIC).map({"n": n} for n in range(100)))
+
+def test_evaluate_unordered_yields_indexes():
+    records = [{"n": n} for n in range(100)]
+    results = dict(evaluate_unordered(compile(LOGIC), records, workers=2, chunksize=7))
+    assert [results[i] for i in range(100)] == list(compile(LOGIC).map(records))
+
+def test_evaluate_parallel_reports_record_index_and_path():
+    records = [{"n": 1}, {"n": 2}, {"n": {"x": 3}}, {"n": 4}]
+    with pytest.raises(RecordError, match=r"^Record 2: \$\.if\[0\]\.<\[0\]\.\+\.var: Expected Integer, Float, String, or Array, but got Object$") as excinfo:
+        list(evaluate_parallel({"if": [{"<": [{"+": {"var": "n"}}, 1]}, 1, 2]}, records, workers=2, chunksize=1))
+    assert excinfo.value.index == 2
+    assert isinstance(excinfo.value.error, TypeError)
@@ -0,0 +1,91 @@
+import pytest
+
+from jsonlogic import JSONPath, Profiler, evaluate
+from jsonlogic.jsonlogic import operators
+
+def test_profiler_doesnt_change_results(jsonlogic_test: tuple[object, object, object]):
+    logic, data, expected = jsonlogic_test
+    with Profiler():
+        assert expected == evaluate(logic, data)
+
+def test_profiler_restores_operators():
+    before = dict(operators)
+    with Profiler() as profiler:
+        assert profiler.enabled
+        assert operators != before
+    assert operators == before
+    assert not profiler.enabled
+
+def test_overlapping_profilers_restore_operators():
+    before = dict(operators)
+    first, second = Profiler(), Profiler()
+    first.enable()
+    second.enable()
+    evaluate({"var": "a"}, {})
+    # Disabled out of order, and re-enabled while still wrapped by second
+    first.disable()
+    evaluate({"var": "a"}, {})
+    first.enable()
+    evaluate({"var": "a"}, {})
+    second.disable()
+    assert operators != before
+    first.disable()
+    assert operators == before
+    assert first.operators["var"].calls == 2
+    assert second.operators["var"].calls == 3
+
+def test_profiler_counts_calls_and_errors():
+    logic = {"map": [{"var": "xs"}, {"+": [{"var": ""}, 1]}]}
+    with Profiler() as profiler:
+        evaluate(logic, {"xs": [1, 2, 3]})
+        with pytest.raises(Exception):
+            evaluate(logic, {"xs": [1, "x"]})
+
+    assert {key: (stats.calls, stats.errors) for key, stats in profiler.operators.items()} == {
+        "map": (2, 1),
+        "var": (7, 0),
+        "+": (5, 1),
+    }
+    assert {path: (stats.calls, stats.errors) for path, stats in profiler.paths.items()} == {
+        JSONPath([]): (2, 1),
+        JSONPath(["map", 0]): (2, 0),
+        JSONPath(["map", 1]): (5, 1),
+        JSONPath(["map", 1, "+", 0]): (5, 0),
+    }
+
+def test_profiler_times_are_consistent():
+    logic = {"+": [{"+": [{"+": [1, {"var": "a"}]}, 2]}, 3]}
+    with Profiler() as profiler:
+        for _ in range(10):
+            evaluate(logic, {"a": 1})
+
+    root = profiler.paths[JSONPath([])]
+    # Nested calls of "+" are only counted once in its cumulative time
+    assert profiler.operators["+"].cumulative == pytest.approx(root.cumulative)
+    for stats in [*profiler.operators.values(), *profiler.paths.values()]:
+        assert 0 <= stats.own <= stats.cumulative
+    assert sum(stats.own for stats in profiler.paths.values()) == pytest.approx(root.cumulative)
+    assert sum(profiler.stacks.values()) == pytest.approx(root.cumulative)
+
+def test_profiler_reports():
+    with Profiler() as profiler:
+        evaluate({"if": [{"var": "a"}, {"cat": ["x", 1]}, 2]}, {"a": True})
+
+    [header, *rows] = profiler.report().splitlines()
+    assert header.split()[:3] == ["operator", "calls", "errors"]
+    assert sorted(row.split()[0] for row in rows) == ["cat", "if", "var"]
+    assert len(profiler.report("path", limit=2).splitlines()) == 3
+    with pytest.raises(ValueError):
+        profiler.report("rule")
+
+    stacks = dict(line.rsplit(" ", 1) for line in profiler.collapsed().splitlines())
+    assert set(stacks) == {"if@$", "if@$;var@$.if[0]", "if@$;cat@$.if[1]"}
+    assert all(int(time) >= 0 for time in stacks.values())
+
+def test_profiler_records_nothing_while_disabled():
+    profiler = Profiler()
+    evaluate({"var": "a"}, {})
+    profiler.enable()
+    profiler.disable()
+    evaluate({"var": "a"}, {})
+    assert profiler.operators == {} and profiler.paths == {}
@@ -0,0 +1,55 @@
+import pytest
+
+from jsonlogic import RuleSet, evaluate
+from jsonlogic.jsonlogic import eager_operators
+
+def test_rule_set_matches_tests_json(jsonlogic_test: tuple[object, object, object]):
+    logic, data, expected = jsonlogic_test
+    [actual, again] = RuleSet([logic, logic])(data)
+    assert expected == actual
+    assert expected == again
+
+def test_rule_set_returns_results_by_name():
+    rules = RuleSet({
+        "minor": {"<": [{"var": "user.age"}, 18]},
+        "local": {"==": [{"var": "user.country"}, "US"]},
+    })
+    assert rules({"user": {"age": 12, "country": "US"}}) == {"minor": True, "local": True}
+
+def test_rule_set_evaluates_shared_logic_once(monkeypatch: pytest.MonkeyPatch):
+    calls = []
+    op_in = eager_operators["in"]
+
+    def counting_in(arg, data):
+        calls.append(arg)
+        return op_in(arg, data)
+
+    monkeypatch.setitem(eager_operators, "in", counting_in)
+    shared = {"in": [{"var": "sku"}, ["a", "b", "c"]]}
+    rules = RuleSet([{"and": [shared, {"<": [{"var": "n"}, i]}]} for i in range(10)])
+    assert rules.shared == 3
+
+    assert rules({"sku": "b", "n": 5}) == [False] * 6 + [True] * 4
+    assert len(calls) == 1
+    rules({"sku": "b", "n": 5})
+    assert len(calls) == 2
+
+def test_rule_set_does_not_share_per_item_logic():
+    increment = {"+": [{"var": ""}, 1]}
+    maps = [{"map": [{"var": "xs"}, increment]}, {"map": [{"var": "ys"}, increment]}]
+    assert RuleSet(maps)({"xs": [1, 2], "ys": [10]}) == [[2, 3], [11]]
+    assert RuleSet([*maps, increment])(5) == [[], [], 6]
+
+def test_rule_set_results_and_errors_have_their_own_paths():
+    logic = {"/": [{"var": "x"}, 0]}
+    rules = RuleSet({"a": {"if": [{"var": "y"}, logic, 1]}, "b": {"and": [1, logic]}})
+    results = RuleSet([{"var": "x"}, {"and": [1, {"var": "x"}]}])({"x": 1})
+    assert isinstance(results, list)
+    assert [result.path for result in results] == [evaluate(logic, {"x": 1}).path for logic in ({"var": "x"}, {"and": [1, {"var": "x"}]})]
+
+    with pytest.raises(ArithmeticError) as expected:
+        evaluate({"and": [1, logic]}, {"x": 1})
+    with pytest.raises(ArithmeticError) as actual:
+        rules({"x": 1, "y": False})
+    assert str(actual.value) == str(expected.value)
+    assert actual.value.__notes__ == ["While evaluating rule 'b'"]
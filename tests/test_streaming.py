@@ -0,0 +1,86 @@
+import random
+
+import pytest
+
+from jsonlogic import Profiler, TraceRecorder, compile, compile_to_python, compile_to_vm, evaluate
+from jsonlogic.jsonlogic import eager_operators, operators
+from jsonlogic.operators import op_in, op_in_lazy
+
+ENGINES = {
+    "compile": compile,
+    "codegen": compile_to_python,
+    "vm": compile_to_vm,
+}
+
+# "a" makes "+" and "%" raise, and [1] makes "*" raise
+ITEMS = [0, 1, 2, 3, 1.5, "2", "a", None, True, [1]]
+FNS = [
+    {"var": ""},
+    {"*": [{"var": ""}, 2]},
+    {">": [{"var": ""}, 1]},
+    {"%": [{"var": ""}, 2]},
+    {"+": [{"var": ""}, 1]},
+]
+
+def random_pipeline(rng: random.Random) -> object:
+    logic: object = rng.choice([{"var": "xs"}, {"var": "xs"}, {"var": "n"}, {"var": "nope"}, [1, 2, 3]])
+    for _ in range(rng.randrange(1, 4)):
+        logic = {rng.choice(["map", "filter"]): [logic, rng.choice(FNS)]}
+    match rng.choice(["map", "filter", "all", "some", "none", "reduce", "in"]):
+        case "reduce":
+            initial = rng.choice([0, 0, {"nope": 1}])
+            return {"reduce": [logic, {"+": [{"var": "accumulator"}, {"var": "current"}]}, initial]}
+        case "in":
+            return {"in": [rng.choice([2, 4, "a", None]), logic]}
+        case op:
+            return {op: [logic, rng.choice(FNS)]}
+
+def outcome(f, data: object) -> tuple[str, str]:
+    try:
+        return "result", repr(f(data))
+    except Exception as e:
+        return type(e).__name__, str(e)
+
+@pytest.mark.parametrize("seed", range(5))
+def test_streamed_pipelines_match_across_engines(seed: int):
+    rng = random.Random(seed)
+    for _ in range(100):
+        logic = random_pipeline(rng)
+        rules = {name: engine(logic) for name, engine in ENGINES.items()}
+        for _ in range(5):
+            data = {"xs": rng.sample(ITEMS, rng.randrange(len(ITEMS))), "n": rng.choice([None, 1])}
+            expected = outcome(lambda data: evaluate(logic, data), data)
+            for name, rule in rules.items():
+                assert outcome(rule, data) == expected, (name, logic, data)
+
+@pytest.mark.parametrize("engine", [lambda logic: (lambda data: evaluate(logic, data)), *ENGINES.values()])
+@pytest.mark.parametrize("logic, expected", [
+    ({"some": [{"map": [{"var": "xs"}, {"+": [{"var": ""}, 1]}]}, {">": [{"var": ""}, 1]}]}, True),
+    ({"none": [{"filter": [{"var": "xs"}, {"%": [{"var": ""}, 2]}]}, {"var": ""}]}, False),
+    ({"all": [{"map": [{"var": "xs"}, {"+": [{"var": ""}, 1]}]}, {"<": [{"var": ""}, 2]}]}, False),
+    ({"in": [2, {"map": [{"var": "xs"}, {"+": [{"var": ""}, 1]}]}]}, True),
+])
+def test_consumers_stop_streaming_once_decided(engine, logic: object, expected: object):
+    # Mapping "a" would raise, had the map been evaluated in full
+    assert engine(logic)({"xs": [1, "a"]}) == expected
+
+def test_streamed_map_only_evaluates_items_as_needed():
+    recorder = TraceRecorder(values=False)
+    logic = {"some": [{"map": [{"var": "xs"}, {"+": [{"var": ""}, 1]}]}, {">": [{"var": ""}, 1]}]}
+    assert evaluate(logic, {"xs": list(range(100))}, tracer=recorder) == True
+    [trace] = recorder.slowest()
+    assert [span.key for span in trace.spans].count("+") == 2
+
+@pytest.mark.parametrize("engine", [lambda logic: (lambda data: evaluate(logic, data)), *ENGINES.values()])
+def test_all_of_an_empty_stream_is_false(engine):
+    logic = {"all": [{"filter": [{"var": "xs"}, {">": [{"var": ""}, 5]}]}, True]}
+    assert engine(logic)({"xs": [1, 2]}) == False
+    assert engine(logic)({"xs": [6, 7]}) == True
+
+def test_in_is_registered_with_its_eager_implementation():
+    assert operators["in"] is op_in_lazy and eager_operators["in"] is op_in
+    logic = {"in": [2, {"map": [{"var": "xs"}, {"+": [{"var": ""}, 1]}]}]}
+    with Profiler() as profiler:
+        assert evaluate(logic, {"xs": [1, "a"]}) == True
+    assert operators["in"] is op_in_lazy
+    assert profiler.operators["in"].calls == 1
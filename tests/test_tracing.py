@@ -0,0 +1,127 @@
+import pytest
+
+from jsonlogic import Budget, BudgetExceeded, JSONPath, Tracer, TraceRecorder, compile, compile_to_python, compile_to_vm, evaluate
+from jsonlogic.json import JSON
+
+EVALUATORS = [
+    lambda logic, data, **kwargs: evaluate(logic, data, **kwargs),
+    lambda logic, data, **kwargs: compile(logic)(data, **kwargs),
+    lambda logic, data, **kwargs: compile_to_python(logic)(data, **kwargs),
+    lambda logic, data, **kwargs: compile_to_vm(logic)(data, **kwargs),
+]
+
+class Recording:
+    """
+    A Tracer which records every call, and samples as told.
+    """
+
+    def __init__(self, samples: list[bool] | None = None):
+        self.samples = samples
+        self.calls: list[tuple] = []
+
+    def sample(self) -> bool:
+        return self.samples.pop(0) if self.samples is not None else True
+
+    def enter(self, key: str, path: JSONPath, arg: JSON):
+        self.calls.append(("enter", key, str(path), arg))
+
+    def exit(self, key: str, path: JSONPath, result: JSON | None, error: BaseException | None):
+        self.calls.append(("exit", key, str(path), result, type(error)))
+
+def test_tracer_doesnt_change_results(jsonlogic_test: tuple[object, object, object]):
+    logic, data, expected = jsonlogic_test
+    tracer: Tracer = TraceRecorder(values=True)
+    for evaluator in EVALUATORS:
+        assert expected == evaluator(logic, data, tracer=tracer)
+
+@pytest.mark.parametrize("evaluator", EVALUATORS)
+def test_tracer_sees_each_operation(evaluator):
+    tracer = Recording()
+    logic = {"if": [{"var": "a"}, {"+": [1, "x"]}, 0]}
+    with pytest.raises(Exception):
+        evaluator(logic, {"a": True}, tracer=tracer)
+    assert [call[:3] for call in tracer.calls] == [
+        ("enter", "if", "$"),
+        ("enter", "var", "$.if[0]"),
+        ("exit", "var", "$.if[0]"),
+        ("enter", "+", "$.if[1]"),
+        ("exit", "+", "$.if[1]"),
+        ("exit", "if", "$"),
+    ]
+    assert tracer.calls[1][3] == "a"
+    assert tracer.calls[2][3:] == (True, type(None))
+    assert tracer.calls[4][3] is None and tracer.calls[4][4] is not type(None)
+
+def test_tracer_samples_at_the_head():
+    tracer = Recording([False, True, False])
+    for x in range(3):
+        evaluate({"var": "x"}, {"x": x}, tracer=tracer)
+    assert tracer.calls == [("enter", "var", "$", "x"), ("exit", "var", "$", 1, type(None))]
+
+@pytest.mark.parametrize("evaluator", EVALUATORS)
+def test_tracer_sees_budget_errors(evaluator):
+    tracer = Recording()
+    with pytest.raises(BudgetExceeded):
+        evaluator({"+": [{"var": "x"}, 1]}, {"x": 1}, tracer=tracer, budget=Budget(steps=1))
+    # The "var" is the second step
+    assert [call[:3] for call in tracer.calls] == [
+        ("enter", "+", "$"),
+        ("enter", "var", "$.+[0]"),
+        ("exit", "var", "$.+[0]"),
+        ("exit", "+", "$"),
+    ]
+    assert tracer.calls[2][4] is BudgetExceeded and tracer.calls[3][4] is BudgetExceeded
+
+def test_trace_recorder_keeps_the_slowest():
+    recorder = TraceRecorder(every=2, keep=3)
+    rule = compile({"map": [{"var": "xs"}, {"+": [{"var": ""}, 1]}]})
+    # Each traced size is four times the last, so timing noise can't reorder them
+    for n in range(10):
+        rule({"xs": list(range(25 * 2 ** n))}, tracer=recorder)
+
+    assert recorder.traced == 5
+    slowest = recorder.slowest()
+    assert len(slowest) == 3
+    assert [trace.duration for trace in slowest] == sorted((trace.duration for trace in slowest), reverse=True)
+    # The evaluations of 6400, 1600, and 400 items
+    assert [len(trace.spans) for trace in slowest] == [2 + 2 * 6400, 2 + 2 * 1600, 2 + 2 * 400]
+
+    [trace] = recorder.slowest(1)
+    assert trace.spans[0].key == "map" and trace.spans[0].depth == 0
+    assert trace.spans[0].duration == trace.duration
+    assert trace.spans[0].arg is None and trace.spans[0].result is None
+    assert trace.error is None
+    assert recorder.dump(1).splitlines()[1].startswith("map $ ")
+
+def test_trace_recorder_records_values_and_errors():
+    recorder = TraceRecorder(values=True)
+    with pytest.raises(Exception):
+        evaluate({"+": [{"var": "x"}, 1]}, {"x": "y"}, tracer=recorder)
+    [trace] = recorder.slowest()
+    root, var = trace.spans
+    assert var.arg == "x" and var.result == "y" and var.depth == 1
+    assert root.error is not None and trace.error is root.error
+    assert "raised" in str(root)
+
+def test_trace_recorder_requires_positive_sampling():
+    with pytest.raises(ValueError):
+        TraceRecorder(every=0)
+
+@pytest.mark.parametrize("evaluator, depth", [(EVALUATORS[1], 150), (EVALUATORS[2], 150), (EVALUATORS[3], 2000)])
+def test_tracing_a_deep_rule(evaluator, depth: int):
+    # As deep as the engine can evaluate without a tracer
+    logic: object = {"var": "x"}
+    for _ in range(depth):
+        logic = {"+": [logic, 1]}
+    recorder = TraceRecorder()
+    assert evaluator(logic, {"x": 1}, tracer=recorder) == depth + 1
+    [trace] = recorder.slowest()
+    assert len(trace.spans) == depth + 1
+    assert trace.spans[-1].key == "var" and trace.spans[-1].depth == depth
+
+    recorder = TraceRecorder()
+    with pytest.raises(TypeError):
+        evaluator(logic, {"x": []}, tracer=recorder)
+    [trace] = recorder.slowest()
+    assert len(trace.spans) == depth + 1
+    assert trace.spans[-1].error is None and all(span.error is not None for span in trace.spans[:-1])
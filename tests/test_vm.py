@@ -0,0 +1,69 @@
+import pytest
+
+from jsonlogic import compile_to_vm, evaluate, VMRule
+from jsonlogic.vm import PopJumpIfFalse, Return
+
+def test_vm_rule_matches_tests_json(jsonlogic_test: tuple[object, object, object]):
+    logic, data, expected = jsonlogic_test
+    assert expected == compile_to_vm(logic)(data)
+
+@pytest.mark.parametrize("logic, data", [
+    ({"+": [{"var": "x"}, 1]}, {"x": []}),
+    ({"and": [1, {"nope": 1}]}, {}),
+    ({"map": [{"var": "x"}, 1]}, {"x": 3}),
+    ({"map": [{"var": "x"}]}, {}),
+    ({"reduce": [{"var": "x"}, 1, 0]}, {"x": "s"}),
+    ({"if": 5}, {}),
+    ({"or": []}, {}),
+    ({"var": 3.5}, []),
+    ({"all": [{"var": "x"}, 1]}, {"x": None}),
+])
+def test_vm_rule_errors_match_evaluate(logic: object, data: object):
+    with pytest.raises(Exception) as expected:
+        evaluate(logic, data)
+    with pytest.raises(type(expected.value)) as actual:
+        compile_to_vm(logic)(data)
+    assert str(actual.value) == str(expected.value)
+
+@pytest.mark.parametrize("logic, data", [
+    ({"var": "a.b"}, {"a": {"b": 1}}),
+    ({"if": [{"var": "a.b"}, {"var": "a"}, 2]}, {"a": {"b": 1}}),
+    ({"map": [[1], {"var": ""}]}, {}),
+    ({"filter": [{"var": "xs"}, {"var": ""}]}, {"xs": [0, 1]}),
+    ({"reduce": [{"var": "xs"}, {"var": "current"}, 0]}, {"xs": [1, 2]}),
+    ({"some": [{"var": "xs"}, {"var": ""}]}, {"xs": [0, 1]}),
+    ({"and": [1, {"var": "a"}]}, {"a": {"b": 1}}),
+    ({"x": [{"var": "a"}], "y": 1}, {"a": 2}),
+])
+def test_vm_rule_results_have_evaluated_paths(logic: object, data: object):
+    expected, actual = evaluate(logic, data), compile_to_vm(logic)(data)
+    assert repr(expected) == repr(actual)
+    assert expected.path == actual.path
+
+def test_vm_rule_handles_deep_and_long_logic():
+    deep: object = {"var": "x"}
+    for _ in range(1_500):
+        deep = {"if": [{"var": "x"}, {"+": [deep, 1]}, 0]}
+    with pytest.raises(RecursionError):
+        evaluate(deep, {"x": 1})
+    rule = compile_to_vm(deep)
+    assert isinstance(rule, VMRule)
+    assert rule({"x": 1}) == 1_501
+
+    nested: object = {"var": ""}
+    for _ in range(1_000):
+        nested = {"map": [[[1]], {"map": [{"var": ""}, nested]}]}
+    assert compile_to_vm({"!!": [nested]})({}) == True
+
+    chain = {"if": [*[c for i in range(10_000) for c in ({"==": [{"var": "x"}, i]}, i * 2)], -1]}
+    assert compile_to_vm(chain)({"x": 9_999}) == 19_998
+    assert compile_to_vm({"max": list(range(10_000))})({}) == 9_999
+
+def test_vm_rule_jumps_to_laid_out_labels():
+    rule = compile_to_vm({"if": [{"var": "a"}, 1, {"var": "b"}, 2, 3]})
+    jumps = [(i, instruction) for i, instruction in enumerate(rule.code) if isinstance(instruction, PopJumpIfFalse)]
+    [(_, first), (second, _)] = jumps
+    # From the first condition to just before the second (where its var is)
+    assert first.target == second - 1
+    assert isinstance(rule.code[-1], Return)
+    assert [rule({"a": a, "b": b}) for a, b in ((1, 0), (0, 1), (0, 0))] == [1, 2, 3]